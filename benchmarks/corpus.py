@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic, reproducible document corpus for benchmarking.
+
+The corpus covers born-digital text PDFs, scanned (image-only) PDFs and
+PNG/JPEG page images at several sizes. The same seed always produces the
+same files.
+
+    python benchmarks/corpus.py --out /tmp/ocr-corpus
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import sys
+import time
+
+from PIL import Image, ImageDraw, ImageFilter
+from pypdf import PdfReader, PdfWriter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ocr_mcp.backends.marker_models import build_text_pdf  # noqa: E402
+
+
+WORDS = (
+    "invoice total amount due date account number customer reference page "
+    "section report summary figure table result analysis method data value "
+    "contract party agreement term payment delivery order quantity price tax"
+).split()
+
+# (name, pages) for text and scanned PDFs
+TEXT_PDFS = [("text-1p", 1), ("text-10p", 10), ("text-50p", 50)]
+SCANNED_PDFS = [("scan-1p", 1), ("scan-5p", 5)]
+# Fixed PDF dates keep the output byte-for-byte reproducible
+FIXED_DATE = time.gmtime(1704067200)
+# (name, width, height) for page images; roughly 100, 250 and 500 DPI letter pages
+IMAGE_SIZES = [("small", 850, 1100), ("medium", 2125, 2750), ("large", 4250, 5500)]
+
+
+def paragraph(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def page_lines(rng: random.Random, number: int, count: int = 40) -> list[str]:
+    lines = [f"Page {number}"]
+    lines.extend(paragraph(rng, rng.randint(8, 12)) for _ in range(count))
+    return lines
+
+
+def text_pdf(rng: random.Random, pages: int) -> bytes:
+    """A born-digital PDF with a real text layer on every page."""
+    writer = PdfWriter()
+    for number in range(1, pages + 1):
+        page_pdf = build_text_pdf(page_lines(rng, number))
+        writer.add_page(PdfReader(io.BytesIO(page_pdf)).pages[0])
+    out = io.BytesIO()
+    writer.write(out)
+    return out.getvalue()
+
+
+def page_image(rng: random.Random, number: int, width: int, height: int) -> Image.Image:
+    """Render a page of text as a slightly noisy grayscale scan."""
+    image = Image.new("L", (width, height), 250)
+    draw = ImageDraw.Draw(image)
+    scale = width / 850
+    font_size = max(10, int(14 * scale))
+    try:
+        from PIL import ImageFont
+        font = ImageFont.load_default(size=font_size)
+    except TypeError:
+        font = None
+    y = int(60 * scale)
+    for line in page_lines(rng, number):
+        draw.text((int(60 * scale), y), line, fill=20, font=font)
+        y += int(font_size * 1.5)
+        if y > height - 60 * scale:
+            break
+    # Scanner noise so the images do not compress unrealistically well
+    noise = Image.effect_noise((width, height), 12).point(lambda v: 255 if v > 140 else 0)
+    image = Image.composite(image, Image.new("L", image.size, 235), noise)
+    return image.filter(ImageFilter.GaussianBlur(0.4 * scale))
+
+
+def scanned_pdf(rng: random.Random, pages: int) -> bytes:
+    """An image-only PDF with no text layer, like a scanner produces."""
+    images = [page_image(rng, number, 1275, 1650) for number in range(1, pages + 1)]
+    out = io.BytesIO()
+    images[0].save(
+        out, "PDF", resolution=150, save_all=True, append_images=images[1:],
+        creationDate=FIXED_DATE, modDate=FIXED_DATE
+    )
+    return out.getvalue()
+
+
+def generate(directory: str, seed: int = 1) -> list[dict]:
+    """
+    Write the corpus to ``directory`` and return its manifest.
+
+    Args:
+        directory: Output directory, created if missing
+        seed: Random seed
+
+    Returns:
+        One entry per file with its path, kind, size and page count
+    """
+    os.makedirs(directory, exist_ok=True)
+    rng = random.Random(seed)
+    manifest = []
+
+    def write(name: str, data: bytes, kind: str, pages: int) -> None:
+        path = os.path.join(directory, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        manifest.append({"path": path, "kind": kind, "bytes": len(data), "pages": pages})
+
+    for name, pages in TEXT_PDFS:
+        write(f"{name}.pdf", text_pdf(rng, pages), "text_pdf", pages)
+
+    for name, pages in SCANNED_PDFS:
+        write(f"{name}.pdf", scanned_pdf(rng, pages), "scanned_pdf", pages)
+
+    for name, width, height in IMAGE_SIZES:
+        image = page_image(rng, 1, width, height)
+        for fmt, ext in (("PNG", "png"), ("JPEG", "jpg")):
+            out = io.BytesIO()
+            image.save(out, fmt, quality=90)
+            write(f"image-{name}.{ext}", out.getvalue(), f"image_{ext}", 1)
+
+    with open(os.path.join(directory, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Generate the benchmark corpus")
+    parser.add_argument("--out", default="benchmarks/corpus", help="Output directory")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    for entry in generate(args.out, args.seed):
+        print(f"{entry['kind']:12} {entry['pages']:3}p {entry['bytes']:>12,} B  {entry['path']}")
+
+
+if __name__ == "__main__":
+    main()
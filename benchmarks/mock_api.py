@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Mistral and DeepSeek chat-completions APIs.
+
+Answers ``POST /v1/chat/completions`` with a canned OCR response after a
+configurable delay, and can inject errors and 429 rate-limit responses.
+Requests with several images get one delimited section per image, the way
+batched page requests ask for it.
+``GET /v1/models`` answers immediately (used by preconnect) and
+``GET /stats`` returns request and byte counters as JSON.
+
+    python benchmarks/mock_api.py --port 8081 --latency 0.8 --rate-limit 0.05
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+
+def image_count(payload: bytes) -> int:
+    """Number of image parts in a chat-completions request body."""
+    try:
+        messages = json.loads(payload).get("messages") or []
+    except ValueError:
+        return 0
+    return sum(
+        1
+        for message in messages
+        if isinstance(message.get("content"), list)
+        for part in message["content"]
+        if part.get("type") == "image_url"
+    )
+
+
+class MockAPIServer:
+    """
+    Threaded HTTP server imitating a chat-completions vision API.
+
+    Args:
+        port: Port to listen on (0 picks a free one)
+        latency: Mean response delay in seconds
+        jitter: Delay varies uniformly by this fraction of ``latency``
+        error_rate: Fraction of requests answered with HTTP 500
+        rate_limit: Fraction of requests answered with HTTP 429
+        retry_after: Retry-After seconds sent with 429s (None omits it)
+        model: Model name echoed in responses
+        seed: Random seed for the injected failures
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        latency: float = 0.5,
+        jitter: float = 0.2,
+        error_rate: float = 0.0,
+        rate_limit: float = 0.0,
+        retry_after: Optional[float] = 1.0,
+        model: str = "mock",
+        seed: int = 1
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit = rate_limit
+        self.retry_after = retry_after
+        self.model = model
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.counters = {
+            "requests": 0,
+            "ok": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "bytes_received": 0,
+            "bytes_sent": 0,
+            "images": 0,
+            "max_concurrent": 0,
+        }
+        self.active = 0
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self.httpd.daemon_threads = True
+        self.thread: Optional[threading.Thread] = None
+
+    @property
+    def port(self) -> int:
+        return self.httpd.server_address[1]
+
+    @property
+    def url(self) -> str:
+        """Chat-completions URL to use as MISTRAL_BASE_URL / DEEPSEEK_BASE_URL."""
+        return f"http://127.0.0.1:{self.port}/v1/chat/completions"
+
+    def _count(self, **changes: int) -> None:
+        with self.lock:
+            for name, value in changes.items():
+                self.counters[name] += value
+
+    def _outcome(self) -> str:
+        with self.lock:
+            roll = self.random.random()
+        if roll < self.rate_limit:
+            return "rate_limited"
+        if roll < self.rate_limit + self.error_rate:
+            return "error"
+        return "ok"
+
+    def _delay(self) -> float:
+        with self.lock:
+            spread = self.random.uniform(-self.jitter, self.jitter)
+        return max(0.0, self.latency * (1 + spread))
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            return dict(self.counters)
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _reply(self, status: int, body: Dict[str, Any], headers: Dict[str, str] = None) -> None:
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+                server._count(bytes_sent=len(data))
+
+            def do_GET(self):
+                if self.path.endswith("/stats"):
+                    self._reply(200, server.stats())
+                else:
+                    self._reply(200, {"data": [{"id": server.model}]})
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = self.rfile.read(length)
+                images = image_count(payload)
+                server._count(requests=1, bytes_received=len(payload), images=images)
+
+                outcome = server._outcome()
+                if outcome == "rate_limited":
+                    server._count(rate_limited=1)
+                    headers = {}
+                    if server.retry_after is not None:
+                        headers["Retry-After"] = str(server.retry_after)
+                    self._reply(429, {"error": "rate limited"}, headers)
+                    return
+
+                with server.lock:
+                    server.active += 1
+                    server.counters["max_concurrent"] = max(
+                        server.counters["max_concurrent"], server.active
+                    )
+                try:
+                    time.sleep(server._delay())
+                finally:
+                    with server.lock:
+                        server.active -= 1
+
+                if outcome == "error":
+                    server._count(errors=1)
+                    self._reply(500, {"error": "injected failure"})
+                    return
+
+                server._count(ok=1)
+                text = f"Mock OCR text for a {length:,} byte request."
+                if images > 1:
+                    text = "\n".join(
+                        f"=== PAGE {page} ===\nMock OCR text for page {page} of {images}."
+                        for page in range(1, images + 1)
+                    )
+                self._reply(200, {
+                    "model": server.model,
+                    "choices": [{"message": {"role": "assistant", "content": text}}],
+                    "usage": {
+                        "prompt_tokens": length // 1000,
+                        "completion_tokens": len(text) // 4,
+                        "total_tokens": length // 1000 + len(text) // 4,
+                    },
+                })
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> "MockAPIServer":
+        """Serve in a background thread."""
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock chat-completions API")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.5, help="Mean delay in seconds")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Delay spread as a fraction")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of HTTP 500s")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Fraction of HTTP 429s")
+    parser.add_argument("--retry-after", type=float, default=1.0,
+                        help="Retry-After seconds on 429s (negative to omit)")
+    parser.add_argument("--model", default="mock")
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    server = MockAPIServer(
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit=args.rate_limit,
+        retry_after=args.retry_after if args.retry_after >= 0 else None,
+        model=args.model,
+        seed=args.seed
+    )
+    print(f"Mock API listening on {server.url}", flush=True)
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.httpd.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Benchmark driver: throughput, latency percentiles, peak RSS and bytes sent.
+
+Starts mock Mistral/DeepSeek servers in subprocesses, points the backends at
+them and pushes the corpus through ``process_with_fallback`` and/or the MCP
+``call_tool`` path at each concurrency level.
+
+    python benchmarks/run.py --concurrency 1,4,16 --requests 40
+    python benchmarks/run.py --latency 1.5 --rate-limit 0.1 --json results.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Dict, List
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+# Ignore any local .env so runs on different machines are comparable. The
+# .env location is fixed when ocr_mcp.config is first imported, which
+# corpus.py does, so this has to come first.
+os.environ["OCR_MCP_ENV_FILE"] = os.devnull
+
+import corpus  # noqa: E402
+
+
+def percentile(samples: List[float], p: float) -> float:
+    """Nearest-rank percentile of a non-empty list."""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(p / 100 * len(ordered) + 0.5) - 1))
+    return ordered[index]
+
+
+def start_mock(args: argparse.Namespace, model: str, seed: int) -> tuple[subprocess.Popen, str]:
+    """Start a mock API server in its own process and return it with its URL."""
+    process = subprocess.Popen(
+        [
+            sys.executable, os.path.join(HERE, "mock_api.py"),
+            "--port", "0",
+            "--latency", str(args.latency),
+            "--jitter", str(args.jitter),
+            "--error-rate", str(args.error_rate),
+            "--rate-limit", str(args.rate_limit),
+            "--retry-after", str(args.retry_after),
+            "--model", model,
+            "--seed", str(seed),
+        ],
+        stdout=subprocess.PIPE,
+        text=True
+    )
+    line = process.stdout.readline().strip()
+    return process, line.rsplit(" ", 1)[-1]
+
+
+def mock_stats(url: str) -> Dict[str, Any]:
+    stats_url = url.rsplit("/chat/completions", 1)[0] + "/stats"
+    with urllib.request.urlopen(stats_url, timeout=5) as response:
+        return json.load(response)
+
+
+def reset_peak_rss() -> bool:
+    """Reset the kernel's RSS high-water mark for this process (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+async def run_level(
+    call,
+    files: List[str],
+    concurrency: int,
+    requests: int
+) -> Dict[str, Any]:
+    """Send ``requests`` calls with ``concurrency`` in flight and time them."""
+    queue: asyncio.Queue = asyncio.Queue()
+    for i in range(requests):
+        queue.put_nowait(files[i % len(files)])
+
+    latencies: List[float] = []
+    errors: List[str] = []
+
+    async def worker() -> None:
+        while not queue.empty():
+            path = queue.get_nowait()
+            start = time.perf_counter()
+            error = await call(path)
+            latencies.append(time.perf_counter() - start)
+            if error:
+                errors.append(error)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "seconds": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2),
+        "p50_seconds": round(percentile(latencies, 50), 4),
+        "p95_seconds": round(percentile(latencies, 95), 4),
+        "p99_seconds": round(percentile(latencies, 99), 4),
+    }
+
+
+async def benchmark(args: argparse.Namespace, urls: Dict[str, str], files: List[str]) -> List[Dict[str, Any]]:
+    from ocr_mcp import server
+    from ocr_mcp.config import reload_settings
+    from ocr_mcp.fileio import peak_resident_bytes
+    from ocr_mcp.registry import registry
+
+    # The settings were loaded when corpus.py imported the package; pick up
+    # the environment set up in main()
+    reload_settings()
+
+    async def via_pipeline(path: str):
+        result = await server.process_with_fallback(file_path=path)
+        return result.error
+
+    async def via_tool(path: str):
+        content = await server.call_tool("ocr", {"file_path": path})
+        text = content[0].text
+        return text if text.startswith("Error:") else None
+
+    paths = {"pipeline": via_pipeline, "tool": via_tool}
+    selected = list(paths) if args.path == "both" else [args.path]
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    await asyncio.to_thread(server.get_backends)
+    results = []
+    try:
+        for path_name in selected:
+            for concurrency in levels:
+                before = {name: mock_stats(url) for name, url in urls.items()}
+                peak_reset = reset_peak_rss()
+                level = await run_level(paths[path_name], files, concurrency, args.requests)
+                after = {name: mock_stats(url) for name, url in urls.items()}
+
+                level["path"] = path_name
+                level["bytes_sent"] = sum(
+                    after[name]["bytes_received"] - before[name]["bytes_received"]
+                    for name in urls
+                )
+                level["api_requests"] = sum(
+                    after[name]["requests"] - before[name]["requests"] for name in urls
+                )
+                level["api_rate_limited"] = sum(
+                    after[name]["rate_limited"] - before[name]["rate_limited"] for name in urls
+                )
+                level["peak_rss_bytes"] = peak_resident_bytes()
+                level["peak_rss_per_level"] = peak_reset
+                results.append(level)
+                print_row(level)
+    finally:
+        await registry.aclose()
+    return results
+
+
+HEADER = (
+    f"{'path':9} {'conc':>4} {'reqs':>5} {'err':>4} {'req/s':>8} "
+    f"{'p50':>8} {'p95':>8} {'p99':>8} {'peak RSS':>10} {'sent':>10} {'429s':>5}"
+)
+
+
+def print_row(level: Dict[str, Any]) -> None:
+    print(
+        f"{level['path']:9} {level['concurrency']:>4} {level['requests']:>5} "
+        f"{level['errors']:>4} {level['throughput_rps']:>8.2f} "
+        f"{level['p50_seconds']:>8.3f} {level['p95_seconds']:>8.3f} {level['p99_seconds']:>8.3f} "
+        f"{(level['peak_rss_bytes'] or 0) / 1e6:>8.1f}MB {level['bytes_sent'] / 1e6:>8.1f}MB "
+        f"{level['api_rate_limited']:>5}",
+        flush=True
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the OCR MCP server")
+    parser.add_argument("--corpus", help="Corpus directory (generated in a temp dir if omitted)")
+    parser.add_argument("--kinds", default="",
+                        help="Comma-separated corpus kinds to use, e.g. scanned_pdf,image_png")
+    parser.add_argument("--path", choices=["pipeline", "tool", "both"], default="both")
+    parser.add_argument("--concurrency", default="1,4,16", help="Comma-separated levels")
+    parser.add_argument("--requests", type=int, default=40, help="Requests per level")
+    parser.add_argument("--backends", default="mistral,deepseek",
+                        help="API backends to enable, in priority order")
+    parser.add_argument("--latency", type=float, default=0.5, help="Mock API mean latency")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Mock API latency spread")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Mock API 500 fraction")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Mock API 429 fraction")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Mock API Retry-After")
+    parser.add_argument("--cache", action="store_true", help="Keep the result cache enabled")
+    parser.add_argument("--dedupe", action="store_true", help="Keep single-flight enabled")
+    parser.add_argument("--page-batch", type=int, default=1,
+                        help="Pages per vision API request (PAGE_BATCH_SIZE)")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args()
+
+    directory = args.corpus or tempfile.mkdtemp(prefix="ocr-bench-corpus-")
+    manifest_path = os.path.join(directory, "manifest.json")
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+    else:
+        print(f"Generating corpus in {directory}...", flush=True)
+        manifest = corpus.generate(directory)
+    kinds = {kind for kind in args.kinds.split(",") if kind}
+    files = [entry["path"] for entry in manifest if not kinds or entry["kind"] in kinds]
+    if not files:
+        parser.error("no corpus files match --kinds")
+
+    backends = [b.strip() for b in args.backends.split(",") if b.strip()]
+    mocks = {}
+    urls = {}
+    try:
+        for seed, name in enumerate(backends, start=1):
+            mocks[name], urls[name] = start_mock(args, name, seed)
+            os.environ[f"{name.upper()}_API_KEY"] = "benchmark"
+            os.environ[f"{name.upper()}_BASE_URL"] = urls[name]
+
+        # Benchmark the pipeline, not the cache
+        os.environ["ENABLED_BACKENDS"] = ",".join(backends)
+        os.environ["DEFAULT_BACKEND"] = backends[0]
+        os.environ["CACHE_ENABLED"] = "true" if args.cache else "false"
+        os.environ["SINGLE_FLIGHT_ENABLED"] = "true" if args.dedupe else "false"
+        os.environ["PAGE_BATCH_SIZE"] = str(args.page_batch)
+
+        print(f"{len(files)} files, mock latency {args.latency}s, backends {', '.join(backends)}")
+        print(HEADER)
+        results = asyncio.run(benchmark(args, urls, files))
+    finally:
+        for process in mocks.values():
+            process.terminate()
+            process.wait()
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
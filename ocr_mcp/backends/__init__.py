@@ -1,4 +1,5 @@
 from .base import BaseBackend, OCRResult
+from .api import VisionAPIBackend
 from .marker import MarkerBackend
 from .deepseek import DeepSeekBackend
 from .mistral import MistralBackend
@@ -6,6 +7,7 @@ from .mistral import MistralBackend
 __all__ = [
     "BaseBackend",
     "OCRResult",
+    "VisionAPIBackend",
     "MarkerBackend",
     "DeepSeekBackend",
     "MistralBackend",
@@ -0,0 +1,539 @@
+import asyncio
+import re
+import time
+import httpx
+from typing import Any, Dict, List, Optional, Tuple
+from ..deadline import DeadlineExceeded, current_deadline
+from ..fileio import StreamedJSONBody, base64_length, map_file, peak_resident_bytes
+from ..limits import rate_limiter
+from ..metrics import count, record_stage, stage
+from .base import BaseBackend, OCRResult
+from .http_client import (
+    RETRYABLE_STATUS,
+    SharedClient,
+    backoff_delay,
+    retry_after_seconds,
+)
+from .preprocess import ImageOptions, PreparedImage, prepare_image
+
+
+OCR_PROMPT = (
+    "Extract all text from this image. Preserve the structure and formatting "
+    "as much as possible. If there is handwriting, transcribe it accurately. "
+    "Return only the extracted text without any additional commentary."
+)
+
+BATCH_PROMPT = (
+    "The following {pages} images are consecutive pages of one document. "
+    "Extract all text from each page. Preserve the structure and formatting "
+    "as much as possible. If there is handwriting, transcribe it accurately. "
+    "Before the text of every page write a line of the form "
+    "\"=== PAGE n ===\", where n is the page's position (1 to {pages}) in "
+    "the order the images were given, even if the page is blank. "
+    "Return only these lines and the extracted text without any additional "
+    "commentary."
+)
+PAGE_DELIMITER = re.compile(r"^[ \t]*=== PAGE (\d+) ===[ \t]*$", re.MULTILINE)
+
+# Completion budget reserved for one page
+MAX_TOKENS_PER_PAGE = 4000
+# Pages sent alone after batching dropped to one page before it is tried again
+BATCH_PROBE_PAGES = 16
+
+
+def image_part(prepared: PreparedImage) -> Dict[str, Any]:
+    """A chat-completions ``image_url`` part whose data is streamed in later."""
+    return {
+        "type": "image_url",
+        "image_url": {
+            "url": f"data:{prepared.mime};base64,{{data}}"
+        }
+    }
+
+
+class BatchResponseError(ValueError):
+    """Raised when a multi-page response cannot be split back into its pages."""
+
+
+def split_batch_response(text: str, pages: int) -> List[str]:
+    """
+    Split a multi-page response at its page delimiters.
+
+    Returns:
+        The text of every page, in order
+
+    Raises:
+        BatchResponseError: Unless the response has exactly one delimiter
+            for each page 1..``pages``, in order
+    """
+    matches = list(PAGE_DELIMITER.finditer(text))
+    found = [int(match.group(1)) for match in matches]
+    if found != list(range(1, pages + 1)):
+        raise BatchResponseError(
+            f"expected page markers 1-{pages} in order, found {found or 'none'}"
+        )
+    texts = []
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following is not None else len(text)
+        texts.append(text[match.end():end].strip())
+    return texts
+
+
+def memory_report(peak_before, sent, original) -> Dict[str, Any]:
+    """Summarize memory use of one request for the result metadata."""
+    peak_after = peak_resident_bytes()
+    growth = None
+    if peak_before is not None and peak_after is not None:
+        growth = peak_after - peak_before
+    return {
+        # Bytes copied onto the heap for the upload; 0 when sent straight
+        # from the caller's buffer or memory map
+        "buffered_bytes": 0 if sent is original else len(sent),
+        "process_peak_rss_bytes": peak_after,
+        "peak_rss_growth_bytes": growth,
+    }
+
+
+def record_request_time(body: StreamedJSONBody, start: float, encoded_before: float) -> None:
+    """Record one attempt's time, split into base64 encoding and network."""
+    # Encoding happens while the body streams, so it is part of the elapsed time
+    encoding = body.encode_seconds - encoded_before
+    record_stage("encode", encoding)
+    record_stage("network", time.perf_counter() - start - encoding)
+
+
+class VisionAPIBackend(BaseBackend):
+    """Base class for OCR backends that call a chat-completions vision API."""
+
+    display_name = "API"
+    model = ""
+    base_url = ""
+    models_url = ""
+    confidence = 0.9
+
+    def __init__(self, config: Dict[str, Any]):
+        super().__init__(config)
+        self.api_key = config.get("api_key")
+        if config.get("base_url"):
+            # Point at a proxy, gateway or local stand-in server
+            self.base_url = config["base_url"]
+            self.models_url = self.base_url.rsplit("/chat/completions", 1)[0] + "/models"
+        self.api_timeout = config.get("api_timeout", 30)
+        self.max_retries = config.get("max_retries", 3)
+        self.backoff_base = config.get("backoff_base", 1.0)
+        self.backoff_max = config.get("backoff_max", 30.0)
+        self.retry_after_max = config.get("retry_after_max", 120.0)
+        self.http = SharedClient(
+            self.name,
+            timeout=self.api_timeout,
+            max_connections=config.get("max_connections", 20),
+            max_keepalive=config.get("max_keepalive", 10),
+            keepalive_expiry=config.get("keepalive_expiry", 60.0),
+            http2=config.get("http2", False)
+        )
+        self.image_options = ImageOptions.from_config(config.get("image"))
+        # Multi-page requests; batch_limit adapts between 1 and the maximum
+        self.batch_max_pages = max(1, config.get("batch_max_pages", 1))
+        self.batch_max_bytes = config.get("batch_max_bytes", 20 * 1024 * 1024)
+        self.batch_max_tokens = config.get("batch_max_tokens", 16000)
+        self.batch_limit = self.batch_max_pages
+        self._pages_since_shrink = 0
+
+    def is_available(self) -> bool:
+        """Check if the API is configured."""
+        return bool(self.api_key)
+
+    def _headers(self) -> Dict[str, str]:
+        return {
+            "Authorization": f"Bearer {self.api_key}",
+            "Content-Type": "application/json"
+        }
+
+    async def preconnect(self) -> bool:
+        """Open a pooled connection to the API host before the first request."""
+        return await self.http.preconnect(self.models_url, headers=self._headers())
+
+    async def aclose(self) -> None:
+        """Close the pooled connections."""
+        await self.http.aclose()
+
+    async def process_file(self, file_path: str, **kwargs) -> OCRResult:
+        """
+        Process a file using the vision API.
+
+        Args:
+            file_path: Path to PDF or image file
+            **kwargs: Additional options
+
+        Returns:
+            OCRResult with extracted text
+        """
+        try:
+            # Map the file instead of reading it into memory
+            start = time.perf_counter()
+            with map_file(file_path) as file_data:
+                record_stage("read", time.perf_counter() - start)
+                return await self.process_image(file_data, **kwargs)
+
+        except Exception as e:
+            return OCRResult(
+                text="",
+                backend=self.name,
+                error=f"{self.display_name} file processing failed: {str(e)}"
+            )
+
+    async def process_image(self, image_data: bytes, **kwargs) -> OCRResult:
+        """
+        Process image data using the vision API.
+
+        The base64 data is encoded while the request body is streamed, so
+        neither the encoded image nor the full JSON body is held in memory.
+
+        Args:
+            image_data: Raw image bytes or a memory-mapped file
+            **kwargs: Additional options
+
+        Returns:
+            OCRResult with extracted text
+        """
+        try:
+            peak_before = peak_resident_bytes()
+
+            # Shrink and re-encode off the event loop before encoding
+            with stage("preprocess"):
+                prepared = await prepare_image(image_data, self.image_options)
+
+            result = await self._send_image(prepared)
+            result.metadata["memory"] = memory_report(peak_before, prepared.data, image_data)
+            return result
+
+        except Exception as e:
+            return OCRResult(
+                text="",
+                backend=self.name,
+                error=f"{self.display_name} API processing failed: {str(e)}"
+            )
+
+    async def _send_image(self, prepared: PreparedImage) -> OCRResult:
+        """
+        Send one prepared image in its own request.
+
+        Raises:
+            httpx.HTTPError: If the request failed on every attempt
+        """
+        payload = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": OCR_PROMPT
+                        },
+                        image_part(prepared)
+                    ]
+                }
+            ],
+            "max_tokens": MAX_TOKENS_PER_PAGE,
+            "temperature": 0.1
+        }
+        body = StreamedJSONBody(payload, prepared.data)
+        text, _, request = await self._complete(payload, body)
+
+        return OCRResult(
+            text=text,
+            backend=self.name,
+            confidence=self.confidence,
+            metadata={
+                "model": self.model,
+                "api": True,
+                **request,
+                "preprocess": prepared.metadata,
+                "request_bytes": body.length,
+            }
+        )
+
+    async def _process_prepared(self, prepared: PreparedImage) -> OCRResult:
+        """OCR one page that was already prepared for a batch."""
+        try:
+            return await self._send_image(prepared)
+        except Exception as e:
+            return OCRResult(
+                text="",
+                backend=self.name,
+                error=f"{self.display_name} API processing failed: {str(e)}"
+            )
+
+    async def _complete(
+        self,
+        payload: Dict[str, Any],
+        body: StreamedJSONBody
+    ) -> Tuple[str, Optional[str], Dict[str, Any]]:
+        """
+        Send a chat-completions request, retrying over the shared pool.
+
+        Returns:
+            Tuple of (response text, finish reason, attempts and rate limit
+            wait for the result metadata)
+
+        Raises:
+            httpx.HTTPError: If the request failed on every attempt
+            DeadlineExceeded: If no retry fits before the request's deadline
+        """
+        # Reserve the completion budget; settled against actual usage
+        reserved_tokens = payload["max_tokens"]
+        rate_limit_wait = 0.0
+        deadline = current_deadline()
+
+        async def back_off(attempt: int) -> None:
+            delay = backoff_delay(attempt, self.backoff_base, self.backoff_max)
+            if not deadline.allows(delay):
+                raise DeadlineExceeded(
+                    f"no time left to retry before the deadline ({delay:.1f}s backoff)"
+                )
+            with stage("backoff"):
+                await asyncio.sleep(delay)
+
+        for attempt in range(self.max_retries):
+            last_attempt = attempt == self.max_retries - 1
+            if attempt:
+                count(backend=self.name, retries=1)
+            waited = await rate_limiter.acquire(self.name, reserved_tokens)
+            record_stage("rate_limit_wait", waited)
+            rate_limit_wait += waited
+
+            start = time.perf_counter()
+            encoded_before = body.encode_seconds
+            try:
+                response = await self.http.post(
+                    self.base_url,
+                    headers={**self._headers(), **body.headers},
+                    content=body.stream(),
+                    # Never wait on the API past the request's deadline
+                    timeout=deadline.clamp(self.api_timeout)
+                )
+            except httpx.TransportError:
+                # Connection failures and timeouts
+                record_request_time(body, start, encoded_before)
+                rate_limiter.record_usage(self.name, reserved_tokens, 0)
+                if last_attempt:
+                    raise
+                await back_off(attempt)
+                continue
+            record_request_time(body, start, encoded_before)
+            count(sent_bytes=body.length, received_bytes=len(response.content))
+
+            if response.status_code in RETRYABLE_STATUS and not last_attempt:
+                rate_limiter.record_usage(self.name, reserved_tokens, 0)
+                delay = retry_after_seconds(response)
+                if delay is None:
+                    await back_off(attempt)
+                elif not deadline.allows(delay):
+                    raise DeadlineExceeded(
+                        f"no time left to retry before the deadline "
+                        f"(Retry-After {delay:g}s)"
+                    )
+                elif delay <= self.retry_after_max:
+                    # Pauses every caller of this backend, not just us
+                    rate_limiter.retry_after(self.name, delay)
+                else:
+                    response.raise_for_status()
+                continue
+
+            response.raise_for_status()
+
+            result = response.json()
+            choice = result["choices"][0]
+            rate_limiter.record_usage(
+                self.name,
+                reserved_tokens,
+                (result.get("usage") or {}).get("total_tokens")
+            )
+            return choice["message"]["content"], choice.get("finish_reason"), {
+                "attempts": attempt + 1,
+                "rate_limit_wait_seconds": round(rate_limit_wait, 3),
+            }
+
+        # max_retries < 1
+        raise RuntimeError("no API attempts configured")
+
+    def plan_batches(self, sizes: List[int]) -> List[int]:
+        """
+        Split pages into consecutive batches that fit one request.
+
+        A batch holds at most the current page limit, ``batch_max_tokens``
+        worth of per-page completion budgets and ``batch_max_bytes`` of
+        encoded images; a page too large for any batch goes alone.
+
+        Args:
+            sizes: Prepared image size of every page, in bytes
+
+        Returns:
+            Number of pages in each batch, in order
+        """
+        max_pages = max(1, min(
+            self.batch_limit,
+            self.batch_max_tokens // MAX_TOKENS_PER_PAGE or 1
+        ))
+        batches = []
+        pages = payload = 0
+        for size in sizes:
+            encoded = base64_length(size)
+            if pages and (pages >= max_pages or payload + encoded > self.batch_max_bytes):
+                batches.append(pages)
+                pages = payload = 0
+            pages += 1
+            payload += encoded
+        if pages:
+            batches.append(pages)
+        return batches
+
+    def _adapt(self, ok: bool) -> None:
+        """Halve the page limit after a failed batch, creep back after a good one."""
+        if ok:
+            self.batch_limit = min(self.batch_max_pages, self.batch_limit + 1)
+        else:
+            self.batch_limit = max(1, self.batch_limit // 2)
+        self._pages_since_shrink = 0
+
+    def _count_single(self) -> None:
+        """Probe with a batch of two again once enough pages went alone."""
+        if self.batch_limit > 1:
+            return
+        self._pages_since_shrink += 1
+        if self._pages_since_shrink >= BATCH_PROBE_PAGES:
+            self.batch_limit = min(2, self.batch_max_pages)
+            self._pages_since_shrink = 0
+
+    async def process_batch(self, file_paths: List[str]) -> List[OCRResult]:
+        """
+        OCR several pages with as few requests as the batch limits allow.
+
+        Single-page PDFs are rendered to images first, so each request
+        carries one ``image_url`` image per page, and asks for a delimiter
+        line before every page's text. When a response cannot be split
+        back into exactly those pages (or was cut off), the same images are
+        sent again one per request and the reason is reported as
+        ``batch_fallback`` in their metadata. Failed requests are not
+        repeated: every page of the batch gets the error, and the caller's
+        fallback chain decides what to do with it.
+
+        Args:
+            file_paths: Single-page files, in page order
+
+        Returns:
+            One result per file, in the same order
+        """
+        try:
+            with stage("preprocess"):
+                prepared = []
+                for path in file_paths:
+                    with map_file(path) as data:
+                        image = await prepare_image(data, self.image_options, render_pdf=True)
+                        # The map closes with the file; keep a copy of what
+                        # is sent unless preprocessing already made one
+                        if image.data is data:
+                            image.data = bytes(data)
+                        prepared.append(image)
+        except ImportError:
+            return self._failed(
+                len(file_paths), "PDF pages cannot be rendered (pypdfium2 is not installed)"
+            )
+        except Exception as e:
+            return self._failed(len(file_paths), f"preprocessing failed: {e}")
+
+        if len(prepared) < 2 or self.batch_max_pages < 2:
+            return [await self._process_prepared(image) for image in prepared]
+
+        results: List[OCRResult] = []
+        start = 0
+        for size in self.plan_batches([len(image.data) for image in prepared]):
+            images = prepared[start:start + size]
+            start += size
+            if size == 1:
+                results.append(await self._process_prepared(images[0]))
+                self._count_single()
+                continue
+            try:
+                batch = await self._send_batch(images)
+            except BatchResponseError as e:
+                self._adapt(False)
+                results.extend(await self._process_singly(images, str(e)))
+                continue
+            except Exception as e:
+                results.extend(self._failed(
+                    size, f"{self.display_name} API processing failed: {str(e) or type(e).__name__}"
+                ))
+                continue
+            self._adapt(True)
+            results.extend(batch)
+        return results
+
+    def _failed(self, pages: int, error: str) -> List[OCRResult]:
+        """The same error for every page of a batch that could not be sent."""
+        return [OCRResult(text="", backend=self.name, error=error) for _ in range(pages)]
+
+    async def _process_singly(self, images: List[PreparedImage], reason: str) -> List[OCRResult]:
+        """Send each page of a batch whose response could not be split on its own."""
+        results = []
+        for image in images:
+            result = await self._process_prepared(image)
+            result.metadata = {**(result.metadata or {}), "batch_fallback": reason}
+            results.append(result)
+        return results
+
+    async def _send_batch(self, images: List[PreparedImage]) -> List[OCRResult]:
+        """
+        Send one multi-page request.
+
+        Raises:
+            BatchResponseError: If the response was cut off or its pages
+                could not be told apart
+            httpx.HTTPError: If the request failed on every attempt
+        """
+        payload = {
+            "model": self.model,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "text",
+                            "text": BATCH_PROMPT.format(pages=len(images))
+                        },
+                        *(image_part(image) for image in images)
+                    ]
+                }
+            ],
+            "max_tokens": MAX_TOKENS_PER_PAGE * len(images),
+            "temperature": 0.1
+        }
+        body = StreamedJSONBody(payload, [image.data for image in images])
+        text, finish_reason, request = await self._complete(payload, body)
+        if finish_reason == "length":
+            # Truncated: the last pages are missing or incomplete
+            raise BatchResponseError("response was cut off at the token limit")
+        texts = split_batch_response(text, len(images))
+
+        return [
+            OCRResult(
+                text=page_text,
+                backend=self.name,
+                confidence=self.confidence,
+                metadata={
+                    "model": self.model,
+                    "api": True,
+                    **request,
+                    "batch_pages": len(images),
+                    "batch_position": position + 1,
+                    "preprocess": image.metadata,
+                    "request_bytes": body.length,
+                }
+            )
+            for position, (page_text, image) in enumerate(zip(texts, images))
+        ]
+
+    def get_supported_formats(self) -> list[str]:
+        """Vision APIs accept images."""
+        return ["png", "jpg", "jpeg", "webp", "gif"]
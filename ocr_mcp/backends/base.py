@@ -68,6 +68,10 @@ class BaseBackend(ABC):
         """Return list of supported file formats."""
         return ["pdf", "png", "jpg", "jpeg", "tiff", "bmp"]
     
+    async def aclose(self) -> None:
+        """Release resources held by the backend (connections, pools)."""
+        pass
+    
     async def process_with_fallback(
         self, 
         file_path: Optional[str] = None,
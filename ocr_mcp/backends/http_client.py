@@ -0,0 +1,159 @@
+import random
+import sys
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Optional
+
+import httpx
+
+
+# Statuses worth retrying: timeouts, rate limits and server-side failures
+RETRYABLE_STATUS = {408, 409, 425, 429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(response: httpx.Response) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, IndexError):
+        return None
+
+
+def backoff_delay(attempt: int, base: float = 1.0, cap: float = 30.0) -> float:
+    """Exponential backoff with full jitter for the given 0-based attempt."""
+    return random.uniform(0, min(cap, base * 2 ** attempt))
+
+
+class SharedClient:
+    """
+    Long-lived ``httpx.AsyncClient`` shared by every request to one API.
+
+    Keeps TCP/TLS connections alive between requests and counts how many
+    requests were served by a new connection versus a reused one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float = 30,
+        max_connections: int = 20,
+        max_keepalive: int = 10,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.max_connections = max_connections
+        self.max_keepalive = max_keepalive
+        self.keepalive_expiry = keepalive_expiry
+        self.http2 = http2 and self._http2_available()
+
+        self._client: Optional[httpx.AsyncClient] = None
+        self._transport: Optional[httpx.AsyncHTTPTransport] = None
+
+        self.requests = 0
+        self.new_connections = 0
+        self.in_flight = 0
+
+    def _http2_available(self) -> bool:
+        try:
+            import h2  # noqa: F401
+            return True
+        except ImportError:
+            print(
+                f"HTTP/2 requested for {self.name} but the h2 package is not "
+                "installed; using HTTP/1.1",
+                file=sys.stderr
+            )
+            return False
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """The underlying client, created on first use."""
+        if self._client is None or self._client.is_closed:
+            limits = httpx.Limits(
+                max_connections=self.max_connections,
+                max_keepalive_connections=self.max_keepalive,
+                keepalive_expiry=self.keepalive_expiry
+            )
+            self._transport = httpx.AsyncHTTPTransport(limits=limits, http2=self.http2)
+            self._client = httpx.AsyncClient(
+                transport=self._transport,
+                timeout=self.timeout
+            )
+        return self._client
+
+    async def _trace(self, event: str, info: Dict[str, Any]) -> None:
+        if event == "connection.connect_tcp.complete":
+            self.new_connections += 1
+
+    async def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        """Send a request over the shared connection pool."""
+        extensions = dict(kwargs.pop("extensions", None) or {})
+        extensions["trace"] = self._trace
+        self.requests += 1
+        self.in_flight += 1
+        try:
+            return await self.client.request(method, url, extensions=extensions, **kwargs)
+        finally:
+            self.in_flight -= 1
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """Send a POST request over the shared connection pool."""
+        return await self.request("POST", url, **kwargs)
+
+    async def preconnect(self, url: str, headers: Optional[Dict[str, str]] = None) -> bool:
+        """
+        Open a connection ahead of the first real request.
+
+        Any response counts as success; only the established connection
+        matters. Returns False if the host could not be reached.
+        """
+        try:
+            response = await self.request("GET", url, headers=headers)
+            await response.aclose()
+            return True
+        except httpx.HTTPError:
+            return False
+
+    def pool_occupancy(self) -> Dict[str, Optional[int]]:
+        """Return open, active and idle connection counts."""
+        pool = getattr(self._transport, "_pool", None)
+        connections = list(getattr(pool, "connections", None) or [])
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return {
+            "open": len(connections),
+            "active": len(connections) - idle,
+            "idle": idle,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool limits, occupancy and connection reuse counters."""
+        reused = max(self.requests - self.new_connections, 0)
+        return {
+            "http2": self.http2,
+            "max_connections": self.max_connections,
+            "max_keepalive": self.max_keepalive,
+            "keepalive_expiry": self.keepalive_expiry,
+            "requests": self.requests,
+            "in_flight": self.in_flight,
+            "new_connections": self.new_connections,
+            "reused_connections": reused,
+            "reuse_ratio": reused / self.requests if self.requests else None,
+            "pool": self.pool_occupancy(),
+        }
+
+    async def aclose(self) -> None:
+        """Close all pooled connections."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._transport = None
+
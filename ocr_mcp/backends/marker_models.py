@@ -0,0 +1,204 @@
+import gc
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Any, Dict, Optional
+
+
+def build_text_pdf(lines: list[str]) -> bytes:
+    """
+    Build a minimal single-page PDF with the given lines of text.
+
+    Used for model warm-up so no sample document has to ship with the package.
+    """
+    stream_lines = ["BT", "/F1 12 Tf", "72 720 Td", "14 TL"]
+    for line in lines:
+        escaped = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+        stream_lines.append(f"({escaped}) '")
+    stream_lines.append("ET")
+    stream = "\n".join(stream_lines).encode("latin-1")
+
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+        b"/Resources << /Font << /F1 5 0 R >> >> /Contents 4 0 R >>",
+        b"<< /Length " + str(len(stream)).encode() + b" >>\nstream\n" + stream + b"\nendstream",
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref_offset = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n".encode()
+    out += b"0000000000 65535 f \n"
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref_offset}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+def resident_memory_bytes() -> Optional[int]:
+    """Return the current resident set size of this process, if known."""
+    try:
+        with open("/proc/self/statm") as f:
+            resident_pages = int(f.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
+
+
+def _model_parameter_bytes(models: Any) -> Optional[int]:
+    """Sum the parameter sizes of any torch modules in the model list."""
+    total = 0
+    found = False
+    for model in models or []:
+        parameters = getattr(model, "parameters", None)
+        if not callable(parameters):
+            continue
+        try:
+            for param in parameters():
+                total += param.numel() * param.element_size()
+            found = True
+        except Exception:
+            continue
+    return total if found else None
+
+
+class MarkerModelRegistry:
+    """
+    Process-wide holder for the Marker model list.
+
+    Models are loaded once, either eagerly at server startup or lazily on
+    first use, and stay resident until explicitly unloaded.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._models = None
+        self.load_count = 0
+        self.loaded_at: Optional[float] = None
+        self.load_time_seconds: Optional[float] = None
+        self.warmup_time_seconds: Optional[float] = None
+        self.resident_delta_bytes: Optional[int] = None
+        self.model_bytes: Optional[int] = None
+
+    @property
+    def loaded(self) -> bool:
+        """Whether models are currently resident."""
+        return self._models is not None
+
+    def get(self):
+        """Return the resident models, loading them on first use."""
+        models = self._models
+        if models is not None:
+            return models
+        return self.load()
+
+    def load(self):
+        """Load the models if they are not resident yet and return them."""
+        with self._lock:
+            if self._models is not None:
+                return self._models
+
+            from marker.models import load_all_models
+
+            rss_before = resident_memory_bytes()
+            start = time.perf_counter()
+            models = load_all_models()
+            self.load_time_seconds = time.perf_counter() - start
+            rss_after = resident_memory_bytes()
+
+            if rss_before is not None and rss_after is not None:
+                self.resident_delta_bytes = max(rss_after - rss_before, 0)
+            self.model_bytes = _model_parameter_bytes(models)
+            self.loaded_at = time.time()
+            self.load_count += 1
+            self._models = models
+            return models
+
+    def unload(self) -> bool:
+        """Drop the resident models. Returns False if nothing was loaded."""
+        with self._lock:
+            if self._models is None:
+                return False
+            self._models = None
+            self.loaded_at = None
+            self.warmup_time_seconds = None
+
+        gc.collect()
+        try:
+            import torch
+            if torch.cuda.is_available():
+                torch.cuda.empty_cache()
+        except ImportError:
+            pass
+        return True
+
+    def reload(self):
+        """Unload and load the models again."""
+        self.unload()
+        return self.load()
+
+    def warm_up(self, batch_size: int = 1) -> float:
+        """
+        Run one conversion on a tiny built-in page.
+
+        The first inference initializes lazy kernels and allocator pools, so
+        doing it at startup keeps that cost out of the first real request.
+
+        Returns:
+            Warm-up duration in seconds
+        """
+        from marker.convert import convert_single_pdf
+
+        models = self.get()
+        pdf_bytes = build_text_pdf(["OCR MCP warm-up page", "The quick brown fox."])
+
+        with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+            tmp.write(pdf_bytes)
+            tmp_path = tmp.name
+
+        try:
+            start = time.perf_counter()
+            convert_single_pdf(tmp_path, models, batch_size=batch_size)
+            self.warmup_time_seconds = time.perf_counter() - start
+        finally:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+
+        return self.warmup_time_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        """Return load timings and memory usage."""
+        return {
+            "loaded": self.loaded,
+            "load_count": self.load_count,
+            "loaded_at": self.loaded_at,
+            "load_time_seconds": self.load_time_seconds,
+            "warmup_time_seconds": self.warmup_time_seconds,
+            "model_bytes": self.model_bytes,
+            "resident_delta_bytes": self.resident_delta_bytes,
+            "process_resident_bytes": resident_memory_bytes(),
+        }
+
+
+# Shared by every MarkerBackend instance in this process
+model_registry = MarkerModelRegistry()
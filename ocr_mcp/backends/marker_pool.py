@@ -0,0 +1,269 @@
+import asyncio
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple
+
+from .marker_models import model_registry
+
+
+def _init_worker(warmup_batch_size: Optional[int] = None) -> None:
+    """Load models once when a worker process is spawned, warming up if asked."""
+    model_registry.load()
+    if warmup_batch_size is not None:
+        model_registry.warm_up(warmup_batch_size)
+
+
+def _warm_worker(batch_size: int, warmup: bool) -> Dict[str, Any]:
+    """Make sure models are resident in this worker and optionally warm up."""
+    model_registry.get()
+    if warmup and model_registry.warmup_time_seconds is None:
+        model_registry.warm_up(batch_size)
+    return {"pid": os.getpid(), **model_registry.stats()}
+
+
+def _convert(
+    file_path: str,
+    batch_size: int,
+    max_pages: Optional[int] = None
+) -> Tuple[str, int, Dict[str, Any], Dict[str, float]]:
+    """
+    Run one blocking Marker conversion with the resident models.
+
+    Runs inside a worker thread or process, so only picklable values are
+    returned: the text, the number of pages, Marker's metadata and the
+    seconds spent loading models (0 when resident) and converting.
+    """
+    from marker.convert import convert_single_pdf
+
+    kwargs = {"batch_size": batch_size}
+    if max_pages is not None:
+        kwargs["max_pages"] = max_pages
+
+    start = time.perf_counter()
+    models = model_registry.get()
+    loaded = time.perf_counter()
+    full_text, images, out_meta = convert_single_pdf(file_path, models, **kwargs)
+    timings = {
+        "model_load": loaded - start,
+        "convert": time.perf_counter() - loaded,
+    }
+    return full_text, len(images), out_meta, timings
+
+
+class MarkerWorkerPool:
+    """
+    Runs Marker conversions off the event loop.
+
+    In ``thread`` mode conversions share the models resident in this
+    process. In ``process`` mode every worker process loads its own copy of
+    the models when it is spawned, so conversions run in parallel across
+    cores. At most ``workers + queue_size`` conversions are admitted at
+    once; further callers wait up to ``queue_timeout`` seconds for a slot
+    and are rejected after that.
+    """
+
+    def __init__(
+        self,
+        mode: str = "thread",
+        workers: int = 1,
+        queue_size: int = 4,
+        queue_timeout: float = 30.0
+    ):
+        if mode not in ("thread", "process"):
+            raise ValueError(f"Unknown Marker executor mode: {mode}")
+
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+
+        self._executor: Optional[Executor] = None
+        # Passed to the initializer of worker processes spawned after start()
+        self._warmup_batch_size: Optional[int] = None
+        self._executor_lock = threading.Lock()
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._counter_lock = threading.Lock()
+
+        self.admitted = 0
+        self.running = 0
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        with self._executor_lock:
+            if self._executor is None:
+                if self.mode == "process":
+                    self._executor = ProcessPoolExecutor(
+                        max_workers=self.workers,
+                        mp_context=multiprocessing.get_context("spawn"),
+                        initializer=_init_worker,
+                        initargs=(self._warmup_batch_size,)
+                    )
+                else:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.workers,
+                        thread_name_prefix="marker"
+                    )
+            return self._executor
+
+    def _get_slots(self) -> asyncio.Semaphore:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.workers + self.queue_size)
+        return self._slots
+
+    def _submit(self, fn, *args):
+        try:
+            return self._get_executor().submit(fn, *args)
+        except BrokenProcessPool:
+            # A worker died earlier; start a fresh pool and try once more
+            self._discard_executor()
+            return self._get_executor().submit(fn, *args)
+
+    async def _run(self, fn, *args):
+        """Admit a job, run it on the executor and release its slot when done."""
+        slots = self._get_slots()
+        try:
+            await asyncio.wait_for(slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.rejected += 1
+            raise RuntimeError(
+                f"Marker queue is full ({self.workers} running, "
+                f"{self.queue_size} queued); try again later"
+            )
+
+        loop = asyncio.get_running_loop()
+        self.admitted += 1
+
+        def tracked(*call_args):
+            with self._counter_lock:
+                self.running += 1
+            try:
+                return fn(*call_args)
+            finally:
+                with self._counter_lock:
+                    self.running -= 1
+
+        # Thread workers can update the counters directly; process workers
+        # cannot, so running jobs are only tracked in thread mode.
+        target = tracked if self.mode == "thread" else fn
+
+        try:
+            future = self._submit(target, *args)
+        except BaseException:
+            self.admitted -= 1
+            slots.release()
+            raise
+
+        # The slot is held until the job has really finished, even if the
+        # caller stops waiting, so the queue bound stays accurate. The
+        # in-flight count is released together with it so stats match the
+        # slots actually in use.
+        def release_slot():
+            self.admitted -= 1
+            slots.release()
+
+        def release(_):
+            loop.call_soon_threadsafe(release_slot)
+
+        future.add_done_callback(release)
+
+        try:
+            result = await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Pending jobs are dropped from the queue; a job that already
+            # started runs to completion and its result is discarded.
+            future.cancel()
+            self.cancelled += 1
+            raise
+        except BrokenProcessPool:
+            self.failed += 1
+            self._discard_executor()
+            raise RuntimeError("Marker worker process died during conversion")
+        except Exception:
+            self.failed += 1
+            raise
+
+        self.completed += 1
+        return result
+
+    async def convert(
+        self,
+        file_path: str,
+        batch_size: int = 1,
+        max_pages: Optional[int] = None
+    ) -> Tuple[str, int, Dict[str, Any], Dict[str, float]]:
+        """
+        Convert a PDF on the pool.
+
+        Returns:
+            Tuple of (text, pages processed, Marker metadata, seconds spent
+            on model loading and conversion in the worker)
+        """
+        return await self._run(_convert, file_path, batch_size, max_pages)
+
+    async def start(self, batch_size: int = 1, warmup: bool = True) -> list[Dict[str, Any]]:
+        """
+        Spawn the workers and load their models ahead of the first request.
+
+        In ``process`` mode the loading and warm-up happen in the worker
+        initializer, so every process the pool starts (including
+        replacements after a crash) is ready before it takes a job.
+
+        Returns:
+            Model statistics, one entry per distinct worker process that
+            reported. The executor decides which process runs each stats
+            job, so fewer than ``workers`` entries may come back.
+        """
+        if self.mode == "process" and warmup:
+            self._warmup_batch_size = batch_size
+        executor = self._get_executor()
+        loop = asyncio.get_running_loop()
+        if self.mode == "thread":
+            jobs = [loop.run_in_executor(executor, _warm_worker, batch_size, warmup)]
+        else:
+            # No process is idle while the initializers run, so each
+            # submission starts another process up to the pool size
+            jobs = [
+                loop.run_in_executor(executor, _warm_worker, batch_size, warmup)
+                for _ in range(self.workers)
+            ]
+        by_pid = {}
+        for stats in await asyncio.gather(*jobs):
+            by_pid.setdefault(stats["pid"], stats)
+        return list(by_pid.values())
+
+    def _discard_executor(self) -> None:
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the workers. Process workers release their models on exit."""
+        with self._executor_lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait, cancel_futures=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return pool configuration and job counters."""
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "queue_size": self.queue_size,
+            "queue_timeout": self.queue_timeout,
+            "started": self._executor is not None,
+            "in_flight": self.admitted,
+            "running": self.running if self.mode == "thread" else None,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+            "rejected": self.rejected,
+        }
+
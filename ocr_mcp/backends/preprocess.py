@@ -0,0 +1,251 @@
+"""Shrink images before they are uploaded to a vision API."""
+
+import asyncio
+import io
+import mmap
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional
+
+from PIL import Image, ImageOps
+
+from ..fileio import Buffer
+
+
+# Magic numbers of the formats we expect to see, checked in order
+SIGNATURES = [
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"GIF87a", "image/gif"),
+    (b"GIF89a", "image/gif"),
+    (b"II*\x00", "image/tiff"),
+    (b"MM\x00*", "image/tiff"),
+    (b"BM", "image/bmp"),
+    (b"%PDF-", "application/pdf"),
+]
+
+OUTPUT_FORMATS = {
+    "jpeg": ("JPEG", "image/jpeg"),
+    "webp": ("WEBP", "image/webp"),
+}
+
+# Resolution PDF pages are rendered at when a backend needs them as images
+PDF_RENDER_DPI = 150
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+
+def sniff_mime(data: Buffer) -> str:
+    """Detect the media type from the leading bytes of a file."""
+    head = bytes(data[:16])
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "image/webp"
+    for signature, mime in SIGNATURES:
+        if head.startswith(signature):
+            return mime
+    return "application/octet-stream"
+
+
+def parse_image_options(value: str) -> Dict[str, str]:
+    """Parse ``"max_edge=1600,format=webp"`` into a dict of strings."""
+    options = {}
+    for item in value.split(","):
+        name, sep, option = item.partition("=")
+        if sep and name.strip():
+            options[name.strip().lower()] = option.strip()
+    return options
+
+
+def _as_bool(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+@dataclass
+class ImageOptions:
+    """How a backend wants its images prepared."""
+    enabled: bool = True
+    max_edge: int = 2048  # longest side in pixels, 0 = no limit
+    max_dpi: int = 0  # resample above this resolution, 0 = no limit
+    grayscale: bool = False
+    format: str = "jpeg"  # jpeg, webp or original
+    quality: int = 85
+
+    @classmethod
+    def from_config(cls, config: Optional[Dict[str, Any]]) -> "ImageOptions":
+        """Build options from a backend config dict whose values may be strings."""
+        config = config or {}
+        defaults = cls()
+        return cls(
+            enabled=_as_bool(config.get("enabled", defaults.enabled)),
+            max_edge=int(config.get("max_edge", defaults.max_edge)),
+            max_dpi=int(config.get("max_dpi", defaults.max_dpi)),
+            grayscale=_as_bool(config.get("grayscale", defaults.grayscale)),
+            format=str(config.get("format", defaults.format)).lower(),
+            quality=int(config.get("quality", defaults.quality)),
+        )
+
+
+@dataclass
+class PreparedImage:
+    """Image bytes ready to send, with their media type."""
+    data: Buffer
+    mime: str
+    metadata: Dict[str, Any] = field(default_factory=dict)
+
+
+def _scale_factor(image: Image.Image, options: ImageOptions) -> float:
+    scale = 1.0
+    if options.max_edge > 0:
+        scale = min(scale, options.max_edge / max(image.size))
+    if options.max_dpi > 0:
+        dpi = image.info.get("dpi")
+        if dpi and dpi[0]:
+            scale = min(scale, options.max_dpi / float(dpi[0]))
+    return scale
+
+
+def _as_stream(data: Buffer) -> Any:
+    """File-like view of the data; a memory map is read in place."""
+    if isinstance(data, mmap.mmap):
+        data.seek(0)
+        return data
+    return io.BytesIO(data)
+
+
+def render_pdf_page(data: Buffer, dpi: int = PDF_RENDER_DPI) -> Image.Image:
+    """
+    Render the first page of a PDF to an image.
+
+    Uses pypdfium2, which Marker already depends on.
+
+    Raises:
+        ImportError: If pypdfium2 is not installed
+    """
+    import pypdfium2
+
+    document = pypdfium2.PdfDocument(bytes(data))
+    try:
+        page = document[0]
+        try:
+            image = page.render(scale=dpi / 72).to_pil()
+        finally:
+            page.close()
+    finally:
+        document.close()
+    image.info["dpi"] = (dpi, dpi)
+    return image
+
+
+def preprocess_image(
+    data: Buffer,
+    options: ImageOptions,
+    render_pdf: bool = False
+) -> PreparedImage:
+    """
+    Downscale, optionally convert to grayscale and re-encode an image.
+
+    EXIF orientation is applied before the metadata is dropped, and only the
+    first frame of animated or multi-page images is kept. Input that is not
+    an image (e.g. a PDF) is passed through with its sniffed media type,
+    unless ``render_pdf`` is set: then the first page of a PDF is rendered
+    at ``PDF_RENDER_DPI`` and prepared like any other image. If re-encoding
+    would not make an unscaled image smaller, the original bytes are sent
+    instead.
+
+    Args:
+        data: Raw file bytes or a memory-mapped file
+        options: Preprocessing options of the backend
+        render_pdf: Turn a PDF page into an image
+
+    Returns:
+        PreparedImage with the bytes to upload and what was done to them
+
+    Raises:
+        ImportError: If a PDF is to be rendered but pypdfium2 is missing
+    """
+    start = time.perf_counter()
+    mime = sniff_mime(data)
+    metadata: Dict[str, Any] = {"original_format": mime, "original_bytes": len(data)}
+    rendered = render_pdf and mime == "application/pdf"
+
+    if not rendered and (not options.enabled or not mime.startswith("image/")):
+        metadata.update(format=mime, bytes=len(data), saved_bytes=0, applied=False)
+        metadata["seconds"] = round(time.perf_counter() - start, 4)
+        return PreparedImage(data=data, mime=mime, metadata=metadata)
+
+    if rendered:
+        image = render_pdf_page(data)
+        metadata["original_size"] = list(image.size)
+        metadata["rendered_dpi"] = PDF_RENDER_DPI
+        # A rendered page has no original image bytes to fall back to
+        mime = "image/png"
+    else:
+        with Image.open(_as_stream(data)) as opened:
+            metadata["original_size"] = list(opened.size)
+            image = ImageOps.exif_transpose(opened)
+            image.load()
+
+    scale = _scale_factor(image, options) if options.enabled else 1.0
+    if scale < 1.0:
+        size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+        image = image.resize(size, Image.Resampling.LANCZOS)
+
+    if options.enabled and options.grayscale:
+        image = image.convert("L")
+    elif image.mode not in ("RGB", "L"):
+        # Flatten transparency onto white; the OCR models read dark-on-light
+        rgba = image.convert("RGBA")
+        image = Image.new("RGB", rgba.size, (255, 255, 255))
+        image.paste(rgba, mask=rgba.getchannel("A"))
+
+    if options.enabled and options.format in OUTPUT_FORMATS:
+        pil_format, out_mime = OUTPUT_FORMATS[options.format]
+    else:
+        pil_format = Image.registered_extensions().get(
+            f".{mime.split('/')[1]}", "PNG"
+        )
+        out_mime = mime
+
+    buffer = io.BytesIO()
+    # Saving without exif/icc_profile drops the original metadata
+    image.save(buffer, format=pil_format, quality=options.quality, optimize=True)
+    encoded = buffer.getvalue()
+
+    if not rendered and scale >= 1.0 and not options.grayscale and len(encoded) >= len(data):
+        encoded, out_mime = data, mime
+
+    metadata.update(
+        format=out_mime,
+        bytes=len(encoded),
+        saved_bytes=len(data) - len(encoded),
+        size=list(image.size),
+        applied=encoded is not data,
+    )
+    metadata["seconds"] = round(time.perf_counter() - start, 4)
+    return PreparedImage(data=encoded, mime=out_mime, metadata=metadata)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=min(4, os.cpu_count() or 1),
+            thread_name_prefix="ocr-preprocess"
+        )
+    return _executor
+
+
+async def prepare_image(
+    data: Buffer,
+    options: ImageOptions,
+    render_pdf: bool = False
+) -> PreparedImage:
+    """Run ``preprocess_image`` on the preprocessing thread pool."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _get_executor(), preprocess_image, data, options, render_pdf
+    )
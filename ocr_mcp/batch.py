@@ -0,0 +1,98 @@
+"""Run many files through the OCR pipeline in one call."""
+
+import asyncio
+import glob
+import os
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .backends.base import OCRResult
+
+
+def expand_paths(
+    file_paths: Optional[List[str]] = None,
+    pattern: Optional[str] = None
+) -> List[str]:
+    """
+    Combine explicit paths and a glob pattern into a list of files.
+
+    Duplicates are dropped and order is preserved; directories matched by
+    the pattern are skipped.
+    """
+    paths = list(file_paths or [])
+    if pattern:
+        paths.extend(
+            path for path in sorted(glob.glob(os.path.expanduser(pattern), recursive=True))
+            if os.path.isfile(path)
+        )
+
+    seen = set()
+    unique = []
+    for path in paths:
+        if path not in seen:
+            seen.add(path)
+            unique.append(path)
+    return unique
+
+
+async def run_batch(
+    file_paths: List[str],
+    process: Callable[[str], Awaitable[OCRResult]],
+    concurrency: int = 4,
+    include_text: bool = True
+) -> Dict[str, Any]:
+    """
+    OCR every file with at most ``concurrency`` files in flight.
+
+    Args:
+        file_paths: Files to process
+        process: Coroutine that OCRs one file
+        concurrency: Files processed at the same time
+        include_text: Include the extracted text in each item
+
+    Returns:
+        Summary with one item per file, in input order
+    """
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    start = time.perf_counter()
+
+    async def run(path: str) -> Dict[str, Any]:
+        async with semaphore:
+            item_start = time.perf_counter()
+            if not os.path.isfile(path):
+                result = OCRResult(text="", backend="none", error="File not found")
+            else:
+                try:
+                    result = await process(path)
+                except Exception as e:
+                    result = OCRResult(
+                        text="",
+                        backend="none",
+                        error=f"Processing failed: {str(e)}"
+                    )
+
+        item = {
+            "file_path": path,
+            "ok": result.error is None,
+            "backend": result.backend,
+            "seconds": round(time.perf_counter() - item_start, 3),
+        }
+        if result.error:
+            item["error"] = result.error
+        else:
+            item["characters"] = len(result.text)
+            if result.confidence is not None:
+                item["confidence"] = result.confidence
+            if include_text:
+                item["text"] = result.text
+        return item
+
+    items = await asyncio.gather(*(run(path) for path in file_paths))
+    succeeded = sum(1 for item in items if item["ok"])
+    return {
+        "total": len(items),
+        "succeeded": succeeded,
+        "failed": len(items) - succeeded,
+        "seconds": round(time.perf_counter() - start, 3),
+        "items": items,
+    }
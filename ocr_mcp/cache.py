@@ -0,0 +1,564 @@
+"""Content-addressed cache for OCR results."""
+
+import argparse
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from importlib import metadata
+from typing import Any, Dict, List, Optional
+
+from .backends.api import BATCH_PROMPT, OCR_PROMPT
+from .backends.base import OCRResult
+from .backends.deepseek import DeepSeekBackend
+from .backends.mistral import MistralBackend
+from .backends.preprocess import PDF_RENDER_DPI
+from .config import settings
+
+
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Settings that change the text a request produces; results made under
+# other values are not served
+OUTPUT_SETTINGS = (
+    "ENABLED_BACKENDS",
+    "DEFAULT_BACKEND",
+    "TEXT_LAYER_ENABLED",
+    "TEXT_LAYER_MIN_CHARS",
+    "TEXT_LAYER_MAX_IMAGE_COVERAGE",
+    "PAGE_SPLIT_ENABLED",
+    "PAGE_SPLIT_MIN_PAGES",
+    "PAGE_CHUNK_SIZE",
+    "PAGE_BATCH_SIZE",
+    "PAGE_REUSE_ENABLED",
+    "IMAGE_PREPROCESS",
+    "IMAGE_MAX_EDGE",
+    "IMAGE_MAX_DPI",
+    "IMAGE_GRAYSCALE",
+    "IMAGE_FORMAT",
+    "IMAGE_QUALITY",
+    "MISTRAL_IMAGE_OPTIONS",
+    "DEEPSEEK_IMAGE_OPTIONS",
+    "MARKER_BATCH_SIZE",
+)
+
+
+def hash_content(file_path: Optional[str] = None, image_data: Optional[bytes] = None) -> str:
+    """Return the SHA-256 of a file (read in chunks) or of raw bytes."""
+    digest = hashlib.sha256()
+    if file_path:
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+                digest.update(chunk)
+    elif image_data is not None:
+        digest.update(image_data)
+    return digest.hexdigest()
+
+
+def make_key(content_hash: str, backend: Optional[str], options: Optional[Dict[str, Any]] = None) -> str:
+    """Combine content hash, backend and options into a cache key."""
+    options_json = json.dumps(options or {}, sort_keys=True, default=str)
+    suffix = hashlib.sha256(f"{backend or 'auto'}|{options_json}".encode()).hexdigest()[:16]
+    return f"{content_hash}:{suffix}"
+
+
+def _package_version(name: str) -> Optional[str]:
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+
+def output_fingerprint() -> str:
+    """
+    Short hash of everything besides the input that shapes OCR output.
+
+    Covers the API models and prompts, the installed Marker version and
+    ``OUTPUT_SETTINGS``. Read on every call, so a configuration reload
+    takes effect immediately.
+    """
+    state = {
+        "models": {"mistral": MistralBackend.model, "deepseek": DeepSeekBackend.model},
+        "prompts": [OCR_PROMPT, BATCH_PROMPT],
+        "render_dpi": PDF_RENDER_DPI,
+        "marker": _package_version("marker-pdf"),
+        "settings": {name: getattr(settings, name) for name in OUTPUT_SETTINGS},
+    }
+    data = json.dumps(state, sort_keys=True, default=str).encode("utf-8")
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+class ResultCache:
+    """
+    Two-tier OCR result cache.
+
+    A small in-memory LRU sits in front of a SQLite database holding
+    zlib-compressed results. Entries expire after ``ttl_seconds``; when the
+    database grows past ``max_size_bytes`` the least recently used entries
+    are evicted.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        ttl_seconds: float = 7 * 24 * 3600,
+        max_size_bytes: int = 500 * 1024 * 1024,
+        memory_entries: int = 128
+    ):
+        self.directory = os.path.expanduser(directory)
+        self.path = os.path.join(self.directory, "results.sqlite3")
+        self.ttl_seconds = ttl_seconds
+        self.max_size_bytes = max_size_bytes
+        self.memory_entries = memory_entries
+
+        self._memory: "OrderedDict[str, tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    backend TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    size INTEGER NOT NULL,
+                    data BLOB NOT NULL
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS results_accessed ON results (accessed_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def _expired(self, created_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - created_at > self.ttl_seconds
+
+    def _remember(self, key: str, created_at: float, data: Dict[str, Any]) -> None:
+        if self.memory_entries <= 0:
+            return
+        self._memory[key] = (created_at, data)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    @staticmethod
+    def _to_result(data: Dict[str, Any], tier: str, created_at: float) -> OCRResult:
+        metadata = dict(data.get("metadata") or {})
+        metadata.update({
+            "cache_hit": True,
+            "cache_tier": tier,
+            "cached_at": created_at,
+        })
+        return OCRResult(
+            text=data["text"],
+            backend=data["backend"],
+            confidence=data.get("confidence"),
+            metadata=metadata
+        )
+
+    def get(self, key: str) -> Optional[OCRResult]:
+        """Return the cached result for a key, or None."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                created_at, data = entry
+                if not self._expired(created_at, now):
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return self._to_result(data, "memory", created_at)
+                del self._memory[key]
+
+            db = self._db()
+            row = db.execute(
+                "SELECT created_at, data FROM results WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+
+            created_at, blob = row
+            if self._expired(created_at, now):
+                db.execute("DELETE FROM results WHERE key = ?", (key,))
+                db.commit()
+                self.misses += 1
+                return None
+
+            db.execute(
+                "UPDATE results SET accessed_at = ?, hits = hits + 1 WHERE key = ?",
+                (now, key)
+            )
+            db.commit()
+            data = json.loads(zlib.decompress(blob))
+            self._remember(key, created_at, data)
+            self.disk_hits += 1
+            return self._to_result(data, "disk", created_at)
+
+    def put(self, key: str, result: OCRResult) -> None:
+        """Store a successful result."""
+        if result.error is not None:
+            return
+
+        data = result.to_dict()
+        blob = zlib.compress(json.dumps(data).encode("utf-8"))
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT OR REPLACE INTO results "
+                "(key, backend, created_at, accessed_at, hits, size, data) "
+                "VALUES (?, ?, ?, ?, 0, ?, ?)",
+                (key, result.backend, now, now, len(blob), blob)
+            )
+            db.commit()
+            self._remember(key, now, data)
+            self._evict(db)
+
+    def _evict(self, db: sqlite3.Connection) -> None:
+        """Drop expired entries, then least recently used ones over the size cap."""
+        if self.ttl_seconds > 0:
+            cursor = db.execute(
+                "DELETE FROM results WHERE created_at < ?",
+                (time.time() - self.ttl_seconds,)
+            )
+            self.evictions += cursor.rowcount
+
+        if self.max_size_bytes > 0:
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+            if total > self.max_size_bytes:
+                rows = db.execute(
+                    "SELECT key, size FROM results ORDER BY accessed_at ASC"
+                ).fetchall()
+                for key, size in rows:
+                    if total <= self.max_size_bytes:
+                        break
+                    db.execute("DELETE FROM results WHERE key = ?", (key,))
+                    self._memory.pop(key, None)
+                    total -= size
+                    self.evictions += 1
+        db.commit()
+
+    def purge(self, expired_only: bool = False) -> int:
+        """
+        Remove entries from both tiers.
+
+        Args:
+            expired_only: Only remove entries past their TTL
+
+        Returns:
+            Number of persistent entries removed
+        """
+        with self._lock:
+            db = self._db()
+            if expired_only:
+                if self.ttl_seconds <= 0:
+                    return 0
+                cutoff = time.time() - self.ttl_seconds
+                cursor = db.execute("DELETE FROM results WHERE created_at < ?", (cutoff,))
+                for key in [k for k, (created, _) in self._memory.items() if created < cutoff]:
+                    del self._memory[key]
+            else:
+                cursor = db.execute("DELETE FROM results")
+                self._memory.clear()
+            db.commit()
+            removed = cursor.rowcount
+            if not expired_only:
+                db.execute("VACUUM")
+            return removed
+
+    def entries(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """List the most recently used persistent entries."""
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT key, backend, created_at, accessed_at, hits, size "
+                "FROM results ORDER BY accessed_at DESC LIMIT ?",
+                (limit,)
+            ).fetchall()
+        return [
+            {
+                "key": key,
+                "backend": backend,
+                "created_at": created_at,
+                "accessed_at": accessed_at,
+                "hits": hits,
+                "size_bytes": size,
+            }
+            for key, backend, created_at, accessed_at, hits, size in rows
+        ]
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit counters and tier sizes."""
+        with self._lock:
+            count, size = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+            memory_count = len(self._memory)
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            "path": self.path,
+            "entries": count,
+            "size_bytes": size,
+            "max_size_bytes": self.max_size_bytes,
+            "ttl_seconds": self.ttl_seconds,
+            "memory_entries": memory_count,
+            "memory_max_entries": self.memory_entries,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": (self.memory_hits + self.disk_hits) / lookups if lookups else None,
+            "evictions": self.evictions,
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class PageStore:
+    """
+    OCR text of single PDF pages, keyed by page fingerprint.
+
+    Lets a new revision of a document reuse the text of every page that
+    did not change. Lives in the cache directory next to the result cache
+    and expires entries after the same TTL.
+    """
+
+    def __init__(self, directory: str, ttl_seconds: float = 7 * 24 * 3600):
+        self.directory = os.path.expanduser(directory)
+        self.path = os.path.join(self.directory, "pages.sqlite3")
+        self.ttl_seconds = ttl_seconds
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+        self.reused = 0
+        self.stored = 0
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS pages (
+                    fingerprint TEXT NOT NULL,
+                    requested TEXT NOT NULL,
+                    backend TEXT NOT NULL,
+                    confidence REAL,
+                    created_at REAL NOT NULL,
+                    text BLOB NOT NULL,
+                    PRIMARY KEY (fingerprint, requested)
+                )
+                """
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_many(
+        self,
+        fingerprints: List[str],
+        requested: Optional[str]
+    ) -> Dict[str, OCRResult]:
+        """
+        Look up stored pages.
+
+        Args:
+            fingerprints: Page fingerprints to look up
+            requested: Backend the request asked for, or None for automatic
+                selection, optionally qualified by ``output_fingerprint``;
+                pages are only reused for the same choice
+
+        Returns:
+            Results of the pages found, by fingerprint
+        """
+        if not fingerprints:
+            return {}
+        cutoff = time.time() - self.ttl_seconds if self.ttl_seconds > 0 else 0
+        found = {}
+        with self._lock:
+            db = self._db()
+            unique = list(dict.fromkeys(fingerprints))
+            # Stay under SQLite's limit on bound parameters
+            for start in range(0, len(unique), 500):
+                batch = unique[start:start + 500]
+                rows = db.execute(
+                    "SELECT fingerprint, backend, confidence, text FROM pages "
+                    "WHERE requested = ? AND created_at >= ? "
+                    f"AND fingerprint IN ({','.join('?' * len(batch))})",
+                    (requested or "auto", cutoff, *batch)
+                ).fetchall()
+                for fingerprint, backend, confidence, blob in rows:
+                    found[fingerprint] = OCRResult(
+                        text=zlib.decompress(blob).decode("utf-8"),
+                        backend=backend,
+                        confidence=confidence
+                    )
+            self.reused += len(found)
+        return found
+
+    def put_many(self, pages: Dict[str, OCRResult], requested: Optional[str]) -> None:
+        """Store the results of single pages, by fingerprint."""
+        if not pages:
+            return
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            db.executemany(
+                "INSERT OR REPLACE INTO pages "
+                "(fingerprint, requested, backend, confidence, created_at, text) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        fingerprint,
+                        requested or "auto",
+                        result.backend,
+                        result.confidence,
+                        now,
+                        zlib.compress(result.text.encode("utf-8")),
+                    )
+                    for fingerprint, result in pages.items()
+                ]
+            )
+            if self.ttl_seconds > 0:
+                db.execute("DELETE FROM pages WHERE created_at < ?", (now - self.ttl_seconds,))
+            db.commit()
+            self.stored += len(pages)
+
+    def purge(self, expired_only: bool = False) -> int:
+        """Remove stored pages; only those past their TTL with ``expired_only``."""
+        with self._lock:
+            db = self._db()
+            if expired_only:
+                if self.ttl_seconds <= 0:
+                    return 0
+                cursor = db.execute(
+                    "DELETE FROM pages WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+            else:
+                cursor = db.execute("DELETE FROM pages")
+            db.commit()
+            return cursor.rowcount
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            count, size = self._db().execute(
+                "SELECT COUNT(*), COALESCE(SUM(LENGTH(text)), 0) FROM pages"
+            ).fetchone()
+        return {
+            "path": self.path,
+            "pages": count,
+            "size_bytes": size,
+            "reused": self.reused,
+            "stored": self.stored,
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+_cache: Optional[ResultCache] = None
+_page_store: Optional[PageStore] = None
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Return the process-wide cache, or None if caching is disabled."""
+    global _cache
+    if not settings.CACHE_ENABLED:
+        return None
+    if _cache is None:
+        _cache = ResultCache(
+            directory=settings.CACHE_DIR,
+            ttl_seconds=settings.CACHE_TTL_SECONDS,
+            max_size_bytes=settings.CACHE_MAX_SIZE_MB * 1024 * 1024,
+            memory_entries=settings.CACHE_MEMORY_ENTRIES
+        )
+    return _cache
+
+
+def get_page_store() -> Optional[PageStore]:
+    """Return the process-wide page store, or None if page reuse is off."""
+    global _page_store
+    if not (settings.CACHE_ENABLED and settings.PAGE_REUSE_ENABLED):
+        return None
+    if _page_store is None:
+        _page_store = PageStore(
+            directory=settings.CACHE_DIR,
+            ttl_seconds=settings.CACHE_TTL_SECONDS
+        )
+    return _page_store
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface to inspect and purge the cache."""
+    parser = argparse.ArgumentParser(
+        prog="ocr-mcp-cache",
+        description="Inspect or purge the OCR result cache."
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="Show cache size and location")
+    list_parser = commands.add_parser("list", help="List recently used entries")
+    list_parser.add_argument("--limit", type=int, default=20)
+    purge_parser = commands.add_parser("purge", help="Remove cached results")
+    purge_parser.add_argument(
+        "--expired",
+        action="store_true",
+        help="Only remove entries past their TTL"
+    )
+    args = parser.parse_args(argv)
+
+    cache = ResultCache(
+        directory=settings.CACHE_DIR,
+        ttl_seconds=settings.CACHE_TTL_SECONDS,
+        max_size_bytes=settings.CACHE_MAX_SIZE_MB * 1024 * 1024,
+        memory_entries=0
+    )
+    pages = PageStore(directory=settings.CACHE_DIR, ttl_seconds=settings.CACHE_TTL_SECONDS)
+    try:
+        if args.command == "stats":
+            output: Any = {**cache.stats(), "page_reuse": pages.stats()}
+        elif args.command == "list":
+            output = cache.entries(args.limit)
+        else:
+            output = {
+                "removed": cache.purge(expired_only=args.expired),
+                "removed_pages": pages.purge(expired_only=args.expired),
+            }
+    finally:
+        cache.close()
+        pages.close()
+
+    print(json.dumps(output, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,37 +1,225 @@
 import os
-from typing import List, Optional
-from pydantic_settings import BaseSettings
+from typing import Annotated, Any, Dict, List, Optional
+from pydantic import field_validator
+from pydantic_settings import BaseSettings, NoDecode, SettingsConfigDict
 
 
 class Settings(BaseSettings):
     """Configuration settings for OCR MCP server."""
     
+    # Values in a .env file are used unless the real environment overrides them
+    model_config = SettingsConfigDict(
+        env_file=os.getenv("OCR_MCP_ENV_FILE", ".env"),
+        extra="ignore"
+    )
+    
     # API Keys (optional - only required if backend is enabled)
     MISTRAL_API_KEY: Optional[str] = os.getenv("MISTRAL_API_KEY")
     DEEPSEEK_API_KEY: Optional[str] = os.getenv("DEEPSEEK_API_KEY")
+    # Chat-completions endpoint overrides (proxies, local benchmark servers)
+    MISTRAL_BASE_URL: str = os.getenv("MISTRAL_BASE_URL", "")
+    DEEPSEEK_BASE_URL: str = os.getenv("DEEPSEEK_BASE_URL", "")
     
     # Backend configuration
     # Default: marker (local) and mistral (API fallback)
-    ENABLED_BACKENDS: List[str] = os.getenv(
+    ENABLED_BACKENDS: Annotated[List[str], NoDecode] = os.getenv(
         "ENABLED_BACKENDS", 
         "marker,mistral"
     ).split(",")
     
     DEFAULT_BACKEND: str = os.getenv("DEFAULT_BACKEND", "marker")
     
+    # Transport: stdio (one client per process), sse or streamable-http
+    # (one shared server for many clients on MCP_HOST:MCP_PORT)
+    MCP_TRANSPORT: str = os.getenv("MCP_TRANSPORT", "stdio")
+    MCP_HOST: str = os.getenv("MCP_HOST", "127.0.0.1")
+    MCP_PORT: int = int(os.getenv("MCP_PORT", "8000"))
+    # OCR tool calls one client may run at once (0 = unlimited)
+    CLIENT_CONCURRENCY: int = int(os.getenv("CLIENT_CONCURRENCY", "0"))
+    # Seconds running tool calls get to finish when the server is stopped
+    SHUTDOWN_TIMEOUT: float = float(os.getenv("SHUTDOWN_TIMEOUT", "30"))
+    
     # Processing settings
     MAX_FILE_SIZE_MB: int = int(os.getenv("MAX_FILE_SIZE_MB", "50"))
+    # End-to-end budget of one request across all retries and fallbacks
+    # (0 = no deadline)
     TIMEOUT_SECONDS: int = int(os.getenv("TIMEOUT_SECONDS", "120"))
     
+    # Page splitting: OCR large PDFs as concurrent page chunks
+    PAGE_SPLIT_ENABLED: bool = os.getenv("PAGE_SPLIT_ENABLED", "false").lower() == "true"
+    # Only split documents with at least this many pages
+    PAGE_SPLIT_MIN_PAGES: int = int(os.getenv("PAGE_SPLIT_MIN_PAGES", "8"))
+    PAGE_CHUNK_SIZE: int = int(os.getenv("PAGE_CHUNK_SIZE", "4"))
+    # Chunks processed at the same time
+    PAGE_PARALLELISM: int = int(os.getenv("PAGE_PARALLELISM", "4"))
+    # Extra attempts for a chunk that failed on every backend
+    PAGE_CHUNK_RETRIES: int = int(os.getenv("PAGE_CHUNK_RETRIES", "1"))
+    # Pages packed into one vision API request (1 = one page per request);
+    # batches also stay under a payload size and a completion token budget
+    PAGE_BATCH_SIZE: int = int(os.getenv("PAGE_BATCH_SIZE", "1"))
+    PAGE_BATCH_MAX_MB: float = float(os.getenv("PAGE_BATCH_MAX_MB", "20"))
+    PAGE_BATCH_MAX_TOKENS: int = int(os.getenv("PAGE_BATCH_MAX_TOKENS", "16000"))
+    
+    # Take text straight from born-digital PDF pages; only OCR the rest
+    TEXT_LAYER_ENABLED: bool = os.getenv("TEXT_LAYER_ENABLED", "true").lower() == "true"
+    # Non-whitespace characters a page needs for its text layer to be used
+    TEXT_LAYER_MIN_CHARS: int = int(os.getenv("TEXT_LAYER_MIN_CHARS", "25"))
+    # Pages with more of their area covered by images are scans (possibly
+    # with a stamped header or an old OCR layer) and are OCR'd anyway
+    TEXT_LAYER_MAX_IMAGE_COVERAGE: float = float(os.getenv("TEXT_LAYER_MAX_IMAGE_COVERAGE", "0.5"))
+    
+    # Streaming: when a client sends a progress token, split every
+    # multi-page PDF and report each chunk as it finishes. Off by default,
+    # since splitting changes what the backends see and costs more calls
+    STREAM_PAGES: bool = os.getenv("STREAM_PAGES", "false").lower() == "true"
+    STREAM_CHUNK_SIZE: int = int(os.getenv("STREAM_CHUNK_SIZE", "1"))
+    # Include the text of finished pages in progress notifications
+    STREAM_PARTIAL_TEXT: bool = os.getenv("STREAM_PARTIAL_TEXT", "true").lower() == "true"
+    
+    # Per-backend concurrency limits, e.g. "marker=2,mistral=8"
+    BACKEND_CONCURRENCY: str = os.getenv("BACKEND_CONCURRENCY", "")
+    # Limit for backends not listed above (0 = unlimited)
+    BACKEND_CONCURRENCY_DEFAULT: int = int(os.getenv("BACKEND_CONCURRENCY_DEFAULT", "0"))
+    
+    # Batch tool settings
+    BATCH_CONCURRENCY: int = int(os.getenv("BATCH_CONCURRENCY", "4"))
+    BATCH_MAX_FILES: int = int(os.getenv("BATCH_MAX_FILES", "500"))
+    
+    # Hedged requests: start the next backend when the current one is slow
+    HEDGING_ENABLED: bool = os.getenv("HEDGING_ENABLED", "false").lower() == "true"
+    # Hedge delay used until enough latency samples have been observed
+    HEDGE_DELAY_SECONDS: float = float(os.getenv("HEDGE_DELAY_SECONDS", "10"))
+    # Observed latency percentile used as the hedge delay
+    HEDGE_PERCENTILE: float = float(os.getenv("HEDGE_PERCENTILE", "95"))
+    HEDGE_MIN_SAMPLES: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+    # Upper bound on extra backend calls per request, to cap API spend
+    HEDGE_MAX_FRACTION: float = float(os.getenv("HEDGE_MAX_FRACTION", "0.1"))
+    
+    # Backend health tracking and circuit breakers
+    HEALTH_WINDOW: int = int(os.getenv("HEALTH_WINDOW", "50"))
+    HEALTH_EWMA_ALPHA: float = float(os.getenv("HEALTH_EWMA_ALPHA", "0.2"))
+    # Try healthy backends fastest first instead of in configured order
+    HEALTH_LATENCY_ORDERING: bool = os.getenv("HEALTH_LATENCY_ORDERING", "false").lower() == "true"
+    # Consecutive failures that open a backend's circuit
+    BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "3"))
+    # Seconds an open circuit skips the backend before probing it again
+    BREAKER_OPEN_SECONDS: float = float(os.getenv("BREAKER_OPEN_SECONDS", "30"))
+    BREAKER_HALF_OPEN_PROBES: int = int(os.getenv("BREAKER_HALF_OPEN_PROBES", "1"))
+    
+    # Seconds a configuration reload waits for in-flight requests
+    RELOAD_DRAIN_TIMEOUT: float = float(os.getenv("RELOAD_DRAIN_TIMEOUT", "60"))
+    
+    # Serve ocr_stats in the Prometheus text format on this port (0 = off)
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0"))
+    METRICS_HOST: str = os.getenv("METRICS_HOST", "127.0.0.1")
+    
     # Marker settings
     MARKER_BATCH_SIZE: int = int(os.getenv("MARKER_BATCH_SIZE", "1"))
+    # Load models at startup instead of on the first request
+    MARKER_PRELOAD: bool = os.getenv("MARKER_PRELOAD", "false").lower() == "true"
+    # Run one conversion on a built-in page after preloading
+    MARKER_WARMUP: bool = os.getenv("MARKER_WARMUP", "true").lower() == "true"
+    # Where conversions run: "thread" (shared models) or "process"
+    # (one model copy per worker, parallel across cores)
+    MARKER_EXECUTOR: str = os.getenv("MARKER_EXECUTOR", "thread")
+    MARKER_WORKERS: int = int(os.getenv("MARKER_WORKERS", "1"))
+    # Conversions allowed to wait for a free worker
+    MARKER_QUEUE_SIZE: int = int(os.getenv("MARKER_QUEUE_SIZE", "4"))
+    # Seconds to wait for a queue slot before rejecting a request
+    MARKER_QUEUE_TIMEOUT: float = float(os.getenv("MARKER_QUEUE_TIMEOUT", "30"))
+    
+    # Asynchronous jobs (ocr_submit): concurrent jobs, store location and
+    # how long finished jobs and their results are kept (0 = forever)
+    JOBS_WORKERS: int = int(os.getenv("JOBS_WORKERS", "2"))
+    JOBS_DIR: str = os.getenv("JOBS_DIR", "~/.cache/ocr-mcp")
+    JOBS_RETENTION_SECONDS: int = int(os.getenv("JOBS_RETENTION_SECONDS", "86400"))
+    # Budget of one job; jobs exist for documents that outlast TIMEOUT_SECONDS
+    JOBS_TIMEOUT_SECONDS: int = int(os.getenv("JOBS_TIMEOUT_SECONDS", "3600"))
+
+    # Results longer than this many characters are stored on the server and
+    # returned as a summary to read with ocr_read (0 = always inline)
+    RESULT_INLINE_MAX_CHARS: int = int(os.getenv("RESULT_INLINE_MAX_CHARS", "20000"))
+    RESULT_PREVIEW_CHARS: int = int(os.getenv("RESULT_PREVIEW_CHARS", "1000"))
+    RESULTS_DIR: str = os.getenv("RESULTS_DIR", "~/.cache/ocr-mcp/results")
+    RESULTS_RETENTION_SECONDS: int = int(os.getenv("RESULTS_RETENTION_SECONDS", "86400"))
+
+    # Hot-folder ingest (ocr-mcp-ingest): files OCR'd at once, seconds
+    # between scans of the watched folder, and how long a file must stay
+    # unmodified before it is picked up
+    INGEST_WORKERS: int = int(os.getenv("INGEST_WORKERS", "4"))
+    INGEST_POLL_SECONDS: float = float(os.getenv("INGEST_POLL_SECONDS", "5"))
+    INGEST_SETTLE_SECONDS: float = float(os.getenv("INGEST_SETTLE_SECONDS", "10"))
+    # Attempts per file, and seconds before a failed file is tried again
+    # (multiplied by the attempts made so far)
+    INGEST_MAX_ATTEMPTS: int = int(os.getenv("INGEST_MAX_ATTEMPTS", "3"))
+    INGEST_RETRY_SECONDS: float = float(os.getenv("INGEST_RETRY_SECONDS", "300"))
+    INGEST_REPORT_SECONDS: float = float(os.getenv("INGEST_REPORT_SECONDS", "60"))
+    INGEST_EXTENSIONS: str = os.getenv(
+        "INGEST_EXTENSIONS", ".pdf,.png,.jpg,.jpeg,.tif,.tiff,.gif,.bmp,.webp"
+    )
+    
+    # Share one run between concurrent requests for the same content
+    SINGLE_FLIGHT_ENABLED: bool = os.getenv("SINGLE_FLIGHT_ENABLED", "true").lower() == "true"
+    
+    # Result cache settings
+    CACHE_ENABLED: bool = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_DIR: str = os.getenv("CACHE_DIR", "~/.cache/ocr-mcp")
+    # Entries older than this are treated as missing (0 disables expiry)
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", "604800"))
+    CACHE_MAX_SIZE_MB: int = int(os.getenv("CACHE_MAX_SIZE_MB", "500"))
+    # Results kept decompressed in memory in front of the on-disk cache
+    CACHE_MEMORY_ENTRIES: int = int(os.getenv("CACHE_MEMORY_ENTRIES", "128"))
+    # Keep the text of every OCR'd PDF page by page fingerprint and reuse it
+    # for unchanged pages of later revisions; PDFs are then OCR'd page by page
+    PAGE_REUSE_ENABLED: bool = os.getenv("PAGE_REUSE_ENABLED", "false").lower() == "true"
     
     # API settings
     API_TIMEOUT: int = int(os.getenv("API_TIMEOUT", "30"))
     API_MAX_RETRIES: int = int(os.getenv("API_MAX_RETRIES", "3"))
+    # Jittered exponential backoff between attempts: up to base * 2^attempt
+    API_BACKOFF_BASE: float = float(os.getenv("API_BACKOFF_BASE", "1"))
+    API_BACKOFF_MAX: float = float(os.getenv("API_BACKOFF_MAX", "30"))
+    # Give up instead of waiting when the provider asks for a longer pause
+    API_RETRY_AFTER_MAX: float = float(os.getenv("API_RETRY_AFTER_MAX", "120"))
+    
+    # Shared rate limits per API backend, e.g. "mistral=5,deepseek=2"
+    RATE_LIMIT_RPS: str = os.getenv("RATE_LIMIT_RPS", "")
+    # Tokens per minute, e.g. "mistral=500000"
+    RATE_LIMIT_TPM: str = os.getenv("RATE_LIMIT_TPM", "")
+    
+    # HTTP connection pool settings (shared per API backend)
+    HTTP_MAX_CONNECTIONS: int = int(os.getenv("HTTP_MAX_CONNECTIONS", "20"))
+    HTTP_MAX_KEEPALIVE: int = int(os.getenv("HTTP_MAX_KEEPALIVE", "10"))
+    # Seconds an idle connection is kept open
+    HTTP_KEEPALIVE_EXPIRY: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+    # Requires the h2 package (pip install "httpx[http2]")
+    HTTP2_ENABLED: bool = os.getenv("HTTP2_ENABLED", "false").lower() == "true"
+    # Open connections to the API hosts at startup
+    HTTP_PRECONNECT: bool = os.getenv("HTTP_PRECONNECT", "true").lower() == "true"
+    
+    # Image preprocessing before upload to the vision APIs
+    IMAGE_PREPROCESS: bool = os.getenv("IMAGE_PREPROCESS", "true").lower() == "true"
+    # Longest side in pixels (0 = no limit)
+    IMAGE_MAX_EDGE: int = int(os.getenv("IMAGE_MAX_EDGE", "2048"))
+    # Downsample images scanned above this resolution (0 = no limit)
+    IMAGE_MAX_DPI: int = int(os.getenv("IMAGE_MAX_DPI", "0"))
+    IMAGE_GRAYSCALE: bool = os.getenv("IMAGE_GRAYSCALE", "false").lower() == "true"
+    # jpeg, webp or original
+    IMAGE_FORMAT: str = os.getenv("IMAGE_FORMAT", "jpeg")
+    IMAGE_QUALITY: int = int(os.getenv("IMAGE_QUALITY", "85"))
+    # Per-backend overrides, e.g. "max_edge=1600,format=webp,grayscale=true"
+    MISTRAL_IMAGE_OPTIONS: str = os.getenv("MISTRAL_IMAGE_OPTIONS", "")
+    DEEPSEEK_IMAGE_OPTIONS: str = os.getenv("DEEPSEEK_IMAGE_OPTIONS", "")
     
+    @field_validator("ENABLED_BACKENDS", mode="before")
     @classmethod
-    def validate(cls) -> tuple[bool, List[str]]:
+    def split_backends(cls, value: Any) -> Any:
+        """Accept a comma-separated string as well as a list."""
+        if isinstance(value, str):
+            value = value.split(",")
+        return [b.strip().lower() for b in value if b.strip()]
+    
+    def validate(self) -> tuple[bool, List[str]]:
         """
         Validate configuration and return (is_valid, errors).
         
@@ -41,24 +229,39 @@ class Settings(BaseSettings):
         
         # Validate backends
         valid_backends = {"marker", "deepseek", "mistral"}
-        for backend in cls.ENABLED_BACKENDS:
+        for backend in self.ENABLED_BACKENDS:
             if backend not in valid_backends:
                 errors.append(f"Invalid backend: {backend}")
         
+        if self.MARKER_EXECUTOR not in ("thread", "process"):
+            errors.append(
+                f"Invalid MARKER_EXECUTOR: {self.MARKER_EXECUTOR} (use thread or process)"
+            )
+        
+        if self.MCP_TRANSPORT not in ("stdio", "sse", "streamable-http"):
+            errors.append(
+                f"Invalid MCP_TRANSPORT: {self.MCP_TRANSPORT} (use stdio, sse or streamable-http)"
+            )
+        
+        if self.IMAGE_FORMAT not in ("jpeg", "webp", "original"):
+            errors.append(
+                f"Invalid IMAGE_FORMAT: {self.IMAGE_FORMAT} (use jpeg, webp or original)"
+            )
+        
         # Validate default backend
-        if cls.DEFAULT_BACKEND not in cls.ENABLED_BACKENDS:
+        if self.DEFAULT_BACKEND not in self.ENABLED_BACKENDS:
             errors.append(
-                f"Default backend '{cls.DEFAULT_BACKEND}' not in enabled backends"
+                f"Default backend '{self.DEFAULT_BACKEND}' not in enabled backends"
             )
         
         # Validate API keys ONLY for enabled backends
-        if "deepseek" in cls.ENABLED_BACKENDS and not cls.DEEPSEEK_API_KEY:
+        if "deepseek" in self.ENABLED_BACKENDS and not self.DEEPSEEK_API_KEY:
             errors.append(
                 "DeepSeek backend is enabled but DEEPSEEK_API_KEY is not set. "
                 "Either add the API key or remove 'deepseek' from ENABLED_BACKENDS."
             )
         
-        if "mistral" in cls.ENABLED_BACKENDS and not cls.MISTRAL_API_KEY:
+        if "mistral" in self.ENABLED_BACKENDS and not self.MISTRAL_API_KEY:
             errors.append(
                 "Mistral backend is enabled but MISTRAL_API_KEY is not set. "
                 "Either add the API key or remove 'mistral' from ENABLED_BACKENDS."
@@ -66,15 +269,59 @@ class Settings(BaseSettings):
         
         return len(errors) == 0, errors
     
-    @classmethod
-    def get_backend_priority(cls) -> List[str]:
+    def get_backend_priority(self) -> List[str]:
         """Get backends in priority order."""
         # Ensure default backend is first
-        backends = cls.ENABLED_BACKENDS.copy()
-        if cls.DEFAULT_BACKEND in backends:
-            backends.remove(cls.DEFAULT_BACKEND)
-            backends.insert(0, cls.DEFAULT_BACKEND)
+        backends = self.ENABLED_BACKENDS.copy()
+        if self.DEFAULT_BACKEND in backends:
+            backends.remove(self.DEFAULT_BACKEND)
+            backends.insert(0, self.DEFAULT_BACKEND)
         return backends
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
+
+# Read once when the stores, job workers, metrics exporter or transport are
+# created; a reload records their new values but they apply after a restart
+RESTART_SETTINGS = (
+    "MCP_TRANSPORT",
+    "MCP_HOST",
+    "MCP_PORT",
+    "METRICS_HOST",
+    "METRICS_PORT",
+    "CACHE_DIR",
+    "CACHE_TTL_SECONDS",
+    "CACHE_MAX_SIZE_MB",
+    "CACHE_MEMORY_ENTRIES",
+    "RESULTS_DIR",
+    "RESULTS_RETENTION_SECONDS",
+    "JOBS_DIR",
+    "JOBS_WORKERS",
+)
+
+
+def reload_settings() -> Dict[str, Any]:
+    """
+    Re-read the environment and .env file into the shared settings object.
+    
+    The new values are validated first; if they are invalid the current
+    settings are left untouched.
+    
+    Returns:
+        Mapping of changed setting names to their new values
+        
+    Raises:
+        ValueError: If the new configuration is invalid
+    """
+    fresh = Settings()
+    is_valid, errors = fresh.validate()
+    if not is_valid:
+        raise ValueError("; ".join(errors))
+    
+    changed = {}
+    for name in Settings.model_fields:
+        value = getattr(fresh, name)
+        if getattr(settings, name) != value:
+            setattr(settings, name, value)
+            changed[name] = "***" if name.endswith("_API_KEY") and value else value
+    return changed
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""End-to-end request deadlines shared by every stage of one OCR request."""
+
+import asyncio
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Dict, Iterator, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a request runs out of its time budget."""
+
+
+class Deadline:
+    """
+    Time budget of one request, fixed when the request starts.
+
+    Args:
+        seconds: Budget in seconds; 0 or less means no deadline
+    """
+
+    def __init__(self, seconds: float):
+        self.budget = seconds
+        self.started = time.monotonic()
+        self.expires_at = self.started + seconds if seconds > 0 else None
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left (never negative), or None without a deadline."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        remaining = self.remaining()
+        return remaining is not None and remaining <= 0
+
+    def allows(self, seconds: Optional[float]) -> bool:
+        """Whether something expected to take ``seconds`` can finish in time."""
+        remaining = self.remaining()
+        if remaining is None:
+            return True
+        if seconds is None:
+            return remaining > 0
+        return seconds < remaining
+
+    def clamp(self, seconds: float) -> float:
+        """Shorten a timeout so it ends no later than the deadline."""
+        remaining = self.remaining()
+        return seconds if remaining is None else min(seconds, remaining)
+
+    def shared(self) -> "Deadline":
+        """A separate deadline ending at the same time, for work shared with other requests."""
+        copy = Deadline(0)
+        copy.budget, copy.started, copy.expires_at = self.budget, self.started, self.expires_at
+        return copy
+
+    def extend(self, other: "Deadline") -> None:
+        """Move the end out to ``other``'s when that is later (or unlimited)."""
+        if self.expires_at is None:
+            return
+        if other.expires_at is None:
+            self.expires_at = None
+        elif other.expires_at > self.expires_at:
+            self.expires_at = other.expires_at
+            self.budget = other.expires_at - self.started
+
+    async def run(self, awaitable: Awaitable[T]) -> T:
+        """
+        Await ``awaitable``, cancelling it when the deadline passes.
+
+        Raises:
+            DeadlineExceeded: If the deadline passed first
+        """
+        remaining = self.remaining()
+        if remaining is None:
+            return await awaitable
+        try:
+            return await asyncio.wait_for(awaitable, remaining)
+        except asyncio.TimeoutError:
+            raise DeadlineExceeded(
+                f"Deadline of {self.budget:g}s exceeded (TIMEOUT_SECONDS)"
+            ) from None
+
+    def report(self) -> Dict[str, Any]:
+        used = time.monotonic() - self.started
+        if self.expires_at is None:
+            return {"budget_seconds": None, "used_seconds": round(used, 3)}
+        return {
+            "budget_seconds": self.budget,
+            "used_seconds": round(used, 3),
+            "remaining_seconds": round(self.remaining(), 3),
+            "used_fraction": round(used / self.budget, 3),
+            "exceeded": self.expired(),
+        }
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "ocr_request_deadline", default=None
+)
+
+
+def current_deadline() -> Deadline:
+    """The deadline of the running request; an unlimited one outside requests."""
+    return _current.get() or Deadline(0)
+
+
+@contextmanager
+def start_deadline(seconds: float) -> Iterator[Deadline]:
+    """
+    Make a deadline current for one request.
+
+    A request started inside another one (e.g. a job running a document)
+    keeps the outer deadline when that one ends sooner.
+    """
+    deadline = Deadline(seconds)
+    outer = _current.get()
+    if outer is not None and outer.expires_at is not None and (
+        deadline.expires_at is None or outer.expires_at < deadline.expires_at
+    ):
+        deadline = outer
+    with use_deadline(deadline):
+        yield deadline
+
+
+@contextmanager
+def use_deadline(deadline: Deadline) -> Iterator[Deadline]:
+    """Make an existing deadline current, e.g. inside a task shared by several requests."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
@@ -0,0 +1,155 @@
+"""Low-copy file reading: size checks, memory maps and streamed request bodies."""
+
+import base64
+import json
+import mmap
+import os
+import sys
+import time
+from contextlib import contextmanager
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Union
+
+Buffer = Union[bytes, mmap.mmap]
+
+# Multiple of 3 so every chunk encodes to base64 without padding
+ENCODE_CHUNK_SIZE = 3 * 256 * 1024
+
+_PLACEHOLDER = "__ocr_mcp_data__"
+
+
+class FileTooLargeError(ValueError):
+    """Raised when a file exceeds MAX_FILE_SIZE_MB."""
+
+
+def check_file_size(file_path: str, max_size_mb: float) -> int:
+    """
+    Check a file against the size limit without reading it.
+
+    Args:
+        file_path: File to check
+        max_size_mb: Limit in megabytes (0 or less disables the check)
+
+    Returns:
+        The file size in bytes
+
+    Raises:
+        FileTooLargeError: If the file is larger than the limit
+        OSError: If the file cannot be stat'ed
+    """
+    size = os.stat(file_path).st_size
+    check_size(size, max_size_mb)
+    return size
+
+
+def check_size(size: int, max_size_mb: float) -> None:
+    """Raise FileTooLargeError if ``size`` bytes exceed ``max_size_mb``."""
+    if max_size_mb > 0 and size > max_size_mb * 1024 * 1024:
+        raise FileTooLargeError(
+            f"File is {size / (1024 * 1024):.1f} MB, larger than "
+            f"MAX_FILE_SIZE_MB ({max_size_mb})"
+        )
+
+
+@contextmanager
+def map_file(file_path: str) -> Iterator[Buffer]:
+    """
+    Memory-map a file read-only.
+
+    Pages are loaded by the OS as they are touched and are not counted
+    against the Python heap. Empty files, which cannot be mapped, yield
+    ``b""``.
+    """
+    with open(file_path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield b""
+            return
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+def base64_length(size: int) -> int:
+    """Length of the base64 encoding of ``size`` bytes, with padding."""
+    return 4 * ((size + 2) // 3)
+
+
+def iter_base64(data: Buffer, chunk_size: int = ENCODE_CHUNK_SIZE) -> Iterator[bytes]:
+    """Base64-encode a buffer piece by piece."""
+    for start in range(0, len(data), chunk_size):
+        yield base64.b64encode(data[start:start + chunk_size])
+
+
+class StreamedJSONBody:
+    """
+    JSON request body with string values base64-encoded on the fly.
+
+    The JSON around the data is serialized once; the data itself is encoded
+    chunk by chunk while the request is sent, so the encoded copy never
+    exists in memory as a whole. The body length is known up front and is
+    sent as Content-Length. ``encode_seconds`` accumulates the time spent
+    encoding over all attempts.
+
+    Args:
+        payload: Request JSON. Every ``{data}`` in a string value is
+            replaced, in order, by the base64 of the next buffer.
+        data: Bytes or memory map to encode, or a list of them (one per
+            ``{data}``)
+    """
+
+    def __init__(self, payload: Dict[str, Any], data: Union[Buffer, List[Buffer]]):
+        buffers = list(data) if isinstance(data, list) else [data]
+        segments = json.dumps(payload).replace("{data}", _PLACEHOLDER).split(_PLACEHOLDER)
+        if len(segments) != len(buffers) + 1:
+            raise ValueError(
+                f"payload has {len(segments) - 1} {{data}} placeholders "
+                f"for {len(buffers)} buffers"
+            )
+        self.segments = [segment.encode("utf-8") for segment in segments]
+        self.buffers = buffers
+        self.length = sum(len(segment) for segment in self.segments) + sum(
+            base64_length(len(buffer)) for buffer in buffers
+        )
+        self.encode_seconds = 0.0
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {"Content-Length": str(self.length)}
+
+    async def stream(self) -> AsyncIterator[bytes]:
+        """A fresh iterator over the body; call once per attempt."""
+        yield self.segments[0]
+        for buffer, segment in zip(self.buffers, self.segments[1:]):
+            chunks = iter_base64(buffer)
+            while True:
+                start = time.perf_counter()
+                chunk = next(chunks, None)
+                self.encode_seconds += time.perf_counter() - start
+                if chunk is None:
+                    break
+                yield chunk
+            yield segment
+
+
+def peak_resident_bytes() -> Optional[int]:
+    """
+    Return the high-water mark of this process's resident memory, if known.
+
+    This is process-wide, so with concurrent requests it covers all of them.
+    """
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # ru_maxrss is reported in bytes on macOS and kilobytes elsewhere
+        return peak if sys.platform == "darwin" else peak * 1024
+    except (ImportError, OSError):
+        return None
@@ -0,0 +1,68 @@
+"""Fingerprint PDF pages by what they draw, to find unchanged pages across revisions."""
+
+import hashlib
+from typing import Any, List, Optional, Set
+
+from pypdf import PdfReader
+from pypdf.generic import DictionaryObject, IndirectObject
+
+
+def _resolve(value: Any) -> Any:
+    return value.get_object() if isinstance(value, IndirectObject) else value
+
+
+def _hash_xobjects(resources: Any, digest: Any, seen: Set[int], depth: int = 0) -> None:
+    """Add the images and form XObjects a page draws to ``digest``."""
+    resources = _resolve(resources)
+    if not isinstance(resources, DictionaryObject):
+        return
+    xobjects = _resolve(resources.get("/XObject"))
+    if not isinstance(xobjects, DictionaryObject):
+        return
+    # Sorted so the fingerprint does not depend on dictionary order
+    for name in sorted(xobjects):
+        xobject = _resolve(xobjects[name])
+        if not isinstance(xobject, DictionaryObject) or id(xobject) in seen:
+            continue
+        seen.add(id(xobject))
+        digest.update(name.encode("utf-8", "replace"))
+        digest.update(str(xobject.get("/Subtype")).encode("ascii", "replace"))
+        digest.update(xobject.get_data())
+        # Forms draw with their own resources; bounded against cycles
+        if xobject.get("/Subtype") == "/Form" and depth < 8:
+            _hash_xobjects(xobject.get("/Resources"), digest, seen, depth + 1)
+
+
+def page_fingerprint(page: Any) -> str:
+    """
+    Hash what a page draws: its box, rotation, content stream and images.
+
+    Two revisions of a document give a page the same fingerprint when it
+    did not change, regardless of its position or of the PDF's object
+    numbering.
+    """
+    digest = hashlib.sha256()
+    digest.update(repr([float(value) for value in page.mediabox]).encode("ascii"))
+    digest.update(str(page.get("/Rotate", 0)).encode("ascii"))
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    _hash_xobjects(page.get("/Resources"), digest, set())
+    return digest.hexdigest()
+
+
+def fingerprint_pages(file_path: str) -> List[Optional[str]]:
+    """
+    Fingerprint every page of a PDF.
+
+    Returns:
+        One fingerprint per page, in page order; None for pages that could
+        not be read, which are always OCR'd
+    """
+    fingerprints: List[Optional[str]] = []
+    for page in PdfReader(file_path).pages:
+        try:
+            fingerprints.append(page_fingerprint(page))
+        except Exception:
+            fingerprints.append(None)
+    return fingerprints
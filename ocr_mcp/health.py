@@ -0,0 +1,178 @@
+"""Per-backend health tracking and circuit breakers."""
+
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+from .backends.base import BaseBackend
+from .config import settings
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class BackendHealth:
+    """
+    Rolling health state of one backend.
+
+    Tracks the success rate over the last ``HEALTH_WINDOW`` calls and an
+    exponentially weighted moving average of latency. After
+    ``BREAKER_FAILURE_THRESHOLD`` consecutive failures the circuit opens and
+    the backend is skipped. After ``BREAKER_OPEN_SECONDS`` it becomes half
+    open and lets up to ``BREAKER_HALF_OPEN_PROBES`` calls through; a
+    successful probe closes the circuit, a failed one opens it again.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.outcomes: Deque[bool] = deque(maxlen=max(1, settings.HEALTH_WINDOW))
+        self.ewma_latency: Optional[float] = None
+        self.consecutive_failures = 0
+        self.state = CLOSED
+        self.opened_at: Optional[float] = None
+        self.probes_in_flight = 0
+        self.times_opened = 0
+        self.skipped = 0
+        self.last_error: Optional[str] = None
+
+    def _refresh(self) -> None:
+        if self.state == OPEN and self.opened_at is not None:
+            if time.monotonic() - self.opened_at >= settings.BREAKER_OPEN_SECONDS:
+                self.state = HALF_OPEN
+                self.probes_in_flight = 0
+
+    def is_callable(self) -> bool:
+        """Whether a call would currently be let through (without taking a slot)."""
+        self._refresh()
+        if self.state == OPEN:
+            return False
+        if self.state == HALF_OPEN:
+            return self.probes_in_flight < settings.BREAKER_HALF_OPEN_PROBES
+        return True
+
+    def acquire(self) -> bool:
+        """Take permission for one call; False means skip this backend."""
+        if not self.is_callable():
+            self.skipped += 1
+            return False
+        if self.state == HALF_OPEN:
+            self.probes_in_flight += 1
+        return True
+
+    def release(self) -> None:
+        """Give back a permission without an outcome (e.g. cancelled call)."""
+        if self.state == HALF_OPEN and self.probes_in_flight > 0:
+            self.probes_in_flight -= 1
+
+    def _open(self) -> None:
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probes_in_flight = 0
+        self.times_opened += 1
+
+    def record(self, success: bool, latency: float, error: Optional[str] = None) -> None:
+        """Record the outcome of a call."""
+        self.outcomes.append(success)
+
+        if success:
+            alpha = settings.HEALTH_EWMA_ALPHA
+            if self.ewma_latency is None:
+                self.ewma_latency = latency
+            else:
+                self.ewma_latency = alpha * latency + (1 - alpha) * self.ewma_latency
+            self.consecutive_failures = 0
+            if self.state == HALF_OPEN:
+                self.state = CLOSED
+                self.opened_at = None
+                self.probes_in_flight = 0
+            return
+
+        self.last_error = error
+        self.consecutive_failures += 1
+        if self.state == HALF_OPEN:
+            self._open()
+        elif (
+            self.state == CLOSED
+            and self.consecutive_failures >= settings.BREAKER_FAILURE_THRESHOLD
+        ):
+            self._open()
+
+    def reset(self) -> None:
+        """Close the circuit and forget the failure streak."""
+        self.state = CLOSED
+        self.opened_at = None
+        self.probes_in_flight = 0
+        self.consecutive_failures = 0
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        if not self.outcomes:
+            return None
+        return sum(self.outcomes) / len(self.outcomes)
+
+    def stats(self) -> Dict[str, Any]:
+        self._refresh()
+        retry_in = None
+        if self.state == OPEN and self.opened_at is not None:
+            retry_in = max(
+                0.0,
+                settings.BREAKER_OPEN_SECONDS - (time.monotonic() - self.opened_at)
+            )
+        return {
+            "state": self.state,
+            "success_rate": self.success_rate,
+            "samples": len(self.outcomes),
+            "ewma_latency_seconds": self.ewma_latency,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "skipped_calls": self.skipped,
+            "retry_in_seconds": retry_in,
+            "last_error": self.last_error,
+        }
+
+
+class HealthTracker:
+    """Health state for every backend, used to route requests."""
+
+    def __init__(self):
+        self.backends: Dict[str, BackendHealth] = {}
+
+    def get(self, name: str) -> BackendHealth:
+        health = self.backends.get(name)
+        if health is None:
+            health = BackendHealth(name)
+            self.backends[name] = health
+        return health
+
+    def route(self, backends: List[BaseBackend]) -> List[BaseBackend]:
+        """
+        Drop backends with an open circuit and optionally sort by latency.
+
+        Healthy backends are only reordered when every one of them has a
+        latency estimate, so untried backends keep their configured place.
+        """
+        candidates = [b for b in backends if self.get(b.name).is_callable()]
+        if settings.HEALTH_LATENCY_ORDERING:
+            latencies = [self.get(b.name).ewma_latency for b in candidates]
+            if all(latency is not None for latency in latencies):
+                candidates = [
+                    b for _, b in sorted(
+                        zip(latencies, candidates),
+                        key=lambda pair: pair[0]
+                    )
+                ]
+        return candidates
+
+    def reset(self, name: Optional[str] = None) -> None:
+        """Close the circuit of one backend, or of all of them."""
+        targets = [self.get(name)] if name else list(self.backends.values())
+        for health in targets:
+            health.reset()
+
+    def stats(self) -> Dict[str, Any]:
+        return {name: health.stats() for name, health in self.backends.items()}
+
+
+health_tracker = HealthTracker()
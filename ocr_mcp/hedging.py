@@ -0,0 +1,187 @@
+"""Hedged requests: start the next backend when the current one is slow."""
+
+import asyncio
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from .backends.base import BaseBackend, OCRResult
+from .config import settings
+from .deadline import current_deadline
+from .health import health_tracker
+
+
+class LatencyWindow:
+    """Sliding window of recent successful call latencies for one backend."""
+
+    def __init__(self, size: int = 200):
+        self.samples: Deque[float] = deque(maxlen=size)
+
+    def add(self, seconds: float) -> None:
+        self.samples.append(seconds)
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Return the p-th percentile (0-100), or None without samples."""
+        if not self.samples:
+            return None
+        ordered = sorted(self.samples)
+        index = min(len(ordered) - 1, max(0, round(p / 100 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class HedgePolicy:
+    """
+    Decides when to hedge and keeps the hedged fraction bounded.
+
+    The hedge delay for a backend is its observed latency percentile
+    (``HEDGE_PERCENTILE``) once ``HEDGE_MIN_SAMPLES`` calls have been seen,
+    and ``HEDGE_DELAY_SECONDS`` before that. At most ``HEDGE_MAX_FRACTION``
+    extra backend calls are started per request on average.
+    """
+
+    def __init__(self):
+        self.latencies: Dict[str, LatencyWindow] = {}
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+
+    def record(self, backend: str, seconds: float) -> None:
+        """Record the latency of a successful backend call."""
+        self.latencies.setdefault(backend, LatencyWindow()).add(seconds)
+
+    def delay_for(self, backend: str) -> float:
+        """Seconds to wait on a backend before hedging."""
+        window = self.latencies.get(backend)
+        if window is not None and len(window.samples) >= settings.HEDGE_MIN_SAMPLES:
+            observed = window.percentile(settings.HEDGE_PERCENTILE)
+            if observed is not None:
+                return observed
+        return settings.HEDGE_DELAY_SECONDS
+
+    def can_hedge(self) -> bool:
+        """Whether another hedge fits in the budget."""
+        return self.hedges < settings.HEDGE_MAX_FRACTION * self.requests
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hedge counters and current delays."""
+        return {
+            "enabled": settings.HEDGING_ENABLED,
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedged_fraction": self.hedges / self.requests if self.requests else None,
+            "max_fraction": settings.HEDGE_MAX_FRACTION,
+            "delays": {name: self.delay_for(name) for name in self.latencies},
+        }
+
+
+hedge_policy = HedgePolicy()
+
+
+async def timed_call(
+    backend: BaseBackend,
+    call: Callable[[BaseBackend], Awaitable[OCRResult]]
+) -> OCRResult:
+    """Run one backend call and feed its latency to the hedge policy."""
+    start = time.perf_counter()
+    result = await call(backend)
+    if result.error is None and result.text:
+        hedge_policy.record(backend.name, time.perf_counter() - start)
+    return result
+
+
+async def run_hedged(
+    backends: List[BaseBackend],
+    call: Callable[[BaseBackend], Awaitable[OCRResult]]
+) -> tuple[Optional[OCRResult], List[str]]:
+    """
+    Run backends in priority order, hedging slow ones.
+
+    The first backend starts immediately. Whenever no running call has
+    answered within the hedge delay of the backend started last, the next
+    backend is started alongside them, as long as the hedge budget allows.
+    A failed backend is replaced by the next one right away. Backends that
+    typically take longer than the time left before the deadline are
+    skipped, as in the sequential path. The first good result wins and
+    every other running call is cancelled.
+
+    Args:
+        backends: Backends in priority order
+        call: Coroutine that runs one backend
+
+    Returns:
+        Tuple of (winning result or None, errors from failed backends)
+    """
+    hedge_policy.requests += 1
+    pending: Dict[asyncio.Task, BaseBackend] = {}
+    started: List[BaseBackend] = []
+    errors: List[str] = []
+    deadline = current_deadline()
+    next_index = 0
+    hedged = False
+
+    def launch() -> Optional[BaseBackend]:
+        """Start the next backend that can finish in time, or return None."""
+        nonlocal next_index
+        while next_index < len(backends):
+            backend = backends[next_index]
+            next_index += 1
+            typical = health_tracker.get(backend.name).ewma_latency
+            if not deadline.allows(typical):
+                errors.append(
+                    f"{backend.name}: skipped, {deadline.remaining():.1f}s left before the deadline"
+                )
+                continue
+            task = asyncio.create_task(timed_call(backend, call))
+            pending[task] = backend
+            started.append(backend)
+            return backend
+        return None
+
+    latest = launch()
+    try:
+        while pending:
+            timeout = None
+            if next_index < len(backends) and hedge_policy.can_hedge():
+                timeout = hedge_policy.delay_for(latest.name)
+
+            done, _ = await asyncio.wait(
+                pending,
+                timeout=timeout,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+
+            if not done:
+                # Hedge delay passed without an answer
+                backend = launch()
+                if backend is not None:
+                    hedge_policy.hedges += 1
+                    hedged = True
+                    latest = backend
+                continue
+
+            for task in done:
+                backend = pending.pop(task)
+                result = task.result()
+                if result.error is None and result.text:
+                    if hedged and backend is not started[0]:
+                        hedge_policy.hedge_wins += 1
+                    result.metadata = {
+                        **(result.metadata or {}),
+                        "hedged": hedged,
+                        "backends_started": [b.name for b in started],
+                    }
+                    return result, errors
+                if result.error:
+                    errors.append(f"{backend.name}: {result.error}")
+
+            # Fall through to the next backend when nothing is left running
+            if not pending:
+                latest = launch() or latest
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return None, errors
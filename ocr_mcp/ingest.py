@@ -0,0 +1,684 @@
+"""Hot-folder ingest: OCR every file dropped into a folder and write sidecars."""
+
+import argparse
+import asyncio
+import json
+import os
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .backends.base import OCRResult
+from .config import settings
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+MANIFEST_NAME = ".ocr-mcp-ingest.sqlite3"
+
+# (path relative to the source folder, size, mtime in nanoseconds)
+FileState = Tuple[str, int, int]
+
+
+class IngestManifest:
+    """
+    SQLite table of the files seen in a hot folder and what became of them.
+
+    A file is identified by its path relative to the folder; a change of
+    size or modification time queues it again. All methods block; the
+    ingester calls them from worker threads.
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    queued_at REAL NOT NULL,
+                    retry_at REAL NOT NULL DEFAULT 0,
+                    started_at REAL,
+                    finished_at REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    backend TEXT,
+                    characters INTEGER,
+                    error TEXT
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS files_queue ON files (status, queued_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def sync(self, files: List[FileState]) -> int:
+        """
+        Queue files that are new or changed since they were last seen.
+
+        Returns:
+            Number of files queued
+        """
+        now = time.time()
+        queued = 0
+        with self._lock:
+            db = self._db()
+            known = {
+                path: (size, mtime_ns, status)
+                for path, size, mtime_ns, status in db.execute(
+                    "SELECT path, size, mtime_ns, status FROM files"
+                )
+            }
+            for path, size, mtime_ns in files:
+                row = known.get(path)
+                if row is None:
+                    db.execute(
+                        "INSERT INTO files (path, size, mtime_ns, status, queued_at) "
+                        "VALUES (?, ?, ?, ?, ?)",
+                        (path, size, mtime_ns, QUEUED, now)
+                    )
+                # A running file that changes is seen again after it finishes
+                elif row[2] != RUNNING and (row[0], row[1]) != (size, mtime_ns):
+                    db.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ?, status = ?, queued_at = ?, "
+                        "retry_at = 0, attempts = 0, error = NULL WHERE path = ?",
+                        (size, mtime_ns, QUEUED, now, path)
+                    )
+                else:
+                    continue
+                queued += 1
+            db.commit()
+        return queued
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Mark the oldest queued file that is due as running and return it."""
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT path, size, mtime_ns, attempts FROM files "
+                "WHERE status = ? AND retry_at <= ? ORDER BY queued_at, path LIMIT 1",
+                (QUEUED, now)
+            ).fetchone()
+            if row is None:
+                return None
+            path, size, mtime_ns, attempts = row
+            db.execute(
+                "UPDATE files SET status = ?, started_at = ?, attempts = attempts + 1 "
+                "WHERE path = ?",
+                (RUNNING, now, path)
+            )
+            db.commit()
+        return {"path": path, "size": size, "mtime_ns": mtime_ns, "attempts": attempts + 1}
+
+    def finish(
+        self,
+        path: str,
+        result: OCRResult,
+        max_attempts: int,
+        retry_seconds: float
+    ) -> str:
+        """
+        Record the outcome of a file.
+
+        A failed file is queued again, ``retry_seconds`` times its attempts
+        later, until it has had ``max_attempts`` attempts.
+
+        Returns:
+            The file's new status
+        """
+        now = time.time()
+        with self._lock:
+            db = self._db()
+            if result.error is None:
+                status = DONE
+                db.execute(
+                    "UPDATE files SET status = ?, finished_at = ?, backend = ?, "
+                    "characters = ?, error = NULL WHERE path = ?",
+                    (DONE, now, result.backend, len(result.text), path)
+                )
+            else:
+                attempts = db.execute(
+                    "SELECT attempts FROM files WHERE path = ?", (path,)
+                ).fetchone()[0]
+                status = QUEUED if attempts < max_attempts else FAILED
+                db.execute(
+                    "UPDATE files SET status = ?, finished_at = ?, retry_at = ?, "
+                    "error = ? WHERE path = ?",
+                    (status, now, now + retry_seconds * attempts, result.error, path)
+                )
+            db.commit()
+        return status
+
+    def forget(self, path: str) -> None:
+        """Drop a file that was removed from the folder."""
+        with self._lock:
+            db = self._db()
+            db.execute("DELETE FROM files WHERE path = ?", (path,))
+            db.commit()
+
+    def requeue(self, path: str) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE files SET status = ?, started_at = NULL WHERE path = ? AND status = ?",
+                (QUEUED, path, RUNNING)
+            )
+            db.commit()
+
+    def requeue_running(self) -> int:
+        """Put files left running by a previous process back in the queue."""
+        with self._lock:
+            db = self._db()
+            cursor = db.execute(
+                "UPDATE files SET status = ?, started_at = NULL WHERE status = ?",
+                (QUEUED, RUNNING)
+            )
+            db.commit()
+            return cursor.rowcount
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT status, COUNT(*) FROM files GROUP BY status"
+            ).fetchall()
+        counts = {status: 0 for status in (QUEUED, RUNNING, DONE, FAILED)}
+        counts.update(dict(rows))
+        return counts
+
+    def failures(self, limit: int = 20) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT path, attempts, error FROM files WHERE status = ? "
+                "ORDER BY finished_at DESC LIMIT ?",
+                (FAILED, limit)
+            ).fetchall()
+        return [{"path": path, "attempts": attempts, "error": error} for path, attempts, error in rows]
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def parse_extensions(value: str) -> Tuple[str, ...]:
+    """Turn ``.pdf,png`` into ``(".pdf", ".png")``."""
+    extensions = []
+    for item in value.split(","):
+        item = item.strip().lower()
+        if item:
+            extensions.append(item if item.startswith(".") else f".{item}")
+    return tuple(extensions)
+
+
+def scan_folder(
+    source: str,
+    extensions: Tuple[str, ...],
+    settle_seconds: float = 0,
+    exclude: Optional[str] = None
+) -> Tuple[List[FileState], int]:
+    """
+    List the files of ``source`` that are ready to be OCR'd.
+
+    Hidden files and folders, sidecars and the ``exclude`` folder (an
+    output tree inside the source) are skipped.
+
+    Returns:
+        The ready files, and the number of files skipped because they were
+        modified less than ``settle_seconds`` ago
+    """
+    cutoff = time.time_ns() - int(settle_seconds * 1e9)
+    files: List[FileState] = []
+    unsettled = 0
+
+    def walk(directory: str) -> Iterator[os.DirEntry]:
+        try:
+            entries = list(os.scandir(directory))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name.startswith("."):
+                continue
+            if entry.is_dir(follow_symlinks=False):
+                if exclude is None or os.path.abspath(entry.path) != exclude:
+                    yield from walk(entry.path)
+            elif entry.is_file():
+                yield entry
+
+    for entry in walk(source):
+        if not entry.name.lower().endswith(extensions):
+            continue
+        try:
+            stat = entry.stat()
+        except OSError:
+            continue
+        if stat.st_mtime_ns > cutoff:
+            unsettled += 1
+            continue
+        files.append((os.path.relpath(entry.path, source), stat.st_size, stat.st_mtime_ns))
+    return files, unsettled
+
+
+def write_atomic(path: str, data: bytes) -> None:
+    """Write ``data`` to a temporary file, flush it to disk and rename it to ``path``."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def write_sidecars(base: str, source_path: str, state: Dict[str, Any], result: OCRResult, seconds: float) -> None:
+    """
+    Write ``<base>.txt`` and ``<base>.json`` for one OCR'd file.
+
+    The JSON sidecar is written last, so its presence means both are
+    complete.
+    """
+    os.makedirs(os.path.dirname(base) or ".", exist_ok=True)
+    info = {
+        "source": source_path,
+        "size": state["size"],
+        "mtime_ns": state["mtime_ns"],
+        "backend": result.backend,
+        "confidence": result.confidence,
+        "characters": len(result.text),
+        "seconds": round(seconds, 3),
+        "processed_at": time.time(),
+        "metadata": result.metadata or {},
+    }
+    write_atomic(f"{base}.txt", result.text.encode("utf-8"))
+    write_atomic(f"{base}.json", json.dumps(info, indent=2, default=str).encode("utf-8"))
+
+
+class Ingester:
+    """
+    OCRs the files of a hot folder on a pool of asyncio workers.
+
+    The folder is scanned every ``poll_seconds`` (or once), new and changed
+    files go into the manifest, and ``workers`` workers take files from it
+    in the order they were found. Results are written as sidecars under
+    ``output``, mirroring the folder layout.
+    """
+
+    def __init__(
+        self,
+        source: str,
+        output: str,
+        manifest: IngestManifest,
+        workers: int = 4,
+        backend: Optional[str] = None,
+        once: bool = False,
+        poll_seconds: float = 5,
+        settle_seconds: float = 10,
+        max_attempts: int = 3,
+        retry_seconds: float = 300,
+        report_seconds: float = 60,
+        extensions: Tuple[str, ...] = (".pdf",)
+    ):
+        self.source = os.path.abspath(os.path.expanduser(source))
+        self.output = os.path.abspath(os.path.expanduser(output))
+        self.manifest = manifest
+        self.workers = max(1, workers)
+        self.backend = backend
+        self.once = once
+        self.poll_seconds = poll_seconds
+        self.settle_seconds = settle_seconds
+        self.max_attempts = max(1, max_attempts)
+        # A single pass does not wait for retries
+        self.retry_seconds = 0 if once else retry_seconds
+        self.report_seconds = report_seconds
+        self.extensions = extensions
+
+        self.done = 0
+        self.failed = 0
+        self.running = 0
+        self.started = time.monotonic()
+        self._last_report = (self.started, 0)
+        self._wakeup: Optional[asyncio.Event] = None
+        self._stopping: Optional[asyncio.Event] = None
+
+    async def scan(self) -> int:
+        """Scan the folder and queue new or changed files; returns how many."""
+        exclude = self.output if self.output != self.source else None
+        files, unsettled = await asyncio.to_thread(
+            scan_folder, self.source, self.extensions, self.settle_seconds, exclude
+        )
+        queued = await asyncio.to_thread(self.manifest.sync, files)
+        if unsettled and self.once:
+            print(
+                f"Skipped {unsettled} file(s) modified in the last "
+                f"{self.settle_seconds:g}s; run again to pick them up",
+                file=sys.stderr
+            )
+        if queued:
+            self._wakeup.set()
+        return queued
+
+    def stop(self) -> None:
+        """Stop taking new files; running ones finish."""
+        self._stopping.set()
+        self._wakeup.set()
+
+    async def run(self) -> Dict[str, Any]:
+        """Process the folder until stopped (or, with ``once``, until it is done)."""
+        self._wakeup = asyncio.Event()
+        self._stopping = asyncio.Event()
+        requeued = await asyncio.to_thread(self.manifest.requeue_running)
+        if requeued:
+            print(f"Resuming {requeued} interrupted file(s)", file=sys.stderr)
+        queued = await self.scan()
+        counts = await asyncio.to_thread(self.manifest.counts)
+        print(
+            f"Ingesting {self.source} into {self.output}: {queued} new or changed, "
+            f"backlog {counts[QUEUED]}, {self.workers} worker(s)",
+            file=sys.stderr
+        )
+
+        background = [asyncio.create_task(self._report_loop())]
+        if not self.once:
+            background.append(asyncio.create_task(self._scan_loop()))
+        workers = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        try:
+            await asyncio.gather(*workers)
+        finally:
+            for task in workers + background:
+                task.cancel()
+            await asyncio.gather(*workers, *background, return_exceptions=True)
+        return await self.report()
+
+    async def _scan_loop(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                await asyncio.wait_for(self._stopping.wait(), self.poll_seconds)
+                return
+            except asyncio.TimeoutError:
+                pass
+            await self.scan()
+
+    async def _report_loop(self) -> None:
+        if self.report_seconds <= 0:
+            return
+        while True:
+            await asyncio.sleep(self.report_seconds)
+            await self.report()
+
+    async def report(self) -> Dict[str, Any]:
+        """Print a progress line to stderr and return the figures."""
+        counts = await asyncio.to_thread(self.manifest.counts)
+        now = time.monotonic()
+        processed = self.done + self.failed
+        since, processed_then = self._last_report
+        self._last_report = (now, processed)
+        elapsed = now - self.started
+        stats = {
+            "done": self.done,
+            "failed": self.failed,
+            "running": self.running,
+            "backlog": counts[QUEUED] + counts[RUNNING],
+            "files_per_minute": round(
+                (processed - processed_then) * 60 / max(now - since, 1e-9), 2
+            ),
+            "overall_files_per_minute": round(processed * 60 / max(elapsed, 1e-9), 2),
+            "seconds": round(elapsed, 3),
+            "manifest": counts,
+        }
+        print(
+            f"Ingest: {stats['done']} done, {stats['failed']} failed, "
+            f"{stats['running']} running, backlog {stats['backlog']}; "
+            f"{stats['files_per_minute']:g} files/min "
+            f"({stats['overall_files_per_minute']:g} overall)",
+            file=sys.stderr
+        )
+        return stats
+
+    async def _worker(self) -> None:
+        while not self._stopping.is_set():
+            entry = await asyncio.to_thread(self.manifest.claim_next)
+            if entry is None:
+                if self.once and not self.running:
+                    # Nothing queued and nothing running that could fail
+                    # and come back for a retry
+                    self._wakeup.set()
+                    return
+                self._wakeup.clear()
+                try:
+                    # Retries become due without a wakeup, so look again
+                    # now and then
+                    await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            # Let the other workers look for more work as well
+            self._wakeup.set()
+            await self._process(entry)
+
+    async def _process(self, entry: Dict[str, Any]) -> None:
+        # Imported here so that --status does not load the backends
+        from .server import process_with_fallback
+
+        path = entry["path"]
+        source_path = os.path.join(self.source, path)
+        if not os.path.isfile(source_path):
+            await asyncio.to_thread(self.manifest.forget, path)
+            return
+
+        self.running += 1
+        start = time.perf_counter()
+        try:
+            result = await process_with_fallback(
+                file_path=source_path,
+                backend=self.backend,
+                timeout=settings.JOBS_TIMEOUT_SECONDS
+            )
+            if result.error is None:
+                await asyncio.to_thread(
+                    write_sidecars,
+                    os.path.join(self.output, path),
+                    source_path,
+                    entry,
+                    result,
+                    time.perf_counter() - start
+                )
+        except asyncio.CancelledError:
+            # Stopped without waiting: the file runs again on the next start
+            await asyncio.shield(asyncio.to_thread(self.manifest.requeue, path))
+            raise
+        except Exception as e:
+            result = OCRResult(text="", backend="none", error=f"Ingest failed: {e}")
+        finally:
+            self.running -= 1
+
+        status = await asyncio.to_thread(
+            self.manifest.finish, path, result, self.max_attempts, self.retry_seconds
+        )
+        if status == DONE:
+            self.done += 1
+        elif status == FAILED:
+            self.failed += 1
+            print(f"Failed: {path}: {result.error}", file=sys.stderr)
+        else:
+            print(
+                f"Will retry {path} (attempt {entry['attempts']} of "
+                f"{self.max_attempts}): {result.error}",
+                file=sys.stderr
+            )
+        self._wakeup.set()
+
+
+async def ingest(args: argparse.Namespace) -> int:
+    """Set up the backends, run the ingester and clean up."""
+    from .server import get_backends, preconnect_backends, preload_marker_models
+    from .registry import registry
+
+    backends = await asyncio.to_thread(get_backends)
+    if not backends:
+        print("No OCR backends available", file=sys.stderr)
+        return 1
+    print(f"Available backends: {', '.join(b.name for b in backends)}", file=sys.stderr)
+    if settings.MARKER_PRELOAD and any(b.name == "marker" for b in backends):
+        await preload_marker_models()
+    if settings.HTTP_PRECONNECT:
+        await preconnect_backends(backends)
+
+    output = args.output or args.source
+    manifest = IngestManifest(args.manifest or os.path.join(output, MANIFEST_NAME))
+    ingester = Ingester(
+        source=args.source,
+        output=output,
+        manifest=manifest,
+        workers=args.workers,
+        backend=args.backend,
+        once=args.once,
+        poll_seconds=args.interval,
+        settle_seconds=args.settle,
+        max_attempts=args.max_attempts,
+        retry_seconds=settings.INGEST_RETRY_SECONDS,
+        report_seconds=args.report_interval,
+        extensions=parse_extensions(args.extensions)
+    )
+
+    loop = asyncio.get_running_loop()
+    main_task = asyncio.current_task()
+    signals = 0
+
+    def on_signal() -> None:
+        # The first signal lets running files finish; the second cancels them
+        nonlocal signals
+        signals += 1
+        if signals == 1:
+            print("Stopping: finishing running files (signal again to stop now)", file=sys.stderr)
+            ingester.stop()
+        else:
+            main_task.cancel()
+
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, on_signal)
+        except (NotImplementedError, RuntimeError):
+            pass
+
+    try:
+        stats = await ingester.run()
+    except asyncio.CancelledError:
+        print("Stopped; interrupted files run again on the next start", file=sys.stderr)
+        return 130
+    finally:
+        manifest.close()
+        await registry.aclose()
+
+    if args.once:
+        print(json.dumps(stats, indent=2))
+    return 1 if stats["failed"] else 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command line interface of the hot-folder ingester."""
+    parser = argparse.ArgumentParser(
+        prog="ocr-mcp-ingest",
+        description="OCR every file in a folder and write .txt/.json sidecars."
+    )
+    parser.add_argument("source", help="Folder to watch")
+    parser.add_argument(
+        "--output",
+        help="Folder for the sidecars, mirroring the source layout (default: next to the files)"
+    )
+    parser.add_argument(
+        "--manifest",
+        help=f"Manifest database (default: {MANIFEST_NAME} in the output folder)"
+    )
+    parser.add_argument("--once", action="store_true", help="Process the folder once and exit")
+    parser.add_argument(
+        "--status",
+        action="store_true",
+        help="Print the manifest counts and recent failures, then exit"
+    )
+    parser.add_argument(
+        "--backend",
+        type=str.lower,
+        help="Use only this backend, without fallback (default: the fallback chain)"
+    )
+    parser.add_argument("--workers", type=int, default=settings.INGEST_WORKERS)
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=settings.INGEST_POLL_SECONDS,
+        help="Seconds between scans of the folder"
+    )
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=settings.INGEST_SETTLE_SECONDS,
+        help="Skip files modified less than this many seconds ago"
+    )
+    parser.add_argument("--max-attempts", type=int, default=settings.INGEST_MAX_ATTEMPTS)
+    parser.add_argument(
+        "--report-interval",
+        type=float,
+        default=settings.INGEST_REPORT_SECONDS,
+        help="Seconds between progress lines (0 = only at the end)"
+    )
+    parser.add_argument(
+        "--extensions",
+        default=settings.INGEST_EXTENSIONS,
+        help="Comma-separated file extensions to OCR"
+    )
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.source):
+        parser.error(f"not a folder: {args.source}")
+
+    if args.status:
+        output = args.output or args.source
+        manifest = IngestManifest(args.manifest or os.path.join(output, MANIFEST_NAME))
+        try:
+            status = {"files": manifest.counts(), "failures": manifest.failures()}
+        finally:
+            manifest.close()
+        print(json.dumps(status, indent=2))
+        return 0
+
+    is_valid, errors = settings.validate()
+    if not is_valid:
+        print("Configuration errors:", file=sys.stderr)
+        for error in errors:
+            print(f"  - {error}", file=sys.stderr)
+        return 1
+    if args.backend and args.backend not in settings.ENABLED_BACKENDS:
+        parser.error(f"backend {args.backend} is not enabled")
+
+    try:
+        return asyncio.run(ingest(args))
+    except KeyboardInterrupt:
+        return 130
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,457 @@
+"""Asynchronous OCR jobs: a persistent job store and an in-process scheduler."""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .backends.base import OCRResult
+from .config import settings
+from .pages import ChunkCallback, PageChunk
+
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+FINISHED = (DONE, FAILED, CANCELLED)
+
+# Lower runs first
+PRIORITIES = {"high": 0, "normal": 1, "low": 2}
+PRIORITY_NAMES = {value: name for name, value in PRIORITIES.items()}
+
+
+class JobStore:
+    """
+    SQLite table of OCR jobs and their results.
+
+    Results are stored zlib-compressed like the result cache. All methods
+    block; the scheduler calls them from worker threads.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.expanduser(directory)
+        self.path = os.path.join(self.directory, "jobs.sqlite3")
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _db(self) -> sqlite3.Connection:
+        if self._conn is None:
+            os.makedirs(self.directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    status TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    file_path TEXT NOT NULL,
+                    options TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    pages_done INTEGER NOT NULL DEFAULT 0,
+                    pages_total INTEGER,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    error TEXT,
+                    result BLOB
+                )
+                """
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS jobs_queue ON jobs (status, priority, created_at)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def add(self, file_path: str, options: Dict[str, Any], priority: int) -> str:
+        """Queue a new job and return its ID."""
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "INSERT INTO jobs (id, status, priority, file_path, options, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (job_id, QUEUED, priority, file_path, json.dumps(options), time.time())
+            )
+            db.commit()
+        return job_id
+
+    def claim_next(self) -> Optional[Dict[str, Any]]:
+        """Mark the highest-priority, oldest queued job as running and return it."""
+        with self._lock:
+            db = self._db()
+            while True:
+                row = db.execute(
+                    "SELECT id, file_path, options FROM jobs WHERE status = ? "
+                    "ORDER BY priority, created_at LIMIT 1",
+                    (QUEUED,)
+                ).fetchone()
+                if row is None:
+                    return None
+                job_id, file_path, options = row
+                # Only claim the job if it is still queued; another process
+                # sharing the store may have claimed or cancelled it
+                cursor = db.execute(
+                    "UPDATE jobs SET status = ?, started_at = ?, attempts = attempts + 1 "
+                    "WHERE id = ? AND status = ?",
+                    (RUNNING, time.time(), job_id, QUEUED)
+                )
+                db.commit()
+                if cursor.rowcount:
+                    return {"id": job_id, "file_path": file_path, "options": json.loads(options)}
+
+    def progress(self, job_id: str, pages_done: int, pages_total: int) -> bool:
+        """Record a running job's progress; returns False once it was cancelled."""
+        with self._lock:
+            db = self._db()
+            cursor = db.execute(
+                "UPDATE jobs SET pages_done = ?, pages_total = ? WHERE id = ? AND status = ?",
+                (pages_done, pages_total, job_id, RUNNING)
+            )
+            db.commit()
+            return cursor.rowcount > 0
+
+    def is_cancelled(self, job_id: str) -> bool:
+        with self._lock:
+            row = self._db().execute(
+                "SELECT status FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        return row is not None and row[0] == CANCELLED
+
+    def finish(self, job_id: str, result: OCRResult) -> bool:
+        """
+        Store the outcome of a running job (a cancelled job stays cancelled).
+
+        Returns:
+            Whether the job was still running and its outcome was stored
+        """
+        status = FAILED if result.error is not None else DONE
+        blob = zlib.compress(json.dumps(result.to_dict()).encode("utf-8"))
+        pages = (result.metadata or {}).get("page_count")
+        with self._lock:
+            db = self._db()
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, finished_at = ?, error = ?, result = ?, "
+                "pages_total = COALESCE(?, pages_total), "
+                "pages_done = COALESCE(?, pages_done) WHERE id = ? AND status = ?",
+                (status, time.time(), result.error, blob, pages, pages, job_id, RUNNING)
+            )
+            db.commit()
+            return cursor.rowcount > 0
+
+    def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a job that has not finished.
+
+        Each status change is a single conditional update, so a job claimed
+        by a worker at the same moment is either cancelled while queued or
+        cancelled while running, never lost in between. A running job is
+        only marked cancelled here; its worker notices and stops.
+
+        Returns:
+            The job's status before the call, or None if it does not exist
+        """
+        with self._lock:
+            db = self._db()
+            for previous in (QUEUED, RUNNING):
+                cursor = db.execute(
+                    "UPDATE jobs SET status = ?, finished_at = ? WHERE id = ? AND status = ?",
+                    (CANCELLED, time.time(), job_id, previous)
+                )
+                db.commit()
+                if cursor.rowcount:
+                    return previous
+            row = db.execute("SELECT status FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            return row[0] if row is not None else None
+
+    def requeue_running(self) -> int:
+        """Put jobs left running by a previous process back in the queue."""
+        with self._lock:
+            db = self._db()
+            cursor = db.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?",
+                (QUEUED, RUNNING)
+            )
+            db.commit()
+            return cursor.rowcount
+
+    def requeue(self, job_id: str) -> None:
+        with self._lock:
+            db = self._db()
+            db.execute(
+                "UPDATE jobs SET status = ?, started_at = NULL WHERE id = ? AND status = ?",
+                (QUEUED, job_id, RUNNING)
+            )
+            db.commit()
+
+    def purge(self, retention_seconds: float) -> int:
+        """Delete finished jobs older than ``retention_seconds`` (0 keeps them)."""
+        if retention_seconds <= 0:
+            return 0
+        with self._lock:
+            db = self._db()
+            cursor = db.execute(
+                f"DELETE FROM jobs WHERE status IN ({', '.join('?' * len(FINISHED))}) "
+                "AND finished_at < ?",
+                (*FINISHED, time.time() - retention_seconds)
+            )
+            db.commit()
+            return cursor.rowcount
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a job's status, progress and queue position."""
+        with self._lock:
+            db = self._db()
+            row = db.execute(
+                "SELECT id, status, priority, file_path, options, created_at, started_at, "
+                "finished_at, pages_done, pages_total, attempts, error FROM jobs WHERE id = ?",
+                (job_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            job = self._describe(row)
+            if job["status"] == QUEUED:
+                job["queue_position"] = db.execute(
+                    "SELECT COUNT(*) FROM jobs WHERE status = ? AND "
+                    "(priority < ? OR (priority = ? AND created_at < ?))",
+                    (QUEUED, row[2], row[2], row[5])
+                ).fetchone()[0] + 1
+        return job
+
+    def result(self, job_id: str) -> Optional[OCRResult]:
+        """Return the stored result of a finished job."""
+        with self._lock:
+            row = self._db().execute(
+                "SELECT result FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+        if row is None or row[0] is None:
+            return None
+        data = json.loads(zlib.decompress(row[0]))
+        return OCRResult(
+            text=data["text"],
+            backend=data["backend"],
+            confidence=data.get("confidence"),
+            metadata=data.get("metadata"),
+            error=data.get("error")
+        )
+
+    def list(self, limit: int = 20, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List the most recent jobs, optionally with one status."""
+        query = (
+            "SELECT id, status, priority, file_path, options, created_at, started_at, "
+            "finished_at, pages_done, pages_total, attempts, error FROM jobs"
+        )
+        params: tuple = ()
+        if status:
+            query += " WHERE status = ?"
+            params = (status,)
+        with self._lock:
+            rows = self._db().execute(
+                query + " ORDER BY created_at DESC LIMIT ?", (*params, limit)
+            ).fetchall()
+        return [self._describe(row) for row in rows]
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            rows = self._db().execute(
+                "SELECT status, COUNT(*) FROM jobs GROUP BY status"
+            ).fetchall()
+        return dict(rows)
+
+    @staticmethod
+    def _describe(row: tuple) -> Dict[str, Any]:
+        (job_id, status, priority, file_path, options, created_at, started_at,
+         finished_at, pages_done, pages_total, attempts, error) = row
+        return {
+            "job_id": job_id,
+            "status": status,
+            "priority": PRIORITY_NAMES.get(priority, priority),
+            "file_path": file_path,
+            "options": json.loads(options),
+            "created_at": created_at,
+            "started_at": started_at,
+            "finished_at": finished_at,
+            "pages_done": pages_done,
+            "pages_total": pages_total,
+            "attempts": attempts,
+            "error": error,
+        }
+
+    def close(self) -> None:
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+JobRunner = Callable[[str, Dict[str, Any], ChunkCallback], Awaitable[OCRResult]]
+
+
+class JobScheduler:
+    """
+    Runs queued jobs on ``JOBS_WORKERS`` asyncio workers.
+
+    Workers claim the highest-priority, oldest job from the store, so the
+    queue survives restarts: jobs still running when the server stopped are
+    queued again on the next start. Cancelling a running job marks it
+    cancelled in the store and cancels its task; workers also check the
+    store when they start a job and after every page chunk, so a job
+    cancelled by another process sharing the store stops as well. Stopping
+    the scheduler puts running jobs back in the queue.
+
+    Args:
+        run: Coroutine that OCRs one job: ``run(file_path, options, on_chunk)``
+    """
+
+    def __init__(self, run: JobRunner):
+        self.run = run
+        self._store: Optional[JobStore] = None
+        self._workers: List[asyncio.Task] = []
+        self._running: Dict[str, asyncio.Task] = {}
+        self._cancelled: set = set()
+        self._wakeup: Optional[asyncio.Event] = None
+        self.completed = 0
+        self.failed = 0
+        self.cancelled = 0
+
+    @property
+    def store(self) -> JobStore:
+        if self._store is None:
+            self._store = JobStore(settings.JOBS_DIR)
+        return self._store
+
+    async def start(self) -> None:
+        """Requeue interrupted jobs and start the workers (idempotent)."""
+        if self._workers:
+            return
+        self._wakeup = asyncio.Event()
+        requeued = await asyncio.to_thread(self.store.requeue_running)
+        if requeued:
+            print(f"Resuming {requeued} interrupted OCR job(s)", file=sys.stderr)
+        await asyncio.to_thread(self.store.purge, settings.JOBS_RETENTION_SECONDS)
+        self._workers = [
+            asyncio.create_task(self._worker()) for _ in range(max(1, settings.JOBS_WORKERS))
+        ]
+        self._wakeup.set()
+
+    async def resume(self) -> None:
+        """Start the workers if a job store from an earlier run exists."""
+        if os.path.exists(self.store.path):
+            await self.start()
+
+    async def stop(self) -> None:
+        """Stop the workers; running jobs are queued again for the next start."""
+        workers, self._workers = self._workers, []
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    async def submit(self, file_path: str, options: Dict[str, Any], priority: str = "normal") -> str:
+        """Queue a job and return its ID."""
+        await self.start()
+        job_id = await asyncio.to_thread(
+            self.store.add, file_path, options, PRIORITIES[priority]
+        )
+        self._wakeup.set()
+        return job_id
+
+    async def cancel(self, job_id: str) -> Optional[str]:
+        """
+        Cancel a queued or running job.
+
+        Returns:
+            The job's status before cancelling, or None if it does not exist
+        """
+        previous = await asyncio.to_thread(self.store.cancel, job_id)
+        if previous == RUNNING:
+            self._stop(job_id)
+        if previous is not None and previous not in FINISHED:
+            self.cancelled += 1
+        return previous
+
+    def _stop(self, job_id: str) -> None:
+        """Cancel the task of a job that was cancelled in the store."""
+        task = self._running.get(job_id)
+        if task is not None:
+            self._cancelled.add(job_id)
+            task.cancel()
+
+    async def status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.get, job_id)
+
+    async def result(self, job_id: str) -> Optional[OCRResult]:
+        return await asyncio.to_thread(self.store.result, job_id)
+
+    async def list(self, limit: int = 20, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await asyncio.to_thread(self.store.list, limit, status)
+
+    async def _worker(self) -> None:
+        while True:
+            job = await asyncio.to_thread(self.store.claim_next)
+            if job is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            # Let the other workers look for more work as well
+            self._wakeup.set()
+            await self._run_job(job)
+
+    async def _run_job(self, job: Dict[str, Any]) -> None:
+        job_id = job["id"]
+
+        async def on_chunk(chunk: PageChunk, result: OCRResult, pages_done: int, total: int) -> None:
+            running = await asyncio.to_thread(self.store.progress, job_id, pages_done, total)
+            if not running:
+                self._stop(job_id)
+
+        task = asyncio.create_task(self.run(job["file_path"], job["options"], on_chunk))
+        self._running[job_id] = task
+        try:
+            # A cancel between claiming the job and registering its task
+            # found nothing to stop; the store still records it
+            if await asyncio.to_thread(self.store.is_cancelled, job_id):
+                self._stop(job_id)
+            result = await task
+        except asyncio.CancelledError:
+            if job_id in self._cancelled:
+                # Cancelled through the store, which already says so
+                return
+            # The scheduler is stopping: run the job again on the next start
+            task.cancel()
+            await asyncio.to_thread(self.store.requeue, job_id)
+            raise
+        except Exception as e:
+            result = OCRResult(text="", backend="none", error=f"Job failed: {e}")
+        finally:
+            self._running.pop(job_id, None)
+            self._cancelled.discard(job_id)
+
+        if not await asyncio.to_thread(self.store.finish, job_id, result):
+            # Cancelled after the job had already produced its result
+            return
+        if result.error is None:
+            self.completed += 1
+        else:
+            self.failed += 1
+        await asyncio.to_thread(self.store.purge, settings.JOBS_RETENTION_SECONDS)
+
+    async def stats(self) -> Dict[str, Any]:
+        counts = await asyncio.to_thread(self.store.counts)
+        return {
+            "workers": len(self._workers),
+            "running": len(self._running),
+            "jobs": counts,
+            "completed": self.completed,
+            "failed": self.failed,
+            "cancelled": self.cancelled,
+        }
@@ -0,0 +1,321 @@
+"""Concurrency and rate limits shared by every caller in the process."""
+
+import asyncio
+import time
+import weakref
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from .config import settings
+
+
+def parse_backend_limits(value: str, cast: Callable[[str], Any] = int) -> Dict[str, Any]:
+    """Parse ``"marker=2,mistral=8"`` into ``{"marker": 2, "mistral": 8}``."""
+    limits = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        name, _, limit = item.partition("=")
+        name = name.strip().lower()
+        if name and limit.strip():
+            limits[name] = cast(limit)
+    return limits
+
+
+class WaitStats:
+    """Running totals of how long callers waited for something."""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "calls": self.count,
+            "avg_wait_seconds": self.total / self.count if self.count else None,
+            "max_wait_seconds": self.max,
+            "total_wait_seconds": self.total,
+        }
+
+
+class BackendSlots:
+    """Semaphore with counters for one backend or client."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.semaphore = asyncio.Semaphore(limit)
+        self.active = 0
+        self.waiting = 0
+        self.waits = WaitStats()
+
+    @asynccontextmanager
+    async def hold(self) -> AsyncIterator[float]:
+        """Hold one slot; yields the seconds spent waiting for it."""
+        start = time.monotonic()
+        self.waiting += 1
+        try:
+            await self.semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        waited = time.monotonic() - start
+        self.waits.add(waited)
+        self.active += 1
+        try:
+            yield waited
+        finally:
+            self.active -= 1
+            self.semaphore.release()
+
+
+class ConcurrencyLimiter:
+    """
+    Caps simultaneous calls per backend.
+
+    Limits come from ``BACKEND_CONCURRENCY``; backends without an entry use
+    ``BACKEND_CONCURRENCY_DEFAULT`` (0 means unlimited).
+    """
+
+    def __init__(self):
+        self._slots: Dict[str, Optional[BackendSlots]] = {}
+
+    def _limit_for(self, name: str) -> int:
+        limits = parse_backend_limits(settings.BACKEND_CONCURRENCY)
+        return limits.get(name, settings.BACKEND_CONCURRENCY_DEFAULT)
+
+    def _get(self, name: str) -> Optional[BackendSlots]:
+        limit = self._limit_for(name)
+        slots = self._slots.get(name)
+        if slots is None or slots.limit != limit:
+            # Created on first use and again if a reload changed the limit
+            slots = BackendSlots(limit) if limit > 0 else None
+            self._slots[name] = slots
+        return slots
+
+    @asynccontextmanager
+    async def limit(self, name: str) -> AsyncIterator[float]:
+        """
+        Hold one of the backend's slots for the duration of a call.
+
+        Yields the seconds spent waiting for the slot.
+        """
+        slots = self._get(name)
+        if slots is None:
+            yield 0.0
+            return
+
+        async with slots.hold() as waited:
+            yield waited
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "limit": slots.limit,
+                "active": slots.active,
+                "waiting": slots.waiting,
+                **slots.waits.stats(),
+            }
+            for name, slots in self._slots.items()
+            if slots is not None
+        }
+
+
+backend_limiter = ConcurrencyLimiter()
+
+
+class ClientLimiter:
+    """
+    Caps simultaneous OCR calls per connected client.
+
+    When one server instance is shared over a network transport,
+    ``CLIENT_CONCURRENCY`` (0 means unlimited) keeps a single busy client
+    from occupying every backend slot. Clients are identified by their MCP
+    session and forgotten when the session goes away.
+    """
+
+    def __init__(self):
+        self._slots: "weakref.WeakKeyDictionary[Any, BackendSlots]" = weakref.WeakKeyDictionary()
+        self.waits = WaitStats()
+
+    @asynccontextmanager
+    async def limit(self, client: Any) -> AsyncIterator[float]:
+        """
+        Hold one of the client's slots for the duration of a call.
+
+        Yields the seconds spent waiting for the slot.
+        """
+        limit = settings.CLIENT_CONCURRENCY
+        if client is None or limit <= 0:
+            yield 0.0
+            return
+
+        slots = self._slots.get(client)
+        if slots is None or slots.limit != limit:
+            slots = BackendSlots(limit)
+            self._slots[client] = slots
+        async with slots.hold() as waited:
+            self.waits.add(waited)
+            yield waited
+
+    def stats(self) -> Dict[str, Any]:
+        clients = list(self._slots.values())
+        return {
+            "limit": settings.CLIENT_CONCURRENCY,
+            "clients": len(clients),
+            "active": sum(slots.active for slots in clients),
+            "waiting": sum(slots.waiting for slots in clients),
+            **self.waits.stats(),
+        }
+
+
+client_limiter = ClientLimiter()
+
+
+class TokenBucket:
+    """
+    Classic token bucket refilled continuously at ``rate`` tokens per second.
+
+    Waiters are served one at a time in arrival order, so a large request
+    cannot be starved by a stream of small ones. The balance may go
+    negative after ``adjust`` when a call used more than it reserved; later
+    callers then wait for the debt to be refilled.
+    """
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until ``amount`` tokens are available and take them."""
+        # A request larger than the bucket would otherwise wait forever
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            self._refill()
+            while self.tokens < amount:
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+                self._refill()
+            self.tokens -= amount
+
+    def adjust(self, amount: float) -> None:
+        """Take (or with a negative amount, give back) tokens after the fact."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens - amount)
+
+
+class BackendRate:
+    """Request and token buckets plus Retry-After state for one backend."""
+
+    def __init__(self, requests_per_second: float, tokens_per_minute: float):
+        self.requests_per_second = requests_per_second
+        self.tokens_per_minute = tokens_per_minute
+        self.requests = (
+            TokenBucket(requests_per_second, max(1.0, requests_per_second))
+            if requests_per_second > 0 else None
+        )
+        self.tokens = (
+            TokenBucket(tokens_per_minute / 60, tokens_per_minute)
+            if tokens_per_minute > 0 else None
+        )
+        self.blocked_until = 0.0
+        self.retry_after_events = 0
+        self.tokens_used = 0
+        self.waits = WaitStats()
+
+
+class RateLimiter:
+    """
+    Shared request-rate and token-rate limits per backend.
+
+    Rates come from ``RATE_LIMIT_RPS`` and ``RATE_LIMIT_TPM`` (e.g.
+    ``"mistral=5,deepseek=2"``); unlisted backends are not rate limited. A
+    ``Retry-After`` from the provider pauses every caller of that backend,
+    not just the one that received it.
+    """
+
+    def __init__(self):
+        self._rates: Dict[str, BackendRate] = {}
+
+    def _get(self, name: str) -> BackendRate:
+        rps = parse_backend_limits(settings.RATE_LIMIT_RPS, float).get(name, 0.0)
+        tpm = parse_backend_limits(settings.RATE_LIMIT_TPM, float).get(name, 0.0)
+        rate = self._rates.get(name)
+        if rate is None or (rate.requests_per_second, rate.tokens_per_minute) != (rps, tpm):
+            # Created on first use and again if a reload changed the rates
+            previous = rate
+            rate = BackendRate(rps, tpm)
+            if previous is not None:
+                rate.blocked_until = previous.blocked_until
+            self._rates[name] = rate
+        return rate
+
+    async def _wait_unblocked(self, rate: BackendRate) -> None:
+        while True:
+            delay = rate.blocked_until - time.monotonic()
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+
+    async def acquire(self, name: str, tokens: float = 0) -> float:
+        """
+        Wait for permission to send one request expected to use ``tokens``.
+
+        Returns:
+            Seconds spent waiting
+        """
+        rate = self._get(name)
+        start = time.monotonic()
+        await self._wait_unblocked(rate)
+        if rate.requests is not None:
+            await rate.requests.acquire(1)
+        if rate.tokens is not None and tokens > 0:
+            await rate.tokens.acquire(tokens)
+        # A Retry-After may have arrived while we were queued in a bucket
+        await self._wait_unblocked(rate)
+        waited = time.monotonic() - start
+        rate.waits.add(waited)
+        return waited
+
+    def record_usage(self, name: str, reserved: float, used: Optional[float]) -> None:
+        """Settle the difference between reserved and actually used tokens."""
+        rate = self._get(name)
+        if used is None:
+            return
+        rate.tokens_used += int(used)
+        if rate.tokens is not None:
+            rate.tokens.adjust(used - reserved)
+
+    def retry_after(self, name: str, seconds: float) -> None:
+        """Hold back every request to a backend for ``seconds``."""
+        rate = self._get(name)
+        rate.retry_after_events += 1
+        rate.blocked_until = max(rate.blocked_until, time.monotonic() + seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            name: {
+                "requests_per_second": rate.requests_per_second or None,
+                "tokens_per_minute": rate.tokens_per_minute or None,
+                "tokens_used": rate.tokens_used,
+                "retry_after_events": rate.retry_after_events,
+                "blocked_for_seconds": max(0.0, rate.blocked_until - now),
+                **rate.waits.stats(),
+            }
+            for name, rate in self._rates.items()
+        }
+
+
+rate_limiter = RateLimiter()
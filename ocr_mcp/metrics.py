@@ -0,0 +1,321 @@
+"""Per-request stage timings and process-wide histograms of them."""
+
+import asyncio
+import contextvars
+import dataclasses
+import sys
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    # Annotations only; the backends package itself imports this module
+    from .backends.base import OCRResult
+
+
+# Upper bounds of the latency buckets, in seconds
+SECONDS_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+# Upper bounds of the input size buckets, in bytes
+BYTES_BUCKETS = tuple(float(2 ** power) for power in range(12, 28, 2))
+
+
+class Histogram:
+    """Fixed-bucket histogram; quantiles are estimated as bucket upper bounds."""
+
+    def __init__(self, buckets: Tuple[float, ...] = SECONDS_BUCKETS):
+        self.buckets = buckets
+        # The last slot counts values above the largest bound (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th (0-1) observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def snapshot(self) -> Dict[str, Any]:
+        mean = self.sum / self.count if self.count else None
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 4),
+            "mean": round(mean, 4) if mean is not None else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "p99": self.quantile(0.99),
+        }
+
+
+class RequestTrace:
+    """
+    Stage durations and counters of one request.
+
+    Stages nest and overlap: a backend call includes its preprocess and
+    network stages, and page chunks processed in parallel add up their
+    time. ``total_seconds`` is the wall-clock time of the request.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages: Dict[str, float] = {}
+        self.input_bytes = 0
+        self.sent_bytes = 0
+        self.received_bytes = 0
+        self.retries = 0
+        self.backends_tried: List[str] = []
+
+    def add_stage(self, name: str, seconds: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "total_seconds": round(time.perf_counter() - self.started, 4),
+            "stages": {name: round(seconds, 4) for name, seconds in self.stages.items()},
+            "input_bytes": self.input_bytes,
+            "sent_bytes": self.sent_bytes,
+            "received_bytes": self.received_bytes,
+            "retries": self.retries,
+            "backends_tried": list(self.backends_tried),
+        }
+
+
+# Trace of the request running in the current task; tasks started for page
+# chunks and hedges inherit it, so their stages land on the same request
+_current: contextvars.ContextVar[Optional[RequestTrace]] = contextvars.ContextVar(
+    "ocr_request_trace", default=None
+)
+
+
+def current_trace() -> Optional[RequestTrace]:
+    return _current.get()
+
+
+class Metrics:
+    """Aggregates request traces into counters and histograms."""
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self) -> None:
+        self.started_at = time.time()
+        self.stages: Dict[str, Histogram] = {}
+        self.requests: Dict[str, int] = {}
+        self.request_seconds = Histogram()
+        self.input_bytes = Histogram(BYTES_BUCKETS)
+        self.backend_seconds: Dict[str, Histogram] = {}
+        self.backend_calls: Dict[Tuple[str, str], int] = {}
+        self.retries: Dict[str, int] = {}
+        self.bytes: Dict[str, int] = {"input": 0, "sent": 0, "received": 0}
+
+    def observe_stage(self, name: str, seconds: float) -> None:
+        self.stages.setdefault(name, Histogram()).observe(seconds)
+
+    def observe_backend(self, backend: str, ok: bool, seconds: float) -> None:
+        key = (backend, "ok" if ok else "error")
+        self.backend_calls[key] = self.backend_calls.get(key, 0) + 1
+        self.backend_seconds.setdefault(backend, Histogram()).observe(seconds)
+
+    def observe_request(self, trace: RequestTrace, result: "OCRResult") -> None:
+        metadata = result.metadata or {}
+        if result.error is not None:
+            outcome = "error"
+        elif metadata.get("cache_hit"):
+            outcome = "cache_hit"
+        elif metadata.get("deduplicated"):
+            outcome = "deduplicated"
+        else:
+            outcome = "ok"
+        self.requests[outcome] = self.requests.get(outcome, 0) + 1
+        self.request_seconds.observe(time.perf_counter() - trace.started)
+        if trace.input_bytes:
+            self.input_bytes.observe(trace.input_bytes)
+
+    def snapshot(self) -> Dict[str, Any]:
+        backends = {}
+        for name, histogram in self.backend_seconds.items():
+            backends[name] = {
+                "ok": self.backend_calls.get((name, "ok"), 0),
+                "errors": self.backend_calls.get((name, "error"), 0),
+                "retries": self.retries.get(name, 0),
+                "seconds": histogram.snapshot(),
+            }
+        return {
+            "since": self.started_at,
+            "requests": dict(self.requests),
+            "request_seconds": self.request_seconds.snapshot(),
+            "input_bytes": self.input_bytes.snapshot(),
+            "stages": {name: h.snapshot() for name, h in sorted(self.stages.items())},
+            "backends": backends,
+            "bytes": dict(self.bytes),
+        }
+
+    def render_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, h: Histogram, labels: str = "") -> None:
+            cumulative = 0
+            for bound, count in zip(h.buckets, h.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels}le="{bound:g}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels}le="+Inf"}} {h.count}')
+            suffix = f"{{{labels.rstrip(',')}}}" if labels else ""
+            lines.append(f"{name}_sum{suffix} {h.sum:.6f}")
+            lines.append(f"{name}_count{suffix} {h.count}")
+
+        header("ocr_requests_total", "counter", "OCR requests by outcome")
+        for outcome, count in sorted(self.requests.items()):
+            lines.append(f'ocr_requests_total{{outcome="{outcome}"}} {count}')
+
+        header("ocr_request_seconds", "histogram", "End-to-end OCR request duration")
+        histogram("ocr_request_seconds", self.request_seconds)
+
+        header("ocr_input_bytes", "histogram", "Size of OCR request input")
+        histogram("ocr_input_bytes", self.input_bytes)
+
+        header("ocr_stage_seconds", "histogram", "Time spent in each processing stage")
+        for name, h in sorted(self.stages.items()):
+            histogram("ocr_stage_seconds", h, f'stage="{name}",')
+
+        header("ocr_backend_seconds", "histogram", "Duration of backend calls")
+        for name, h in sorted(self.backend_seconds.items()):
+            histogram("ocr_backend_seconds", h, f'backend="{name}",')
+
+        header("ocr_backend_calls_total", "counter", "Backend calls by outcome")
+        for (name, outcome), count in sorted(self.backend_calls.items()):
+            lines.append(f'ocr_backend_calls_total{{backend="{name}",outcome="{outcome}"}} {count}')
+
+        header("ocr_backend_retries_total", "counter", "API attempts that were retried")
+        for name, count in sorted(self.retries.items()):
+            lines.append(f'ocr_backend_retries_total{{backend="{name}"}} {count}')
+
+        header("ocr_bytes_total", "counter", "Bytes read from input, sent to and received from APIs")
+        for direction, count in sorted(self.bytes.items()):
+            lines.append(f'ocr_bytes_total{{direction="{direction}"}} {count}')
+
+        return "\n".join(lines) + "\n"
+
+
+metrics = Metrics()
+
+
+@contextmanager
+def start_trace() -> Iterator[RequestTrace]:
+    """Make a new trace current for the duration of one request."""
+    trace = RequestTrace()
+    token = _current.set(trace)
+    try:
+        yield trace
+    finally:
+        _current.reset(token)
+
+
+def finish_trace(trace: RequestTrace, result: "OCRResult") -> "OCRResult":
+    """
+    Record a finished request and return its result with ``timings`` attached.
+
+    A copy is returned so results shared with the cache or other waiters
+    keep their own metadata.
+    """
+    metrics.observe_request(trace, result)
+    return dataclasses.replace(
+        result,
+        metadata={**(result.metadata or {}), "timings": trace.report()}
+    )
+
+
+def record_stage(name: str, seconds: float) -> None:
+    """Record a stage duration measured elsewhere."""
+    trace = _current.get()
+    if trace is not None:
+        trace.add_stage(name, seconds)
+    metrics.observe_stage(name, seconds)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as one stage of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def count(
+    backend: Optional[str] = None,
+    input_bytes: int = 0,
+    sent_bytes: int = 0,
+    received_bytes: int = 0,
+    retries: int = 0
+) -> None:
+    """Add to the byte and retry counters of the current request."""
+    trace = _current.get()
+    if trace is not None:
+        trace.input_bytes += input_bytes
+        trace.sent_bytes += sent_bytes
+        trace.received_bytes += received_bytes
+        trace.retries += retries
+    metrics.bytes["input"] += input_bytes
+    metrics.bytes["sent"] += sent_bytes
+    metrics.bytes["received"] += received_bytes
+    if retries and backend:
+        metrics.retries[backend] = metrics.retries.get(backend, 0) + retries
+
+
+def record_backend(backend: str, ok: bool, seconds: float) -> None:
+    """Record one backend call of the current request."""
+    trace = _current.get()
+    if trace is not None:
+        trace.backends_tried.append(backend)
+        trace.add_stage(f"backend.{backend}", seconds)
+    metrics.observe_backend(backend, ok, seconds)
+
+
+async def serve_prometheus(host: str, port: int) -> asyncio.AbstractServer:
+    """
+    Serve ``GET /metrics`` in the Prometheus text format.
+
+    A minimal HTTP/1.0 responder on the server's event loop; every path
+    returns the metrics.
+    """
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            # Read and ignore the request line and headers
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            body = metrics.render_prometheus().encode("utf-8")
+            writer.write(
+                b"HTTP/1.0 200 OK\r\n"
+                b"Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                + f"Content-Length: {len(body)}\r\n\r\n".encode("ascii")
+                + body
+            )
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Prometheus metrics on http://{host}:{port}/metrics", file=sys.stderr)
+    return server
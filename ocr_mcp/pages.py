@@ -0,0 +1,462 @@
+"""Split PDFs into page chunks and OCR them concurrently."""
+
+import asyncio
+import os
+import tempfile
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from pypdf import PdfReader, PdfWriter
+
+from .backends.base import OCRResult
+from .deadline import current_deadline
+from .metrics import stage
+
+
+CHUNK_SEPARATOR = "\n\n"
+# Backend name reported for pages taken from the PDF's own text layer
+TEXT_LAYER = "text_layer"
+
+# 0-based first page and exclusive end of a selected range; an end of None
+# runs to the last page of the document
+PageRange = Tuple[int, Optional[int]]
+
+
+@dataclass
+class PageChunk:
+    """
+    A contiguous range of pages written to its own PDF file.
+
+    Pages taken from the PDF's text layer have ``native_text`` set and no
+    file; unchanged pages whose earlier OCR text is reused have ``reused``
+    set and no file.
+    """
+    index: int
+    start: int  # first page, 0-based
+    end: int  # one past the last page
+    path: Optional[str]
+    native_text: Optional[str] = None
+    reused: Optional[OCRResult] = None
+
+    @property
+    def label(self) -> str:
+        """Human readable 1-based page range."""
+        if self.end - self.start == 1:
+            return f"page {self.start + 1}"
+        return f"pages {self.start + 1}-{self.end}"
+
+
+def is_pdf(file_path: str) -> bool:
+    """Check the file signature rather than trusting the extension."""
+    try:
+        with open(file_path, "rb") as f:
+            return f.read(5) == b"%PDF-"
+    except OSError:
+        return False
+
+
+def count_pages(file_path: str) -> int:
+    """Return the number of pages in a PDF."""
+    return len(PdfReader(file_path).pages)
+
+
+def parse_page_ranges(spec: str) -> List[PageRange]:
+    """
+    Parse a page selection such as ``1-5,12,20-`` into 0-based ranges.
+
+    Ranges are kept as pairs, so the size of a selection does not depend on
+    the numbers in it; they are sorted and overlapping or adjacent ones
+    merged. ``20-`` runs to the last page.
+
+    Raises:
+        ValueError: If the selection is malformed
+    """
+    ranges: List[PageRange] = []
+    for part in spec.replace(" ", "").split(","):
+        if not part:
+            continue
+        first, dash, last = part.partition("-")
+        try:
+            start = int(first)
+            end: Optional[int] = int(last) if last else (None if dash else start)
+        except ValueError:
+            raise ValueError(f"Invalid page range '{part}' (use e.g. 1-5,12)") from None
+        if start < 1:
+            raise ValueError(f"Invalid page range '{part}' (pages count from 1)")
+        if end is not None and end < start:
+            raise ValueError(
+                f"Invalid page range '{part}' (it ends before it starts; did you mean {end}-{start}?)"
+            )
+        ranges.append((start - 1, end))
+    if not ranges:
+        raise ValueError("No pages selected")
+
+    merged: List[PageRange] = []
+    for start, end in sorted(ranges, key=lambda item: item[0]):
+        if merged:
+            last_start, last_end = merged[-1]
+            if last_end is None:
+                break
+            if start <= last_end:
+                merged[-1] = (last_start, None if end is None else max(end, last_end))
+                continue
+        merged.append((start, end))
+    return merged
+
+
+def select_pages(
+    total: int,
+    pages: Optional[List[PageRange]] = None,
+    max_pages: Optional[int] = None
+) -> List[int]:
+    """
+    Pick the 0-based indexes of the pages to process.
+
+    Args:
+        total: Pages in the document
+        pages: Selected ranges from ``parse_page_ranges`` (all pages if
+            omitted)
+        max_pages: Keep at most this many of the selected pages
+
+    Raises:
+        ValueError: If a selected page is past the end of the document
+    """
+    if pages is None:
+        pages = [(0, None)]
+    for start, end in pages:
+        last = start + 1 if end is None else end
+        if last > total:
+            raise ValueError(
+                f"Page {last} is out of range (the document has {total} pages)"
+            )
+    limit = total if max_pages is None else max(0, max_pages)
+    selected: List[int] = []
+    for start, end in pages:
+        selected.extend(range(start, total if end is None else end))
+        if len(selected) >= limit:
+            break
+    return selected[:limit]
+
+
+def extract_pages(
+    file_path: str,
+    output_path: str,
+    pages: Optional[List[PageRange]] = None,
+    max_pages: Optional[int] = None
+) -> tuple[List[int], int]:
+    """
+    Write the selected pages of a PDF to a new file.
+
+    Returns:
+        The 0-based indexes written, in order, and the page count of the
+        original document
+    """
+    reader = PdfReader(file_path)
+    total = len(reader.pages)
+    selected = select_pages(total, pages, max_pages)
+    writer = PdfWriter()
+    for page_number in selected:
+        writer.add_page(reader.pages[page_number])
+    with open(output_path, "wb") as f:
+        writer.write(f)
+    return selected, total
+
+
+def plan_chunks(
+    total: int,
+    chunk_size: int,
+    native: Optional[Dict[int, Any]] = None
+) -> List[tuple[int, int]]:
+    """
+    Group pages into (start, end) ranges.
+
+    Pages in ``native`` (any page that needs no OCR) get a range of their
+    own; the pages between them are grouped into runs of at most
+    ``chunk_size``.
+    """
+    native = native or {}
+    chunk_size = max(1, chunk_size)
+    ranges = []
+    start = 0
+    while start < total:
+        if start in native:
+            ranges.append((start, start + 1))
+            start += 1
+            continue
+        end = start
+        while end < total and end - start < chunk_size and end not in native:
+            end += 1
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def split_pdf(
+    file_path: str,
+    chunk_size: int,
+    directory: str,
+    native: Optional[Dict[int, str]] = None,
+    reused: Optional[Dict[int, OCRResult]] = None
+) -> List[PageChunk]:
+    """
+    Write every ``chunk_size`` pages of a PDF to a separate file.
+
+    Args:
+        file_path: PDF to split
+        chunk_size: Pages per chunk
+        directory: Where to write the chunk files
+        native: Text of pages that need no OCR, by 0-based page index;
+            these become file-less chunks
+        reused: Earlier results of unchanged pages, by 0-based page index;
+            these become file-less chunks too
+
+    Returns:
+        Chunks in page order
+    """
+    native = native or {}
+    reused = reused or {}
+    reader = PdfReader(file_path)
+    total = len(reader.pages)
+
+    chunks = []
+    skipped = {**reused, **native}
+    for index, (start, end) in enumerate(plan_chunks(total, chunk_size, skipped)):
+        if start in native:
+            chunks.append(PageChunk(
+                index=index, start=start, end=end, path=None,
+                native_text=native[start]
+            ))
+            continue
+        if start in reused:
+            chunks.append(PageChunk(
+                index=index, start=start, end=end, path=None,
+                reused=reused[start]
+            ))
+            continue
+        writer = PdfWriter()
+        for page_number in range(start, end):
+            writer.add_page(reader.pages[page_number])
+        path = os.path.join(directory, f"chunk-{index:05d}.pdf")
+        with open(path, "wb") as f:
+            writer.write(f)
+        chunks.append(PageChunk(index=index, start=start, end=end, path=path))
+    return chunks
+
+
+def text_layer_result(text: str) -> OCRResult:
+    """Result for a page whose embedded text is used directly."""
+    return OCRResult(text=text, backend=TEXT_LAYER, confidence=1.0)
+
+
+ChunkCallback = Callable[[PageChunk, OCRResult, int, int], Awaitable[None]]
+# OCRs several chunk files in one go; None when batching is not possible
+BatchProcessor = Callable[[List[str]], Awaitable[Optional[List[OCRResult]]]]
+
+
+async def process_pages(
+    file_path: str,
+    process_chunk: Callable[[str], Awaitable[OCRResult]],
+    chunk_size: int = 4,
+    parallelism: int = 4,
+    retries: int = 1,
+    on_chunk: Optional[ChunkCallback] = None,
+    native: Optional[Dict[int, str]] = None,
+    reused: Optional[Dict[int, OCRResult]] = None,
+    process_batch: Optional[BatchProcessor] = None,
+    batch_size: int = 1
+) -> OCRResult:
+    """
+    OCR a PDF chunk by chunk and stitch the text back together in page order.
+
+    Every chunk goes through ``process_chunk`` (normally the full backend
+    fallback chain) on its own and is retried up to ``retries`` more times,
+    so one bad page range does not fail the whole document.
+
+    With ``process_batch``, consecutive chunks that need OCR are first sent
+    in groups of ``batch_size``; chunks the batch did not get text for go
+    through ``process_chunk`` as usual.
+
+    Args:
+        file_path: PDF to process
+        process_chunk: Coroutine that OCRs a single chunk file
+        chunk_size: Pages per chunk
+        parallelism: Chunks processed at the same time
+        retries: Extra attempts for a failed chunk
+        on_chunk: Called as each chunk finishes with the chunk, its result,
+            pages finished so far and the total page count
+        native: Text of pages that need no OCR, by 0-based page index
+        reused: Earlier results of unchanged pages, by 0-based page index
+        process_batch: Coroutine that OCRs several chunk files at once
+        batch_size: Chunks per ``process_batch`` call
+
+    Returns:
+        Combined OCRResult with per-chunk metadata
+    """
+    with tempfile.TemporaryDirectory(prefix="ocr-mcp-pages-") as directory:
+        with stage("split"):
+            chunks = await asyncio.to_thread(
+                split_pdf, file_path, chunk_size, directory, native, reused
+            )
+        semaphore = asyncio.Semaphore(max(1, parallelism))
+        deadline = current_deadline()
+        total_pages = chunks[-1].end if chunks else 0
+        pages_done = 0
+
+        async def run_batch(group: List[PageChunk]) -> Optional[List[OCRResult]]:
+            async with semaphore:
+                try:
+                    return await process_batch([chunk.path for chunk in group])
+                except Exception:
+                    return None
+
+        # Chunk index -> (batch task, position in the batch)
+        batched: Dict[int, tuple[asyncio.Task, int]] = {}
+        if process_batch is not None and batch_size > 1:
+            pending = [chunk for chunk in chunks if chunk.path is not None]
+            for start in range(0, len(pending), batch_size):
+                group = pending[start:start + batch_size]
+                if len(group) < 2:
+                    continue
+                task = asyncio.ensure_future(run_batch(group))
+                for position, chunk in enumerate(group):
+                    batched[chunk.index] = (task, position)
+
+        async def attempt_chunk(chunk: PageChunk) -> tuple[OCRResult, int]:
+            if chunk.native_text is not None:
+                return text_layer_result(chunk.native_text), 0
+            if chunk.reused is not None:
+                return chunk.reused, 0
+            result = None
+            first_attempt = 0
+            if chunk.index in batched:
+                task, position = batched[chunk.index]
+                results = await task
+                if results is not None:
+                    result = results[position]
+                    first_attempt = 1
+                    if result.error is None and result.text:
+                        return result, 1
+            async with semaphore:
+                for attempt in range(first_attempt, retries + 1):
+                    if attempt and deadline.expired():
+                        return result, attempt
+                    result = await process_chunk(chunk.path)
+                    if result.error is None and result.text:
+                        return result, attempt + 1
+                return result, retries + 1
+
+        async def run(chunk: PageChunk) -> tuple[OCRResult, int]:
+            nonlocal pages_done
+            result, attempts = await attempt_chunk(chunk)
+            pages_done += chunk.end - chunk.start
+            if on_chunk is not None:
+                try:
+                    await on_chunk(chunk, result, pages_done, total_pages)
+                except Exception:
+                    # Progress reporting must never fail the document
+                    pass
+            return result, attempts
+
+        try:
+            outcomes = await asyncio.gather(*(run(chunk) for chunk in chunks))
+        finally:
+            for task, _ in batched.values():
+                task.cancel()
+
+    return combine_chunks(chunks, outcomes)
+
+
+def chunk_texts(result: OCRResult) -> List[tuple[List[int], str]]:
+    """
+    Split a page-split result back into its chunks.
+
+    Returns:
+        List of ([first page, last page], text) in page order, or an empty
+        list if the result was not produced by page splitting
+    """
+    entries = (result.metadata or {}).get("page_results") or []
+    return [
+        (entry["pages"], result.text[entry["offset"]:entry["offset"] + entry["characters"]])
+        for entry in entries
+        if "offset" in entry
+    ]
+
+
+def combine_chunks(
+    chunks: List[PageChunk],
+    outcomes: List[tuple[OCRResult, int]]
+) -> OCRResult:
+    """Merge chunk results, in page order, into one result."""
+    texts = []
+    pages = []
+    backends: List[str] = []
+    errors = []
+    weighted_confidence = 0.0
+    confident_pages = 0
+
+    offset = 0
+    text_layer_pages = 0
+    reused_pages = 0
+    for chunk, (result, attempts) in zip(chunks, outcomes):
+        page_count = chunk.end - chunk.start
+        entry = {
+            "pages": [chunk.start + 1, chunk.end],
+            "backend": result.backend,
+            "attempts": attempts,
+        }
+        if chunk.native_text is not None:
+            text_layer_pages += page_count
+        if chunk.reused is not None:
+            reused_pages += page_count
+            entry["reused"] = True
+
+        if result.error is None and result.text:
+            chunk_text = result.text
+            if result.backend not in backends:
+                backends.append(result.backend)
+            if result.confidence is not None:
+                weighted_confidence += result.confidence * page_count
+                confident_pages += page_count
+        else:
+            error = result.error or "No text extracted"
+            entry["error"] = error
+            errors.append(f"{chunk.label}: {error}")
+            chunk_text = f"[OCR failed for {chunk.label}]"
+
+        # Character range of this chunk in the combined text
+        if texts:
+            offset += len(CHUNK_SEPARATOR)
+        entry["offset"] = offset
+        entry["characters"] = len(chunk_text)
+        offset += len(chunk_text)
+        texts.append(chunk_text)
+        pages.append(entry)
+
+    total_pages = chunks[-1].end if chunks else 0
+    metadata = {
+        "page_count": total_pages,
+        "chunks": len(chunks),
+        "failed_chunks": len(errors),
+        "pages_text_layer": text_layer_pages,
+        "pages_ocr": total_pages - text_layer_pages - reused_pages,
+        "pages_reused": reused_pages,
+        "page_results": pages,
+    }
+
+    if len(errors) == len(chunks):
+        return OCRResult(
+            text="",
+            backend="none",
+            metadata=metadata,
+            error=f"All page chunks failed: {'; '.join(errors)}"
+        )
+
+    if errors:
+        metadata["errors"] = errors
+
+    return OCRResult(
+        text=CHUNK_SEPARATOR.join(texts),
+        backend="+".join(backends),
+        confidence=weighted_confidence / confident_pages if confident_pages else None,
+        metadata=metadata
+    )
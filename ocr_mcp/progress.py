@@ -0,0 +1,71 @@
+"""Report page progress to MCP clients while a document is being processed."""
+
+from typing import Any, Dict, List, Optional, Union
+
+from .backends.base import OCRResult
+from .pages import PageChunk
+
+
+class ProgressReporter:
+    """
+    Sends an MCP progress notification every time a page chunk finishes.
+
+    Chunks can finish out of order when they run in parallel. Progress counts
+    every finished page straight away, but chunk text is only attached once
+    all earlier chunks have been reported, so a client that appends the
+    partial text gets the pages in order.
+    """
+
+    def __init__(
+        self,
+        session: Any,
+        progress_token: Union[str, int],
+        request_id: Optional[Union[str, int]] = None,
+        partial_text: bool = True
+    ):
+        self.session = session
+        self.progress_token = progress_token
+        self.request_id = request_id
+        self.partial_text = partial_text
+        self.notifications = 0
+        self._finished: Dict[int, tuple[PageChunk, OCRResult]] = {}
+        self._next_index = 0
+
+    async def notify(self, progress: float, total: Optional[float], message: str) -> None:
+        await self.session.send_progress_notification(
+            self.progress_token,
+            progress,
+            total=total,
+            message=message,
+            related_request_id=self.request_id
+        )
+        self.notifications += 1
+
+    def _ready(self) -> List[tuple[PageChunk, OCRResult]]:
+        """Pop the finished chunks that directly follow those already reported."""
+        ready = []
+        while self._next_index in self._finished:
+            ready.append(self._finished.pop(self._next_index))
+            self._next_index += 1
+        return ready
+
+    async def on_chunk(
+        self,
+        chunk: PageChunk,
+        result: OCRResult,
+        pages_done: int,
+        total_pages: int
+    ) -> None:
+        """Page callback for ``process_pages``."""
+        self._finished[chunk.index] = (chunk, result)
+
+        lines = [f"{pages_done}/{total_pages} pages done"]
+        for ready_chunk, ready_result in self._ready():
+            if ready_result.error is None and ready_result.text:
+                if self.partial_text:
+                    lines.append(f"--- {ready_chunk.label} ---\n{ready_result.text}")
+            else:
+                lines.append(f"--- {ready_chunk.label} failed: "
+                             f"{ready_result.error or 'No text extracted'} ---")
+
+        await self.notify(pages_done, total_pages, "\n".join(lines))
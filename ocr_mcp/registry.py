@@ -0,0 +1,225 @@
+"""Long-lived registry of configured OCR backends."""
+
+import asyncio
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from .backends import BaseBackend, get_backend
+from .backends.preprocess import parse_image_options
+from .config import RESTART_SETTINGS, reload_settings, settings
+
+
+def backend_config(backend_name: str) -> Dict[str, Any]:
+    """
+    Build the configuration dict for one backend from the settings.
+
+    Only settings the backend uses are included, so a reload rebuilds a
+    backend only when its own configuration changed.
+    """
+    if backend_name == "marker":
+        return {
+            "batch_size": settings.MARKER_BATCH_SIZE,
+            "executor": settings.MARKER_EXECUTOR,
+            "workers": settings.MARKER_WORKERS,
+            "queue_size": settings.MARKER_QUEUE_SIZE,
+            "queue_timeout": settings.MARKER_QUEUE_TIMEOUT,
+        }
+    return {
+        "api_key": getattr(settings, f"{backend_name.upper()}_API_KEY", None),
+        "base_url": getattr(settings, f"{backend_name.upper()}_BASE_URL", "") or None,
+        "api_timeout": settings.API_TIMEOUT,
+        "max_retries": settings.API_MAX_RETRIES,
+        "backoff_base": settings.API_BACKOFF_BASE,
+        "backoff_max": settings.API_BACKOFF_MAX,
+        "retry_after_max": settings.API_RETRY_AFTER_MAX,
+        "max_connections": settings.HTTP_MAX_CONNECTIONS,
+        "max_keepalive": settings.HTTP_MAX_KEEPALIVE,
+        "keepalive_expiry": settings.HTTP_KEEPALIVE_EXPIRY,
+        "http2": settings.HTTP2_ENABLED,
+        "image": image_options(backend_name),
+        "batch_max_pages": settings.PAGE_BATCH_SIZE,
+        "batch_max_bytes": int(settings.PAGE_BATCH_MAX_MB * 1024 * 1024),
+        "batch_max_tokens": settings.PAGE_BATCH_MAX_TOKENS,
+    }
+
+
+def image_options(backend_name: str) -> Dict[str, Any]:
+    """Global image preprocessing settings with the backend's overrides applied."""
+    options: Dict[str, Any] = {
+        "enabled": settings.IMAGE_PREPROCESS,
+        "max_edge": settings.IMAGE_MAX_EDGE,
+        "max_dpi": settings.IMAGE_MAX_DPI,
+        "grayscale": settings.IMAGE_GRAYSCALE,
+        "format": settings.IMAGE_FORMAT,
+        "quality": settings.IMAGE_QUALITY,
+    }
+    overrides = getattr(settings, f"{backend_name.upper()}_IMAGE_OPTIONS", "")
+    options.update(parse_image_options(overrides or ""))
+    return options
+
+
+class Generation:
+    """One set of backend instances and the requests currently using them."""
+
+    def __init__(self, number: int, backends: List[BaseBackend]):
+        self.number = number
+        self.backends = backends
+        self.created_at = time.time()
+        self.in_flight = 0
+        self.idle = asyncio.Event()
+        self.idle.set()
+
+
+class BackendRegistry:
+    """
+    Owns the backend instances for the lifetime of the server.
+
+    Backends are built once, with their availability checked once, so they
+    can keep pools, connections and other state between requests. A reload
+    re-reads the configuration and swaps in a new generation of backends;
+    requests already running finish on the old generation, whose resources
+    are released once it has drained.
+    """
+
+    def __init__(self):
+        self._current: Optional[Generation] = None
+        self._reload_lock = asyncio.Lock()
+        self.reloads = 0
+        self.last_reload_at: Optional[float] = None
+        self.last_reload_error: Optional[str] = None
+
+    def _build(self, previous: Optional[Generation]) -> Generation:
+        """Create backends for the current settings, reusing unchanged ones."""
+        reusable = {}
+        if previous is not None:
+            reusable = {b.name: b for b in previous.backends}
+
+        backends = []
+        for backend_name in settings.get_backend_priority():
+            config = backend_config(backend_name)
+            old = reusable.get(backend_name)
+            if old is not None and old.config == config:
+                backends.append(old)
+                continue
+            backend = get_backend(backend_name, config)
+            if backend.is_available():
+                backends.append(backend)
+
+        number = previous.number + 1 if previous is not None else 1
+        return Generation(number, backends)
+
+    def _generation(self) -> Generation:
+        if self._current is None:
+            self._current = self._build(None)
+        return self._current
+
+    def backends(self) -> List[BaseBackend]:
+        """Return the current backends in priority order."""
+        return list(self._generation().backends)
+
+    def get(self, name: str) -> Optional[BaseBackend]:
+        """Return the current backend with the given name, if available."""
+        for backend in self._generation().backends:
+            if backend.name == name:
+                return backend
+        return None
+
+    @asynccontextmanager
+    async def lease(self) -> AsyncIterator[List[BaseBackend]]:
+        """
+        Use the current backends for one unit of work.
+
+        A reload waits for outstanding leases on the old generation before
+        closing its backends.
+        """
+        generation = self._generation()
+        generation.in_flight += 1
+        generation.idle.clear()
+        try:
+            yield list(generation.backends)
+        finally:
+            generation.in_flight -= 1
+            if generation.in_flight == 0:
+                generation.idle.set()
+
+    async def reload(self, drain_timeout: float = 60.0) -> Dict[str, Any]:
+        """
+        Re-read the configuration and rebuild changed backends.
+
+        Args:
+            drain_timeout: Seconds to wait for in-flight work on the old
+                backends before closing them anyway
+
+        Returns:
+            Summary of the reload
+
+        Raises:
+            ValueError: If the new configuration is invalid
+        """
+        async with self._reload_lock:
+            try:
+                changed = reload_settings()
+            except ValueError as e:
+                self.last_reload_error = str(e)
+                raise
+
+            old = self._current
+            new = await asyncio.to_thread(self._build, old)
+            self._current = new
+            self.reloads += 1
+            self.last_reload_at = time.time()
+            self.last_reload_error = None
+
+            retired = []
+            drained = True
+            if old is not None:
+                kept = {id(b) for b in new.backends}
+                retired = [b for b in old.backends if id(b) not in kept]
+                if retired:
+                    try:
+                        await asyncio.wait_for(old.idle.wait(), timeout=drain_timeout)
+                    except asyncio.TimeoutError:
+                        drained = False
+                        print(
+                            f"Reload: {old.in_flight} request(s) still running on "
+                            f"generation {old.number}; closing its backends anyway",
+                            file=sys.stderr
+                        )
+                    for backend in retired:
+                        await backend.aclose()
+
+            return {
+                "generation": new.number,
+                "changed_settings": changed,
+                # Changed, but the stores and listeners using them keep the
+                # values they were created with
+                "restart_required": [name for name in RESTART_SETTINGS if name in changed],
+                "backends": [b.name for b in new.backends],
+                "replaced": [b.name for b in retired],
+                "drained": drained,
+            }
+
+    async def aclose(self) -> None:
+        """Release the resources of every backend."""
+        generation, self._current = self._current, None
+        if generation is not None:
+            for backend in generation.backends:
+                await backend.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return the current generation and reload history."""
+        generation = self._current
+        return {
+            "generation": generation.number if generation else None,
+            "created_at": generation.created_at if generation else None,
+            "in_flight": generation.in_flight if generation else 0,
+            "backends": [b.name for b in generation.backends] if generation else [],
+            "reloads": self.reloads,
+            "last_reload_at": self.last_reload_at,
+            "last_reload_error": self.last_reload_error,
+        }
+
+
+registry = BackendRegistry()
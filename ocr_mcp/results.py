@@ -0,0 +1,221 @@
+"""Server-side storage of large OCR results, read back in slices."""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+from .backends.base import OCRResult
+from .config import settings
+from .fileio import map_file
+
+
+# A byte offset is recorded every this many characters, so a read only
+# decodes the text between the nearest checkpoint and the end of the slice
+INDEX_STEP = 65536
+# Upper bound of UTF-8 bytes per character
+MAX_CHAR_BYTES = 4
+# Seconds between scans for expired results
+PURGE_INTERVAL = 600
+
+
+class ResultNotFound(KeyError):
+    """Raised for unknown or expired result IDs."""
+
+
+class ResultStore:
+    """
+    Stores result text as UTF-8 files and serves slices of them.
+
+    Each result is a ``<id>.txt`` file with a ``<id>.json`` sidecar holding
+    the page boundaries and a sparse character-to-byte index. Reads map the
+    text file and decode only the requested range. The ID is derived from
+    the text and backend, so storing the same result again reuses the
+    file. Results are deleted ``retention_seconds`` after they were last
+    stored.
+    """
+
+    def __init__(self, directory: str, retention_seconds: float = 86400):
+        self.directory = os.path.expanduser(directory)
+        self.retention_seconds = retention_seconds
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+
+    def _path(self, result_id: str, suffix: str) -> str:
+        # IDs are hex digests; anything else must not reach the filesystem
+        if not result_id or not all(c in "0123456789abcdef" for c in result_id):
+            raise ResultNotFound(result_id)
+        return os.path.join(self.directory, f"{result_id}{suffix}")
+
+    def _write(self, path: str, data: bytes) -> None:
+        # Readers never see a partly written file
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def put(self, result: OCRResult) -> Dict[str, Any]:
+        """
+        Store a result's text and return its description.
+
+        Blocks; call from a worker thread.
+        """
+        data = result.text.encode("utf-8")
+        digest = hashlib.sha256(data)
+        digest.update(f"|{result.backend}".encode("utf-8"))
+        result_id = digest.hexdigest()[:32]
+
+        metadata = result.metadata or {}
+        pages = [
+            {"pages": entry["pages"], "offset": entry["offset"], "characters": entry["characters"]}
+            for entry in metadata.get("page_results") or []
+            if "offset" in entry
+        ]
+        info = {
+            "id": result_id,
+            "backend": result.backend,
+            "confidence": result.confidence,
+            "characters": len(result.text),
+            "bytes": len(data),
+            "page_count": metadata.get("page_count") or metadata.get("pages_processed"),
+            "pages": pages,
+            "index_step": INDEX_STEP,
+            "index": self._index(result.text),
+        }
+
+        os.makedirs(self.directory, exist_ok=True)
+        text_path = self._path(result_id, ".txt")
+        info_path = self._path(result_id, ".json")
+        with self._lock:
+            if os.path.exists(text_path) and os.path.exists(info_path):
+                # Same text stored before; just extend its retention
+                os.utime(text_path)
+                os.utime(info_path)
+            else:
+                self._write(text_path, data)
+                self._write(info_path, json.dumps(info).encode("utf-8"))
+        self._maybe_purge()
+        return info
+
+    @staticmethod
+    def _index(text: str) -> List[int]:
+        """Byte offset of every ``INDEX_STEP``-th character."""
+        offsets = []
+        position = 0
+        for start in range(0, len(text), INDEX_STEP):
+            offsets.append(position)
+            position += len(text[start:start + INDEX_STEP].encode("utf-8"))
+        return offsets
+
+    def info(self, result_id: str) -> Dict[str, Any]:
+        """
+        Return the description of a stored result.
+
+        Raises:
+            ResultNotFound: If the result does not exist or has expired
+        """
+        try:
+            with open(self._path(result_id, ".json"), "rb") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ResultNotFound(result_id) from None
+
+    def read(self, result_id: str, offset: int = 0, length: int = 20000) -> Dict[str, Any]:
+        """
+        Read ``length`` characters starting at character ``offset``.
+
+        Raises:
+            ResultNotFound: If the result does not exist or has expired
+        """
+        info = self.info(result_id)
+        total = info["characters"]
+        offset = min(max(0, offset), total)
+        length = max(0, min(length, total - offset))
+
+        checkpoint = offset // info["index_step"]
+        skip = offset - checkpoint * info["index_step"]
+        try:
+            with map_file(self._path(result_id, ".txt")) as mapped:
+                start = info["index"][checkpoint] if checkpoint < len(info["index"]) else len(mapped)
+                end = min(len(mapped), start + (skip + length) * MAX_CHAR_BYTES)
+                # The range starts on a character boundary; a character cut
+                # at its end lies past the slice and is dropped
+                text = mapped[start:end].decode("utf-8", errors="ignore")
+        except FileNotFoundError:
+            raise ResultNotFound(result_id) from None
+
+        text = text[skip:skip + length]
+        end_offset = offset + len(text)
+        return {
+            "id": result_id,
+            "offset": offset,
+            "end": end_offset,
+            "characters": total,
+            "next_offset": end_offset if end_offset < total else None,
+            "text": text,
+        }
+
+    def read_page(self, result_id: str, page: int) -> Dict[str, Any]:
+        """
+        Read the page chunk holding 1-based ``page``.
+
+        Raises:
+            ResultNotFound: If the result does not exist or has expired
+            ValueError: If the result has no such page
+        """
+        info = self.info(result_id)
+        if not info["pages"]:
+            raise ValueError(
+                "This result has no page boundaries; read it by character offset"
+            )
+        for entry in info["pages"]:
+            first, last = entry["pages"]
+            if first <= page <= last:
+                read = self.read(result_id, entry["offset"], entry["characters"])
+                read["pages"] = entry["pages"]
+                return read
+        first, last = info["pages"][0]["pages"][0], info["pages"][-1]["pages"][1]
+        raise ValueError(f"Page {page} is not in this result (it covers pages {first}-{last})")
+
+    def _maybe_purge(self) -> None:
+        now = time.time()
+        if not self.retention_seconds or now - self._last_purge < PURGE_INTERVAL:
+            return
+        self._last_purge = now
+        self.purge(now - self.retention_seconds)
+
+    def purge(self, before: float) -> int:
+        """Delete results last stored before the ``before`` timestamp."""
+        removed = 0
+        with self._lock:
+            try:
+                names = os.listdir(self.directory)
+            except FileNotFoundError:
+                return 0
+            for name in names:
+                path = os.path.join(self.directory, name)
+                try:
+                    if os.path.getmtime(path) < before:
+                        os.remove(path)
+                        removed += name.endswith(".txt")
+                except FileNotFoundError:
+                    pass
+        return removed
+
+
+_store: Optional[ResultStore] = None
+
+
+def get_result_store() -> Optional[ResultStore]:
+    """Return the process-wide result store, or None if it is disabled."""
+    global _store
+    if settings.RESULT_INLINE_MAX_CHARS <= 0:
+        return None
+    if _store is None:
+        _store = ResultStore(
+            directory=settings.RESULTS_DIR,
+            retention_seconds=settings.RESULTS_RETENTION_SECONDS
+        )
+    return _store
@@ -1,51 +1,566 @@
 import asyncio
+import dataclasses
+import json
+import os
+import signal
 import sys
-from typing import Any, Optional
+import tempfile
+import time
+from typing import Any, Awaitable, List, Optional
 from mcp.server import Server
 from mcp.server.stdio import stdio_server
 from mcp.types import Tool, TextContent
 from .config import settings
-from .backends import get_backend, OCRResult
+from .deadline import DeadlineExceeded, current_deadline, start_deadline
+from .backends import OCRResult, VisionAPIBackend
+from .backends.marker_models import model_registry
+from .batch import expand_paths, run_batch
+from .cache import (
+    get_page_store,
+    get_result_cache,
+    hash_content,
+    make_key,
+    output_fingerprint,
+)
+from .fileio import FileTooLargeError, check_file_size, check_size
+from .fingerprint import fingerprint_pages
+from .health import health_tracker
+from .jobs import CANCELLED, DONE, FAILED, PRIORITIES, QUEUED, RUNNING, JobScheduler
+from .hedging import hedge_policy, run_hedged, timed_call
+from .limits import backend_limiter, client_limiter, rate_limiter
+from .metrics import (
+    count,
+    finish_trace,
+    metrics,
+    record_backend,
+    record_stage,
+    serve_prometheus,
+    stage,
+    start_trace,
+)
+from .pages import (
+    ChunkCallback,
+    chunk_texts,
+    count_pages,
+    extract_pages,
+    is_pdf,
+    PageRange,
+    parse_page_ranges,
+    process_pages,
+)
+from .progress import ProgressReporter
+from .registry import registry
+from .results import ResultNotFound, get_result_store
+from .singleflight import inflight
+from .textlayer import classify_pages
+from .transport import STDIO, drain, serve_http
 
 
 # Initialize MCP server
 app = Server("ocr-mcp")
 
+# Tools that count against CLIENT_CONCURRENCY
+CLIENT_LIMITED_TOOLS = {"ocr", "ocr_batch"}
+
 
 def get_backends():
     """Get configured backends in priority order."""
-    backends = []
-    for backend_name in settings.get_backend_priority():
-        config = {
-            "api_key": getattr(settings, f"{backend_name.upper()}_API_KEY", None),
-            "api_timeout": settings.API_TIMEOUT,
-            "max_retries": settings.API_MAX_RETRIES,
-            "batch_size": settings.MARKER_BATCH_SIZE,
-        }
-        backend = get_backend(backend_name, config)
-        if backend.is_available():
-            backends.append(backend)
-    return backends
+    return registry.backends()
 
 
 async def process_with_fallback(
     file_path: Optional[str] = None,
     image_data: Optional[bytes] = None,
-    backend: Optional[str] = None
+    backend: Optional[str] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+    timeout: Optional[float] = None,
+    pages: Optional[str] = None,
+    max_pages: Optional[int] = None
 ) -> OCRResult:
     """
     Process OCR with automatic fallback between backends.
     
+    Results are looked up in and stored to the result cache, keyed by a
+    hash of the file contents, the requested backend and the page
+    selection. Concurrent
+    requests with the same key share one run. Input larger than
+    ``MAX_FILE_SIZE_MB`` is rejected before any of it is read.
+    
+    Per-stage durations, byte counts, retries and the backends tried are
+    attached as ``timings`` in the result metadata and added to the
+    ``ocr_stats`` histograms.
+    
+    The whole request, including every retry and fallback, runs against one
+    deadline. Backends and retries that cannot finish in the time left are
+    skipped, and whatever is still running when it expires is cancelled.
+    The budget used is reported as ``deadline`` in the metadata.
+    
     Args:
         file_path: Path to file (optional)
         image_data: Image bytes (optional)
         backend: Specific backend to use (optional)
+        on_chunk: Called as each page chunk of a PDF finishes (optional)
+        timeout: Time budget in seconds; defaults to ``TIMEOUT_SECONDS``,
+            0 means no deadline
+        pages: PDF pages to process, e.g. ``1-5,12`` or ``20-`` (optional)
+        max_pages: Process at most this many (selected) PDF pages (optional)
         
     Returns:
         OCRResult with extracted text
     """
-    backends = get_backends()
+    if timeout is None:
+        timeout = settings.TIMEOUT_SECONDS
+    with start_trace() as trace, start_deadline(timeout) as deadline:
+        try:
+            result = await deadline.run(
+                run_traced(file_path, image_data, backend, on_chunk, pages, max_pages)
+            )
+        except DeadlineExceeded as e:
+            result = OCRResult(text="", backend="none", error=str(e))
+        result = finish_trace(trace, result)
+        # finish_trace returned a copy with its own metadata dict
+        result.metadata["deadline"] = deadline.report()
+        return result
+
+
+async def run_traced(
+    file_path: Optional[str],
+    image_data: Optional[bytes],
+    backend: Optional[str],
+    on_chunk: Optional[ChunkCallback],
+    pages: Optional[str] = None,
+    max_pages: Optional[int] = None
+) -> OCRResult:
+    """Body of ``process_with_fallback``, run inside the request trace."""
+    try:
+        page_list = parse_page_ranges(pages) if pages else None
+    except ValueError as e:
+        return OCRResult(text="", backend="none", error=str(e))
+    
+    def pipeline(notify: Optional[ChunkCallback]) -> Awaitable[OCRResult]:
+        return run_pipeline(file_path, image_data, backend, notify, page_list, max_pages)
+    
+    try:
+        with stage("size_check"):
+            if file_path:
+                size = check_file_size(file_path, settings.MAX_FILE_SIZE_MB)
+            elif image_data is not None:
+                size = len(image_data)
+                check_size(size, settings.MAX_FILE_SIZE_MB)
+            else:
+                size = 0
+        count(input_bytes=size)
+    except FileTooLargeError as e:
+        return OCRResult(text="", backend="none", error=str(e))
+    except OSError as e:
+        return OCRResult(
+            text="",
+            backend="none",
+            error=f"Could not read file: {str(e)}"
+        )
+    
+    cache = get_result_cache()
+    dedupe = settings.SINGLE_FLIGHT_ENABLED
+    if not (file_path or image_data) or (cache is None and not dedupe):
+        with stage("pipeline"):
+            return await pipeline(on_chunk)
+    
+    try:
+        with stage("hash"):
+            content_hash = await asyncio.to_thread(hash_content, file_path, image_data)
+    except OSError as e:
+        return OCRResult(
+            text="",
+            backend="none",
+            error=f"Could not read file: {str(e)}"
+        )
+    
+    selection = {"pages": page_list, "max_pages": max_pages}
+    key = make_key(
+        content_hash,
+        backend.lower() if backend else None,
+        {
+            # Results of an older configuration are not served
+            "settings": output_fingerprint(),
+            **{name: value for name, value in selection.items() if value is not None},
+        }
+    )
+    if cache is not None:
+        with stage("cache_get"):
+            cached = await asyncio.to_thread(cache.get, key)
+        if cached is not None:
+            return cached
+    
+    async def compute(notify: Optional[ChunkCallback]) -> OCRResult:
+        result = await pipeline(notify)
+        # Partial results from page splitting are not cached so failed pages
+        # get another chance on the next request
+        complete = not (result.metadata or {}).get("failed_chunks")
+        if cache is not None and result.error is None and result.text and complete:
+            with stage("cache_put"):
+                await asyncio.to_thread(cache.put, key, result)
+        return result
+    
+    with stage("pipeline"):
+        if not dedupe:
+            return await compute(on_chunk)
+        return await inflight.run(key, compute, on_chunk)
+
+
+async def run_pipeline(
+    file_path: Optional[str] = None,
+    image_data: Optional[bytes] = None,
+    backend: Optional[str] = None,
+    on_chunk: Optional[ChunkCallback] = None,
+    pages: Optional[List[PageRange]] = None,
+    max_pages: Optional[int] = None
+) -> OCRResult:
+    """
+    Run OCR, splitting large PDFs into page chunks when enabled.
+    
+    With a page selection only the selected pages of a PDF are copied into
+    a new file and processed, so no backend ever sees the others.
+    
+    When the caller wants per-page progress (``on_chunk``) and
+    ``STREAM_PAGES`` is on, every multi-page PDF is split into chunks of
+    ``STREAM_CHUNK_SIZE`` pages so the first pages arrive early.
+    
+    With ``TEXT_LAYER_ENABLED``, PDF pages that carry a usable text layer
+    are extracted directly and only the remaining pages are OCR'd.
+    
+    With ``PAGE_REUSE_ENABLED``, PDFs are OCR'd page by page and each page's
+    text is stored under a fingerprint of its content. Pages of a later
+    revision with the same fingerprint reuse that text instead of being
+    OCR'd again.
+    
+    Args:
+        file_path: Path to file (optional)
+        image_data: Image bytes (optional)
+        backend: Specific backend to use (optional)
+        on_chunk: Called as each page chunk finishes (optional)
+        pages: 0-based indexes of the PDF pages to process (optional)
+        max_pages: Process at most this many PDF pages (optional)
+        
+    Returns:
+        OCRResult with extracted text
+    """
+    if (pages is not None or max_pages is not None) and file_path and is_pdf(file_path):
+        return await run_selected_pages(file_path, backend, on_chunk, pages, max_pages)
+    
+    streaming = on_chunk is not None and settings.STREAM_PAGES
+    page_store = get_page_store()
+    page_aware = (
+        settings.PAGE_SPLIT_ENABLED
+        or streaming
+        or settings.TEXT_LAYER_ENABLED
+        or page_store is not None
+    )
+    if not (file_path and page_aware and is_pdf(file_path)):
+        return await run_backends(file_path, image_data, backend)
+    
+    native = {}
+    try:
+        with stage("text_layer" if settings.TEXT_LAYER_ENABLED else "page_count"):
+            if settings.TEXT_LAYER_ENABLED:
+                page_count, native = await asyncio.to_thread(
+                    classify_pages,
+                    file_path,
+                    settings.TEXT_LAYER_MIN_CHARS,
+                    settings.TEXT_LAYER_MAX_IMAGE_COVERAGE
+                )
+            else:
+                page_count = await asyncio.to_thread(count_pages, file_path)
+    except Exception:
+        # Let the backends deal with PDFs pypdf cannot read
+        page_count = 0
+    
+    requested = page_variant(backend)
+    fingerprints: List[Optional[str]] = []
+    reused = {}
+    if page_store is not None and page_count:
+        try:
+            with stage("fingerprint"):
+                fingerprints = await asyncio.to_thread(fingerprint_pages, file_path)
+                wanted = {
+                    index: fingerprint
+                    for index, fingerprint in enumerate(fingerprints)
+                    if fingerprint and index not in native
+                }
+                found = await asyncio.to_thread(
+                    page_store.get_many, list(wanted.values()), requested
+                )
+            reused = {
+                index: found[fingerprint]
+                for index, fingerprint in wanted.items()
+                if fingerprint in found
+            }
+        except Exception:
+            # Without fingerprints the document is simply OCR'd in full
+            fingerprints = []
+    if fingerprints:
+        return await run_reusing_pages(
+            file_path, backend, on_chunk, native, reused, fingerprints, page_store
+        )
+    
+    if streaming and page_count > 1:
+        chunk_size = settings.STREAM_CHUNK_SIZE
+    elif settings.PAGE_SPLIT_ENABLED and page_count >= settings.PAGE_SPLIT_MIN_PAGES:
+        chunk_size = settings.PAGE_CHUNK_SIZE
+    elif native:
+        # OCR each run of pages without a text layer in one piece
+        chunk_size = page_count
+    else:
+        chunk_size = 0
+    
+    if chunk_size and settings.PAGE_BATCH_SIZE > 1:
+        # Single pages, so API backends can pack them into batched requests
+        chunk_size = 1
+    
+    if chunk_size:
+        return await process_pages(
+            file_path,
+            lambda chunk_path: run_backends(chunk_path, None, backend),
+            chunk_size=chunk_size,
+            parallelism=settings.PAGE_PARALLELISM,
+            retries=settings.PAGE_CHUNK_RETRIES,
+            on_chunk=on_chunk,
+            native=native,
+            **batch_options(backend)
+        )
+    
+    result = await run_backends(file_path, image_data, backend)
+    if settings.TEXT_LAYER_ENABLED and page_count:
+        result.metadata = {
+            **(result.metadata or {}),
+            "pages_text_layer": 0,
+            "pages_ocr": page_count,
+        }
+    return result
+
+
+def page_variant(backend: Optional[str]) -> str:
+    """Stored pages are only reused under the same backend choice and output settings."""
+    return f"{backend.lower() if backend else 'auto'}:{output_fingerprint()}"
+
+
+async def run_reusing_pages(
+    file_path: str,
+    backend: Optional[str],
+    on_chunk: Optional[ChunkCallback],
+    native: dict,
+    reused: dict,
+    fingerprints: List[Optional[str]],
+    page_store: Any
+) -> OCRResult:
+    """
+    OCR the pages of a PDF that have no stored text, one page per chunk.
+    
+    Every page OCR'd successfully is added to the page store under its
+    fingerprint. The result reports how many pages were reused and how
+    many recomputed.
+    """
+    requested = page_variant(backend)
+    fresh = {}
+    
+    async def collect(chunk, result, done, total):
+        fingerprint = fingerprints[chunk.start]
+        if chunk.path and fingerprint and result.error is None and result.text:
+            fresh[fingerprint] = result
+        if on_chunk is not None:
+            await on_chunk(chunk, result, done, total)
+    
+    result = await process_pages(
+        file_path,
+        lambda chunk_path: run_backends(chunk_path, None, backend),
+        chunk_size=1,
+        parallelism=settings.PAGE_PARALLELISM,
+        retries=settings.PAGE_CHUNK_RETRIES,
+        on_chunk=collect,
+        native=native,
+        reused=reused,
+        **batch_options(backend)
+    )
+    if fresh:
+        await asyncio.to_thread(page_store.put_many, fresh, requested)
+    
+    metadata = result.metadata or {}
+    result.metadata = {
+        **metadata,
+        "page_reuse": {
+            "reused": metadata.get("pages_reused", 0),
+            "recomputed": metadata.get("pages_ocr", 0),
+            "stored": len(fresh),
+        },
+    }
+    return result
+
+
+async def run_selected_pages(
+    file_path: str,
+    backend: Optional[str],
+    on_chunk: Optional[ChunkCallback],
+    pages: Optional[List[PageRange]],
+    max_pages: Optional[int]
+) -> OCRResult:
+    """
+    Run the pipeline on a copy of a PDF holding only the selected pages.
+    
+    Page numbers in the result and in progress notifications are mapped
+    back to the original document.
+    """
+    with tempfile.TemporaryDirectory(prefix="ocr-mcp-select-") as directory:
+        selected_path = os.path.join(directory, "selected.pdf")
+        try:
+            with stage("select_pages"):
+                selected, total = await asyncio.to_thread(
+                    extract_pages, file_path, selected_path, pages, max_pages
+                )
+        except ValueError as e:
+            return OCRResult(text="", backend="none", error=str(e))
+        except Exception as e:
+            if pages is not None:
+                return OCRResult(
+                    text="",
+                    backend="none",
+                    error=f"Could not select pages: {str(e)}"
+                )
+            # pypdf cannot read it; let Marker stop after max_pages itself
+            return await run_backends(file_path, None, backend, max_pages)
+        if not selected:
+            return OCRResult(text="", backend="none", error="No pages selected")
+        
+        def original(chunk):
+            return dataclasses.replace(
+                chunk, start=selected[chunk.start], end=selected[chunk.end - 1] + 1
+            )
+        
+        notify = None
+        if on_chunk is not None:
+            async def notify(chunk, result, done, pages_total):
+                await on_chunk(original(chunk), result, done, pages_total)
+        
+        result = await run_pipeline(selected_path, None, backend, notify)
+    
+    metadata = dict(result.metadata or {})
+    if metadata.get("page_results"):
+        page_results = []
+        for entry in metadata["page_results"]:
+            first, last = entry["pages"]
+            page_results.append(
+                {**entry, "pages": [selected[first - 1] + 1, selected[last - 1] + 1]}
+            )
+        metadata["page_results"] = page_results
+    metadata["selected_pages"] = [index + 1 for index in selected]
+    metadata["document_pages"] = total
+    result.metadata = metadata
+    return result
+
+
+def batch_options(backend: Optional[str]) -> dict:
+    """``process_pages`` arguments that turn on multi-page API requests."""
+    if settings.PAGE_BATCH_SIZE < 2:
+        return {}
+    return {
+        "process_batch": lambda paths: run_backends_batch(paths, backend),
+        "batch_size": settings.PAGE_BATCH_SIZE,
+    }
+
+
+async def run_backends_batch(
+    file_paths: List[str],
+    backend: Optional[str] = None
+) -> Optional[List[OCRResult]]:
+    """
+    OCR several single-page files with batched requests to one backend.
+    
+    Only the backend a single page would go to first is used, and only if
+    it can batch; otherwise None is returned and the pages are processed
+    one by one through the normal fallback chain.
+    
+    Args:
+        file_paths: Single-page files, in page order
+        backend: Specific backend to use (optional)
+        
+    Returns:
+        One result per file, or None if batching is not possible
+    """
+    async with registry.lease() as backends:
+        if backend:
+            candidates = [b for b in backends if b.name == backend.lower()]
+        else:
+            candidates = health_tracker.route(backends)
+        if not candidates or not isinstance(candidates[0], VisionAPIBackend):
+            return None
+        b = candidates[0]
+        health = health_tracker.get(b.name)
+        if not health.acquire():
+            return None
+        
+        start = time.perf_counter()
+        try:
+            async with backend_limiter.limit(b.name) as queue_wait:
+                results = await b.process_batch(file_paths)
+        except asyncio.CancelledError:
+            health.release()
+            raise
+        except Exception as e:
+            # Count the failure against the backend and let the pages go
+            # through the normal fallback chain
+            latency = (time.perf_counter() - start) / max(1, len(file_paths))
+            health.record(False, latency, str(e))
+            record_backend(b.name, False, latency)
+            return None
+        # Per page, so the latency stays comparable with single-page calls
+        latency = (time.perf_counter() - start - queue_wait) / max(1, len(file_paths))
+        ok = any(result.error is None for result in results)
+        health.record(ok, latency, None if ok else results[0].error)
+        record_stage("queue_wait", queue_wait)
+        record_backend(b.name, ok, latency)
+        return results
+
+
+async def run_backends(
+    file_path: Optional[str] = None,
+    image_data: Optional[bytes] = None,
+    backend: Optional[str] = None,
+    max_pages: Optional[int] = None
+) -> OCRResult:
+    """
+    Run the backend chain without consulting the cache.
+    
+    Args:
+        file_path: Path to file (optional)
+        image_data: Image bytes (optional)
+        backend: Specific backend to use (optional)
+        max_pages: Page limit for backends that read PDFs themselves (optional)
+        
+    Returns:
+        OCRResult with extracted text
+    """
+    async with registry.lease() as backends:
+        return await try_backends(backends, file_path, image_data, backend, max_pages)
+
+
+async def try_backends(
+    backends: list,
+    file_path: Optional[str] = None,
+    image_data: Optional[bytes] = None,
+    backend: Optional[str] = None,
+    max_pages: Optional[int] = None
+) -> OCRResult:
+    """
+    Try backends in priority order until one returns text.
     
+    Args:
+        backends: Backends in priority order
+        file_path: Path to file (optional)
+        image_data: Image bytes (optional)
+        backend: Specific backend to use (optional)
+        max_pages: Page limit for backends that read PDFs themselves (optional)
+        
+    Returns:
+        OCRResult with extracted text
+    """
     if not backends:
         return OCRResult(
             text="",
@@ -53,28 +568,82 @@ async def process_with_fallback(
             error="No available OCR backends configured"
         )
     
+    async def call(b):
+        health = health_tracker.get(b.name)
+        if not health.acquire():
+            return OCRResult(
+                text="",
+                backend=b.name,
+                error="Circuit open after repeated failures; skipped"
+            )
+        
+        start = time.perf_counter()
+        try:
+            async with backend_limiter.limit(b.name) as queue_wait:
+                result = await b.process_with_fallback(
+                    file_path=file_path,
+                    image_data=image_data,
+                    max_pages=max_pages
+                )
+            result.metadata = {
+                **(result.metadata or {}),
+                "queue_wait_seconds": round(queue_wait, 3),
+            }
+        except asyncio.CancelledError:
+            # A cancelled hedge says nothing about the backend's health
+            health.release()
+            raise
+        # Time spent queued for a slot is our own backlog, not backend latency
+        latency = time.perf_counter() - start - queue_wait
+        health.record(result.error is None, latency, result.error)
+        record_stage("queue_wait", queue_wait)
+        record_backend(b.name, result.error is None, latency)
+        return result
+    
     # If specific backend requested, try only that one
     if backend:
         for b in backends:
             if b.name == backend.lower():
-                result = await b.process_with_fallback(
-                    file_path=file_path,
-                    image_data=image_data
-                )
-                return result
+                return await call(b)
         return OCRResult(
             text="",
             backend="none",
             error=f"Requested backend '{backend}' not available"
         )
     
+    # Skip backends with an open circuit; optionally order by latency
+    backends = health_tracker.route(backends)
+    if not backends:
+        return OCRResult(
+            text="",
+            backend="none",
+            error="All backends are unavailable (circuit open after repeated failures)"
+        )
+    
+    # Race slow primaries against the next backend when hedging is on
+    if settings.HEDGING_ENABLED and len(backends) > 1:
+        result, errors = await run_hedged(backends, call)
+        if result is not None:
+            return result
+        return OCRResult(
+            text="",
+            backend="none",
+            error=f"All backends failed: {'; '.join(errors)}"
+        )
+    
     # Try each backend in priority order
     errors = []
+    deadline = current_deadline()
     for b in backends:
-        result = await b.process_with_fallback(
-            file_path=file_path,
-            image_data=image_data
-        )
+        # Skip fallbacks that typically take longer than the time left
+        typical = health_tracker.get(b.name).ewma_latency
+        if not deadline.allows(typical):
+            errors.append(
+                f"{b.name}: skipped, {deadline.remaining():.1f}s left before the deadline"
+            )
+            continue
+        
+        result = await timed_call(b, call)
         
         if result.error is None and result.text:
             return result
@@ -90,13 +659,285 @@ async def process_with_fallback(
     )
 
 
+async def preconnect_backends(backends) -> None:
+    """Open pooled connections to every available API backend."""
+    api_backends = [b for b in backends if isinstance(b, VisionAPIBackend)]
+    results = await asyncio.gather(*(b.preconnect() for b in api_backends))
+    for b, connected in zip(api_backends, results):
+        status = "connected" if connected else "unreachable"
+        print(f"Preconnect {b.name}: {status}", file=sys.stderr)
+
+
+def get_marker_pool():
+    """Get the worker pool of the Marker backend, if Marker is available."""
+    marker = registry.get("marker")
+    if marker is None:
+        raise ValueError("Marker backend is not available")
+    return marker.pool
+
+
+async def preload_marker_models(warmup: Optional[bool] = None) -> None:
+    """Load Marker models into the worker pool and optionally run a warm-up page."""
+    if warmup is None:
+        warmup = settings.MARKER_WARMUP
+    
+    print("Loading Marker models...", file=sys.stderr)
+    workers = await get_marker_pool().start(settings.MARKER_BATCH_SIZE, warmup)
+    
+    for worker in workers:
+        message = f"Marker models loaded in {worker['load_time_seconds']:.1f}s"
+        if worker["warmup_time_seconds"] is not None:
+            message += f", warm-up {worker['warmup_time_seconds']:.1f}s"
+        print(f"{message} (pid {worker['pid']})", file=sys.stderr)
+
+
+async def manage_cache(action: str, limit: int = 20) -> dict:
+    """
+    Inspect or purge the result cache.
+    
+    Args:
+        action: One of stats, list, purge, purge_expired
+        limit: Number of entries to list
+        
+    Returns:
+        Cache statistics, entries, or the number of removed entries
+    """
+    cache = get_result_cache()
+    if cache is None:
+        if action == "stats":
+            return {"enabled": False, "single_flight": inflight.stats()}
+        return {"enabled": False}
+    
+    page_store = get_page_store()
+    if action == "stats":
+        return {
+            "enabled": True,
+            **await asyncio.to_thread(cache.stats),
+            "single_flight": inflight.stats(),
+            "page_reuse": await asyncio.to_thread(page_store.stats) if page_store else None,
+        }
+    if action == "list":
+        return {"entries": await asyncio.to_thread(cache.entries, limit)}
+    if action in ("purge", "purge_expired"):
+        removed = await asyncio.to_thread(cache.purge, action == "purge_expired")
+        if page_store is None:
+            return {"removed": removed}
+        pages = await asyncio.to_thread(page_store.purge, action == "purge_expired")
+        return {"removed": removed, "removed_pages": pages}
+    raise ValueError(f"Unknown action: {action}")
+
+
+async def manage_marker_models(action: str) -> dict:
+    """
+    Inspect or change the resident Marker models.
+    
+    In process mode the models live in the worker processes, so unloading
+    stops the workers and loading spawns them again.
+    
+    Args:
+        action: One of status, load, unload, reload
+        
+    Returns:
+        Registry and worker pool statistics after the action
+    """
+    pool = get_marker_pool()
+    
+    if action not in ("status", "load", "unload", "reload"):
+        raise ValueError(f"Unknown action: {action}")
+    
+    if action in ("unload", "reload"):
+        if pool.mode == "process":
+            await asyncio.to_thread(pool.shutdown)
+        else:
+            await asyncio.to_thread(model_registry.unload)
+    
+    if action in ("load", "reload"):
+        await preload_marker_models(warmup=False)
+    
+    stats = {"pool": pool.stats()}
+    if pool.mode == "thread":
+        stats["models"] = model_registry.stats()
+    return stats
+
+
+def get_progress_reporter() -> Optional[ProgressReporter]:
+    """Build a progress reporter if the current request carries a progress token."""
+    try:
+        context = app.request_context
+    except LookupError:
+        return None
+    token = context.meta.progressToken if context.meta else None
+    if token is None:
+        return None
+    return ProgressReporter(
+        context.session,
+        token,
+        request_id=context.request_id,
+        partial_text=settings.STREAM_PARTIAL_TEXT
+    )
+
+
+def format_pages(pages: list) -> str:
+    """Format a [first, last] page range for display."""
+    first, last = pages
+    return f"page {first}" if first == last else f"pages {first}-{last}"
+
+
+def format_page_selection(pages: List[int]) -> str:
+    """Format sorted 1-based page numbers as ranges, e.g. ``1-5,12``."""
+    ranges = []
+    for page in pages:
+        if ranges and page == ranges[-1][1] + 1:
+            ranges[-1][1] = page
+        else:
+            ranges.append([page, page])
+    return ",".join(str(first) if first == last else f"{first}-{last}" for first, last in ranges)
+
+
+def format_result(result: OCRResult, per_chunk: bool = False) -> list[TextContent]:
+    """
+    Format an OCR result as tool output.
+    
+    With ``per_chunk`` the text of a page-split result is returned as one
+    item per page chunk after a header item.
+    """
+    if result.error:
+        return [TextContent(
+            type="text",
+            text=f"Error: {result.error}"
+        )]
+    
+    # Format output
+    output = f"Backend used: {result.backend}\n"
+    if result.confidence:
+        output += f"Confidence: {result.confidence:.2%}\n"
+    selected = (result.metadata or {}).get("selected_pages")
+    if selected:
+        output += (
+            f"Selected pages: {format_page_selection(selected)} "
+            f"of {result.metadata['document_pages']}\n"
+        )
+    
+    chunks = chunk_texts(result) if per_chunk else []
+    if chunks:
+        output += f"Pages: {result.metadata['page_count']}\n"
+        return [TextContent(type="text", text=output)] + [
+            TextContent(
+                type="text",
+                text=f"--- {format_pages(pages)} ---\n{text}"
+            )
+            for pages, text in chunks
+        ]
+    
+    output += f"\nExtracted Text:\n{'-' * 40}\n{result.text}"
+    
+    return [TextContent(
+        type="text",
+        text=output
+    )]
+
+
+async def present_result(result: OCRResult, per_chunk: bool = False) -> list[TextContent]:
+    """
+    Format an OCR result as tool output, storing long text server-side.
+    
+    Text longer than ``RESULT_INLINE_MAX_CHARS`` is kept in the result
+    store and only a summary with a preview is returned; the client reads
+    the rest with ``ocr_read``.
+    """
+    store = get_result_store()
+    if result.error or store is None or len(result.text) <= settings.RESULT_INLINE_MAX_CHARS:
+        return format_result(result, per_chunk)
+    
+    info = await asyncio.to_thread(store.put, result)
+    output = f"Backend used: {result.backend}\n"
+    if result.confidence:
+        output += f"Confidence: {result.confidence:.2%}\n"
+    if info["page_count"]:
+        output += f"Pages: {info['page_count']}\n"
+    output += f"Characters: {info['characters']:,} ({info['bytes']:,} bytes)\n"
+    output += f"Result ID: {info['id']}\n"
+    output += (
+        "The text is too long to return at once. Read it with ocr_read, "
+        + ("by page or " if info["pages"] else "")
+        + "by character offset.\n"
+    )
+    preview = result.text[:settings.RESULT_PREVIEW_CHARS]
+    output += f"\nPreview (first {len(preview):,} characters):\n{'-' * 40}\n{preview}"
+    
+    return [TextContent(
+        type="text",
+        text=output
+    )]
+
+
+async def run_job(file_path: str, options: dict, on_chunk: ChunkCallback) -> OCRResult:
+    """Run one job submitted with ``ocr_submit``."""
+    return await process_with_fallback(
+        file_path=file_path,
+        backend=options.get("backend"),
+        on_chunk=on_chunk,
+        timeout=settings.JOBS_TIMEOUT_SECONDS,
+        pages=options.get("pages"),
+        max_pages=options.get("max_pages")
+    )
+
+
+def page_arguments(arguments: dict) -> tuple[Optional[str], Optional[int]]:
+    """
+    Read and check the ``pages`` and ``max_pages`` tool arguments.
+    
+    Raises:
+        ValueError: If either is invalid
+    """
+    pages = arguments.get("pages") or None
+    max_pages = arguments.get("max_pages")
+    if pages is not None:
+        parse_page_ranges(str(pages))
+    if max_pages is not None and (
+        isinstance(max_pages, bool) or not isinstance(max_pages, int) or max_pages < 1
+    ):
+        raise ValueError("max_pages must be a positive integer")
+    return pages, max_pages
+
+
+job_scheduler = JobScheduler(run_job)
+
+
 @app.list_tools()
 async def list_tools() -> list[Tool]:
     """List available OCR tools."""
     return [
         Tool(
             name="ocr",
-            description="Extract text from PDF files or images using OCR. Supports multiple backends (Marker, DeepSeek, Mistral) with automatic fallback.",
+            description="Extract text from PDF files or images using OCR. Supports multiple backends (Marker, DeepSeek, Mistral) with automatic fallback. For long documents that may exceed the client timeout, use ocr_submit instead.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "file_path": {
+                        "type": "string",
+                        "description": "Path to the PDF or image file to process"
+                    },
+                    "backend": {
+                        "type": "string",
+                        "description": "Specific backend to use (marker, deepseek, mistral). If not specified, uses default with automatic fallback.",
+                        "enum": ["marker", "deepseek", "mistral"]
+                    },
+                    "pages": {
+                        "type": "string",
+                        "description": "PDF pages to process, e.g. \"1-5,12\" or \"20-\" (page 20 to the end). Defaults to all pages."
+                    },
+                    "max_pages": {
+                        "type": "integer",
+                        "description": "Process at most this many PDF pages (of the selected ones)",
+                        "minimum": 1
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="ocr_submit",
+            description="Queue a long document for OCR in the background and return a job ID at once. Poll it with ocr_status and fetch the text with ocr_result. Jobs survive server restarts.",
             inputSchema={
                 "type": "object",
                 "properties": {
@@ -108,6 +949,210 @@ async def list_tools() -> list[Tool]:
                         "type": "string",
                         "description": "Specific backend to use (marker, deepseek, mistral). If not specified, uses default with automatic fallback.",
                         "enum": ["marker", "deepseek", "mistral"]
+                    },
+                    "pages": {
+                        "type": "string",
+                        "description": "PDF pages to process, e.g. \"1-5,12\" or \"20-\" (page 20 to the end). Defaults to all pages."
+                    },
+                    "max_pages": {
+                        "type": "integer",
+                        "description": "Process at most this many PDF pages (of the selected ones)",
+                        "minimum": 1
+                    },
+                    "priority": {
+                        "type": "string",
+                        "description": "Queue priority. Defaults to normal.",
+                        "enum": ["high", "normal", "low"]
+                    }
+                },
+                "required": ["file_path"]
+            }
+        ),
+        Tool(
+            name="ocr_status",
+            description="Show the status and page progress of an OCR job, or list recent jobs when no job_id is given.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job ID returned by ocr_submit"
+                    },
+                    "status": {
+                        "type": "string",
+                        "description": "Only list jobs with this status",
+                        "enum": ["queued", "running", "done", "failed", "cancelled"]
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of jobs to list (default 20)"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="ocr_result",
+            description="Fetch the extracted text of a finished OCR job.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job ID returned by ocr_submit"
+                    }
+                },
+                "required": ["job_id"]
+            }
+        ),
+        Tool(
+            name="ocr_cancel",
+            description="Cancel a queued or running OCR job.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "job_id": {
+                        "type": "string",
+                        "description": "Job ID returned by ocr_submit"
+                    }
+                },
+                "required": ["job_id"]
+            }
+        ),
+        Tool(
+            name="ocr_read",
+            description="Read part of a long OCR result that was returned as a summary with a result ID, by page or by character offset.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "result_id": {
+                        "type": "string",
+                        "description": "Result ID from the ocr or ocr_result summary"
+                    },
+                    "page": {
+                        "type": "integer",
+                        "description": "Page to read (1-based); returns the page chunk that holds it",
+                        "minimum": 1
+                    },
+                    "offset": {
+                        "type": "integer",
+                        "description": "Character offset to start at (default 0)",
+                        "minimum": 0
+                    },
+                    "length": {
+                        "type": "integer",
+                        "description": "Characters to read from the offset (default RESULT_INLINE_MAX_CHARS)",
+                        "minimum": 1
+                    }
+                },
+                "required": ["result_id"]
+            }
+        ),
+        Tool(
+            name="ocr_batch",
+            description="Extract text from many files in one call. Files are processed concurrently and each gets its own result or error, so partial success is possible.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "file_paths": {
+                        "type": "array",
+                        "items": {"type": "string"},
+                        "description": "Paths of the files to process"
+                    },
+                    "pattern": {
+                        "type": "string",
+                        "description": "Glob pattern selecting files, e.g. /scans/**/*.pdf"
+                    },
+                    "backend": {
+                        "type": "string",
+                        "description": "Specific backend to use (marker, deepseek, mistral). If not specified, uses default with automatic fallback.",
+                        "enum": ["marker", "deepseek", "mistral"]
+                    },
+                    "concurrency": {
+                        "type": "integer",
+                        "description": "Files processed at the same time (defaults to BATCH_CONCURRENCY)"
+                    },
+                    "include_text": {
+                        "type": "boolean",
+                        "description": "Include the extracted text for each file (default true)"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="marker_models",
+            description="Inspect, load, unload or reload the resident Marker models. Reports load time and memory usage.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "action": {
+                        "type": "string",
+                        "description": "Action to perform. Defaults to status.",
+                        "enum": ["status", "load", "unload", "reload"]
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="ocr_connections",
+            description="Show HTTP connection pool occupancy and connection reuse for the API backends.",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="ocr_health",
+            description="Show per-backend health: success rate, EWMA latency, circuit breaker state, hedging counters, queue waits, rate limits and per-client limits.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "reset": {
+                        "type": "string",
+                        "description": "Close the circuit breaker of this backend, or 'all'"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="ocr_reload",
+            description="Reload configuration from the environment and .env file and rebuild changed backends without restarting. In-flight requests finish on the old backends.",
+            inputSchema={
+                "type": "object",
+                "properties": {}
+            }
+        ),
+        Tool(
+            name="ocr_stats",
+            description="Show latency histograms per processing stage and backend, request outcomes, retries and bytes read, sent and received since startup.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "format": {
+                        "type": "string",
+                        "description": "Output format. Defaults to json.",
+                        "enum": ["json", "prometheus"]
+                    },
+                    "reset": {
+                        "type": "boolean",
+                        "description": "Clear the statistics after reading them"
+                    }
+                }
+            }
+        ),
+        Tool(
+            name="ocr_cache",
+            description="Inspect or purge the OCR result cache.",
+            inputSchema={
+                "type": "object",
+                "properties": {
+                    "action": {
+                        "type": "string",
+                        "description": "Action to perform. Defaults to stats.",
+                        "enum": ["stats", "list", "purge", "purge_expired"]
+                    },
+                    "limit": {
+                        "type": "integer",
+                        "description": "Number of entries to list (default 20)"
                     }
                 }
             }
@@ -115,9 +1160,32 @@ async def list_tools() -> list[Tool]:
     ]
 
 
+def current_client() -> Optional[Any]:
+    """The MCP session of the client making the current request, if any."""
+    try:
+        return app.request_context.session
+    except LookupError:
+        return None
+
+
 @app.call_tool()
 async def call_tool(name: str, arguments: Any) -> list[TextContent]:
-    """Handle tool calls."""
+    """Handle tool calls, holding a client slot for the OCR tools."""
+    if drain.draining:
+        return [TextContent(
+            type="text",
+            text="Error: server is shutting down"
+        )]
+    
+    with drain.track():
+        if name not in CLIENT_LIMITED_TOOLS:
+            return await handle_tool(name, arguments)
+        async with client_limiter.limit(current_client()):
+            return await handle_tool(name, arguments)
+
+
+async def handle_tool(name: str, arguments: Any) -> list[TextContent]:
+    """Run one tool call."""
     if name == "ocr":
         file_path = arguments.get("file_path")
         backend = arguments.get("backend")
@@ -127,27 +1195,273 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
                 type="text",
                 text="Error: file_path is required"
             )]
+        try:
+            pages, max_pages = page_arguments(arguments)
+        except ValueError as e:
+            return [TextContent(
+                type="text",
+                text=f"Error: {str(e)}"
+            )]
         
+        reporter = get_progress_reporter()
         result = await process_with_fallback(
             file_path=file_path,
-            backend=backend
+            backend=backend,
+            on_chunk=reporter.on_chunk if reporter else None,
+            pages=pages,
+            max_pages=max_pages
         )
         
-        if result.error:
+        # With a progress token the text comes back one page chunk per item
+        return await present_result(result, per_chunk=reporter is not None)
+    
+    if name == "ocr_submit":
+        file_path = arguments.get("file_path")
+        priority = arguments.get("priority") or "normal"
+        
+        if not file_path:
             return [TextContent(
                 type="text",
-                text=f"Error: {result.error}"
+                text="Error: file_path is required"
+            )]
+        if priority not in PRIORITIES:
+            return [TextContent(
+                type="text",
+                text=f"Error: unknown priority '{priority}' (use high, normal or low)"
+            )]
+        try:
+            pages, max_pages = page_arguments(arguments)
+        except ValueError as e:
+            return [TextContent(
+                type="text",
+                text=f"Error: {str(e)}"
             )]
         
-        # Format output
-        output = f"Backend used: {result.backend}\\n"
-        if result.confidence:
-            output += f"Confidence: {result.confidence:.2%}\\n"
-        output += f"\\nExtracted Text:\\n{'-' * 40}\\n{result.text}"
+        # Reject unreadable or oversized files now rather than in the job
+        try:
+            check_file_size(file_path, settings.MAX_FILE_SIZE_MB)
+        except (FileTooLargeError, OSError) as e:
+            return [TextContent(
+                type="text",
+                text=f"Error: {str(e)}"
+            )]
         
+        job_id = await job_scheduler.submit(
+            os.path.abspath(file_path),
+            {"backend": arguments.get("backend"), "pages": pages, "max_pages": max_pages},
+            priority
+        )
+        return [TextContent(
+            type="text",
+            text=json.dumps(await job_scheduler.status(job_id), indent=2)
+        )]
+    
+    if name == "ocr_status":
+        job_id = arguments.get("job_id")
+        if job_id:
+            job = await job_scheduler.status(job_id)
+            if job is None:
+                return [TextContent(
+                    type="text",
+                    text=f"Error: unknown job '{job_id}'"
+                )]
+            output: Any = job
+        else:
+            output = {
+                "scheduler": await job_scheduler.stats(),
+                "jobs": await job_scheduler.list(
+                    arguments.get("limit") or 20,
+                    arguments.get("status")
+                ),
+            }
         return [TextContent(
             type="text",
-            text=output
+            text=json.dumps(output, indent=2)
+        )]
+    
+    if name == "ocr_result":
+        job_id = arguments.get("job_id") or ""
+        job = await job_scheduler.status(job_id)
+        if job is None:
+            return [TextContent(
+                type="text",
+                text=f"Error: unknown job '{job_id}'"
+            )]
+        if job["status"] in (QUEUED, RUNNING, CANCELLED):
+            progress = f"{job['pages_done']}/{job['pages_total']} pages" if job["pages_total"] else ""
+            return [TextContent(
+                type="text",
+                text=f"Error: job {job_id} is {job['status']}" + (f" ({progress})" if progress else "")
+            )]
+        result = await job_scheduler.result(job_id)
+        return await present_result(result)
+    
+    if name == "ocr_read":
+        result_id = arguments.get("result_id") or ""
+        page = arguments.get("page")
+        store = get_result_store()
+        if store is None:
+            return [TextContent(
+                type="text",
+                text="Error: stored results are disabled (RESULT_INLINE_MAX_CHARS=0)"
+            )]
+        
+        try:
+            if page is not None:
+                read = await asyncio.to_thread(store.read_page, result_id, int(page))
+            else:
+                read = await asyncio.to_thread(
+                    store.read,
+                    result_id,
+                    int(arguments.get("offset") or 0),
+                    int(arguments.get("length") or settings.RESULT_INLINE_MAX_CHARS)
+                )
+        except ResultNotFound:
+            return [TextContent(
+                type="text",
+                text=f"Error: unknown or expired result '{result_id}'"
+            )]
+        except ValueError as e:
+            return [TextContent(
+                type="text",
+                text=f"Error: {str(e)}"
+            )]
+        
+        header = (
+            f"--- {format_pages(read['pages'])}, " if "pages" in read else "--- "
+        ) + f"characters {read['offset']:,}-{read['end']:,} of {read['characters']:,} ---"
+        if read["next_offset"] is not None:
+            header += f"\nNext offset: {read['next_offset']}"
+        return [TextContent(
+            type="text",
+            text=f"{header}\n{read['text']}"
+        )]
+    
+    if name == "ocr_cancel":
+        job_id = arguments.get("job_id") or ""
+        previous = await job_scheduler.cancel(job_id)
+        if previous is None:
+            return [TextContent(
+                type="text",
+                text=f"Error: unknown job '{job_id}'"
+            )]
+        if previous in (DONE, FAILED, CANCELLED):
+            text = f"Job {job_id} already {previous}"
+        else:
+            text = f"Job {job_id} cancelled (was {previous})"
+        return [TextContent(
+            type="text",
+            text=text
+        )]
+    
+    if name == "ocr_batch":
+        file_paths = expand_paths(
+            arguments.get("file_paths"),
+            arguments.get("pattern")
+        )
+        backend = arguments.get("backend")
+        
+        if not file_paths:
+            return [TextContent(
+                type="text",
+                text="Error: no files given or matched (use file_paths or pattern)"
+            )]
+        
+        if len(file_paths) > settings.BATCH_MAX_FILES:
+            return [TextContent(
+                type="text",
+                text=f"Error: {len(file_paths)} files exceed BATCH_MAX_FILES ({settings.BATCH_MAX_FILES})"
+            )]
+        
+        summary = await run_batch(
+            file_paths,
+            lambda path: process_with_fallback(file_path=path, backend=backend),
+            concurrency=arguments.get("concurrency") or settings.BATCH_CONCURRENCY,
+            include_text=arguments.get("include_text", True)
+        )
+        return [TextContent(
+            type="text",
+            text=json.dumps(summary, indent=2)
+        )]
+    
+    if name == "marker_models":
+        action = arguments.get("action") or "status"
+        try:
+            stats = await manage_marker_models(action)
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"Error: {str(e)}"
+            )]
+        return [TextContent(
+            type="text",
+            text=json.dumps(stats, indent=2)
+        )]
+    
+    if name == "ocr_connections":
+        stats = {
+            b.name: b.http.stats()
+            for b in get_backends()
+            if isinstance(b, VisionAPIBackend)
+        }
+        return [TextContent(
+            type="text",
+            text=json.dumps(stats, indent=2)
+        )]
+    
+    if name == "ocr_health":
+        reset = arguments.get("reset")
+        if reset:
+            health_tracker.reset(None if reset == "all" else reset.lower())
+        stats = {
+            "backends": health_tracker.stats(),
+            "hedging": hedge_policy.stats(),
+            "concurrency": backend_limiter.stats(),
+            "rate_limits": rate_limiter.stats(),
+            "clients": client_limiter.stats(),
+        }
+        return [TextContent(
+            type="text",
+            text=json.dumps(stats, indent=2)
+        )]
+    
+    if name == "ocr_reload":
+        try:
+            summary = await registry.reload(settings.RELOAD_DRAIN_TIMEOUT)
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"Error: {str(e)}"
+            )]
+        return [TextContent(
+            type="text",
+            text=json.dumps(summary, indent=2)
+        )]
+    
+    if name == "ocr_stats":
+        if arguments.get("format") == "prometheus":
+            text = metrics.render_prometheus()
+        else:
+            text = json.dumps(metrics.snapshot(), indent=2)
+        if arguments.get("reset"):
+            metrics.reset()
+        return [TextContent(
+            type="text",
+            text=text
+        )]
+    
+    if name == "ocr_cache":
+        action = arguments.get("action") or "stats"
+        try:
+            stats = await manage_cache(action, arguments.get("limit") or 20)
+        except Exception as e:
+            return [TextContent(
+                type="text",
+                text=f"Error: {str(e)}"
+            )]
+        return [TextContent(
+            type="text",
+            text=json.dumps(stats, indent=2)
         )]
     
     return [TextContent(
@@ -156,6 +1470,25 @@ async def call_tool(name: str, arguments: Any) -> list[TextContent]:
     )]
 
 
+def install_reload_handler() -> None:
+    """Reload configuration when the process receives SIGHUP (POSIX only)."""
+    if not hasattr(signal, "SIGHUP"):
+        return
+    
+    async def reload() -> None:
+        try:
+            summary = await registry.reload(settings.RELOAD_DRAIN_TIMEOUT)
+            print(f"Configuration reloaded: {json.dumps(summary)}", file=sys.stderr)
+        except Exception as e:
+            print(f"Configuration reload failed: {e}", file=sys.stderr)
+    
+    loop = asyncio.get_running_loop()
+    try:
+        loop.add_signal_handler(signal.SIGHUP, lambda: loop.create_task(reload()))
+    except (NotImplementedError, RuntimeError):
+        pass
+
+
 async def main():
     """Main entry point."""
     # Validate configuration
@@ -171,18 +1504,61 @@ async def main():
     print(f"Enabled backends: {', '.join(settings.ENABLED_BACKENDS)}", file=sys.stderr)
     print(f"Default backend: {settings.DEFAULT_BACKEND}", file=sys.stderr)
     
-    # List available backends
-    backends = get_backends()
+    # Build the backends once; they live as long as the server
+    backends = await asyncio.to_thread(get_backends)
     print(f"Available backends: {', '.join([b.name for b in backends])}", file=sys.stderr)
     
+    # Keep Marker models resident from the start if requested
+    if settings.MARKER_PRELOAD and any(b.name == "marker" for b in backends):
+        await preload_marker_models()
+    
+    # Warm up API connections so the first request skips the TLS handshake
+    if settings.HTTP_PRECONNECT:
+        await preconnect_backends(backends)
+    
+    # Reload configuration on SIGHUP
+    install_reload_handler()
+    
+    # Pick up jobs queued or interrupted before the last shutdown
+    await job_scheduler.resume()
+    
+    # Expose ocr_stats to Prometheus scrapers if requested
+    exporter = None
+    if settings.METRICS_PORT:
+        exporter = await serve_prometheus(settings.METRICS_HOST, settings.METRICS_PORT)
+    
     # Start server
-    async with stdio_server() as (read_stream, write_stream):
-        await app.run(
-            read_stream,
-            write_stream,
-            app.create_initialization_options()
-        )
+    try:
+        if settings.MCP_TRANSPORT == STDIO:
+            async with stdio_server() as (read_stream, write_stream):
+                await app.run(
+                    read_stream,
+                    write_stream,
+                    app.create_initialization_options()
+                )
+        else:
+            await serve_http(
+                app,
+                settings.MCP_TRANSPORT,
+                settings.MCP_HOST,
+                settings.MCP_PORT,
+                drain_timeout=settings.SHUTDOWN_TIMEOUT
+            )
+    finally:
+        # Running jobs go back to the queue and resume on the next start
+        await job_scheduler.stop()
+        if exporter is not None:
+            exporter.close()
+        await registry.aclose()
+
+
+def run() -> None:
+    """Console script entry point."""
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run()
\ No newline at end of file
@@ -0,0 +1,140 @@
+"""Share one in-flight OCR run between concurrent identical requests."""
+
+import asyncio
+import dataclasses
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from .backends.base import OCRResult
+from .deadline import Deadline, current_deadline, use_deadline
+from .pages import ChunkCallback
+
+
+class Flight:
+    """One running computation and the callers waiting for it."""
+
+    def __init__(self, deadline: Deadline):
+        self.task: Optional[asyncio.Task] = None
+        # Ends with the waiter that has the most time left
+        self.deadline = deadline
+        self.waiters = 0
+        self.listeners: List[ChunkCallback] = []
+
+    async def broadcast(self, *args: Any) -> None:
+        """Forward a page chunk event to every waiter that asked for progress."""
+        for listener in list(self.listeners):
+            try:
+                await listener(*args)
+            except Exception:
+                pass
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent requests for the same key.
+
+    The first caller starts the computation as a separate task; callers
+    arriving while it runs wait on the same task. Each caller waits through
+    ``asyncio.shield``, so a caller that is cancelled only stops waiting.
+    The computation itself is cancelled once every caller has gone.
+
+    The computation runs against its own deadline, which lasts as long as
+    the deadline of its most patient caller; each caller still gives up at
+    its own deadline.
+    """
+
+    def __init__(self):
+        self._flights: Dict[str, Flight] = {}
+        self.started = 0
+        self.deduplicated = 0
+        self.abandoned = 0
+
+    def _forget(self, key: str, flight: Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
+
+    def _finished(self, key: str, flight: Flight, task: asyncio.Task) -> None:
+        self._forget(key, flight)
+        if not task.cancelled():
+            # Mark the exception as seen when every waiter has already left
+            task.exception()
+
+    @staticmethod
+    async def _compute(
+        flight: Flight,
+        compute: Callable[[Optional[ChunkCallback]], Awaitable[OCRResult]],
+        notify: Optional[ChunkCallback]
+    ) -> OCRResult:
+        # The task copied the first caller's context; swap in the flight's
+        # own deadline so a caller with little time left does not cut the
+        # run short for the others
+        with use_deadline(flight.deadline):
+            return await compute(notify)
+
+    async def run(
+        self,
+        key: str,
+        compute: Callable[[Optional[ChunkCallback]], Awaitable[OCRResult]],
+        on_chunk: Optional[ChunkCallback] = None
+    ) -> OCRResult:
+        """
+        Run ``compute`` for ``key`` unless an identical run is in flight.
+
+        Args:
+            key: Identity of the request (content hash plus options)
+            compute: Coroutine factory; receives a page chunk callback that
+                reaches every waiting caller, or None without ``on_chunk``
+            on_chunk: This caller's page chunk callback (optional)
+
+        Returns:
+            The shared result; callers that joined a running computation get
+            a copy marked ``deduplicated`` in its metadata
+        """
+        flight = self._flights.get(key)
+        shared = flight is not None
+        caller_deadline = current_deadline()
+        if flight is None:
+            flight = Flight(caller_deadline.shared())
+            # Progress is only wired up (and pages only streamed) when the
+            # caller that starts the run asked for it
+            notify = flight.broadcast if on_chunk is not None else None
+            flight.task = asyncio.create_task(self._compute(flight, compute, notify))
+            flight.task.add_done_callback(lambda task: self._finished(key, flight, task))
+            self._flights[key] = flight
+            self.started += 1
+        else:
+            flight.deadline.extend(caller_deadline)
+            self.deduplicated += 1
+
+        flight.waiters += 1
+        if on_chunk is not None:
+            flight.listeners.append(on_chunk)
+        try:
+            result = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if on_chunk is not None:
+                flight.listeners.remove(on_chunk)
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is left to use the result
+                self._forget(key, flight)
+                flight.task.cancel()
+                self.abandoned += 1
+
+        if not shared:
+            return result
+        return dataclasses.replace(
+            result,
+            metadata={**(result.metadata or {}), "deduplicated": True}
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": len(self._flights),
+            "waiters": sum(flight.waiters for flight in self._flights.values()),
+            "started": self.started,
+            "deduplicated": self.deduplicated,
+            "abandoned": self.abandoned,
+        }
+
+
+inflight = SingleFlight()
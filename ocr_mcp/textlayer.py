@@ -0,0 +1,116 @@
+"""Use the embedded text layer of born-digital PDF pages instead of OCR."""
+
+from typing import Any, Dict, Set, Tuple
+
+from pypdf import PdfReader
+from pypdf.generic import DictionaryObject, IndirectObject
+
+
+def usable_text(text: str, min_chars: int = 25, min_letter_ratio: float = 0.5) -> bool:
+    """
+    Decide whether extracted text is a real text layer.
+
+    Scanned pages have no text at all, or only a few stray characters, and
+    PDFs with broken font encodings produce replacement characters, ``(cid:N)``
+    codes or runs of symbols. Those pages still need OCR.
+
+    Args:
+        text: Text extracted from one page
+        min_chars: Minimum number of non-whitespace characters
+        min_letter_ratio: Minimum share of letters and digits among them
+
+    Returns:
+        True if the text can be used as is
+    """
+    visible = "".join(text.split())
+    if len(visible) < min_chars:
+        return False
+    if "\ufffd" in visible or "(cid:" in visible:
+        return False
+    letters = sum(1 for char in visible if char.isalnum())
+    return letters / len(visible) >= min_letter_ratio
+
+
+def _resolve(value: Any) -> Any:
+    return value.get_object() if isinstance(value, IndirectObject) else value
+
+
+def _image_names(resources: Any, names: Set[str], depth: int = 0) -> Set[str]:
+    """Collect the names of the image XObjects a page (or its forms) can draw."""
+    resources = _resolve(resources)
+    if not isinstance(resources, DictionaryObject):
+        return names
+    xobjects = _resolve(resources.get("/XObject"))
+    if not isinstance(xobjects, DictionaryObject):
+        return names
+    for name in xobjects:
+        xobject = _resolve(xobjects[name])
+        if not isinstance(xobject, DictionaryObject):
+            continue
+        if xobject.get("/Subtype") == "/Image":
+            names.add(name)
+        elif xobject.get("/Subtype") == "/Form" and depth < 8:
+            _image_names(xobject.get("/Resources"), names, depth + 1)
+    return names
+
+
+def read_page(page: Any) -> Tuple[str, float]:
+    """
+    Extract a page's text and measure how much of it is covered by images.
+
+    Images are measured by the area their transformation matrix maps the
+    unit square to, so one pass over the content stream gives both.
+
+    Returns:
+        Tuple of (text, share of the page area covered by images, 0 to 1)
+    """
+    names = _image_names(page.get("/Resources"), set())
+    covered = 0.0
+
+    def visit(operator: bytes, operands: Any, cm: Any, tm: Any) -> None:
+        nonlocal covered
+        if operator == b"INLINE IMAGE" or (
+            operator == b"Do" and operands and operands[0] in names
+        ):
+            covered += abs(cm[0] * cm[3] - cm[1] * cm[2])
+
+    text = page.extract_text(visitor_operand_before=visit) or ""
+
+    area = abs(float(page.mediabox.width) * float(page.mediabox.height))
+    return text, min(1.0, covered / area) if area else 0.0
+
+
+def classify_pages(
+    file_path: str,
+    min_chars: int = 25,
+    max_image_coverage: float = 0.5
+) -> Tuple[int, Dict[int, str]]:
+    """
+    Extract the text layer of every page and keep the usable ones.
+
+    A page mostly covered by images is treated as a scan even when it
+    carries some text: scanners and archiving tools stamp headers, Bates
+    numbers or an earlier OCR pass on top of the page image, and that text
+    is rarely the whole page.
+
+    Args:
+        file_path: PDF to inspect
+        min_chars: Minimum non-whitespace characters for a page to count
+        max_image_coverage: Pages with more of their area covered by
+            images are OCR'd
+
+    Returns:
+        Tuple of (page count, {0-based page index: text} for pages that do
+        not need OCR)
+    """
+    reader = PdfReader(file_path)
+    native = {}
+    for index, page in enumerate(reader.pages):
+        try:
+            text, coverage = read_page(page)
+        except Exception:
+            # Damaged content streams go to OCR like scanned pages
+            continue
+        if coverage <= max_image_coverage and usable_text(text, min_chars):
+            native[index] = text.strip()
+    return len(reader.pages), native
@@ -0,0 +1,179 @@
+"""Serve the MCP server over HTTP (streamable HTTP or SSE) to many clients."""
+
+import asyncio
+import contextlib
+import sys
+from typing import AsyncIterator, Iterator, Optional
+
+import uvicorn
+from mcp.server import Server
+from mcp.server.sse import SseServerTransport
+from mcp.server.streamable_http_manager import StreamableHTTPSessionManager
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Mount, Route
+
+
+STDIO = "stdio"
+SSE = "sse"
+STREAMABLE_HTTP = "streamable-http"
+TRANSPORTS = (STDIO, SSE, STREAMABLE_HTTP)
+
+
+class Drain:
+    """
+    Counts running tool calls so shutdown can wait for them.
+
+    Once draining starts, new calls are turned away while the running ones
+    finish.
+    """
+
+    def __init__(self):
+        self.active = 0
+        self.draining = False
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    @contextlib.contextmanager
+    def track(self) -> Iterator[None]:
+        self.active += 1
+        self._idle.clear()
+        try:
+            yield
+        finally:
+            self.active -= 1
+            if not self.active:
+                self._idle.set()
+
+    async def wait(self, timeout: float) -> bool:
+        """Stop admitting calls and wait for the running ones; False on timeout."""
+        self.draining = True
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+
+drain = Drain()
+
+
+def build_app(server: Server, transport: str) -> Starlette:
+    """
+    Build the Starlette application for a network transport.
+
+    Streamable HTTP is served at ``/mcp``; SSE clients connect to ``/sse``
+    and post their messages to ``/messages/``. ``/healthz`` answers load
+    balancer checks and reports 503 while draining.
+    """
+    async def healthz(request) -> JSONResponse:
+        status = 503 if drain.draining else 200
+        return JSONResponse(
+            {"status": "draining" if drain.draining else "ok", "active_calls": drain.active},
+            status_code=status
+        )
+
+    routes: list = [Route("/healthz", endpoint=healthz, methods=["GET"])]
+
+    if transport == SSE:
+        sse = SseServerTransport("/messages/")
+
+        async def handle_sse(request) -> Response:
+            async with sse.connect_sse(request.scope, request.receive, request._send) as streams:
+                await server.run(streams[0], streams[1], server.create_initialization_options())
+            return Response()
+
+        routes += [
+            Route("/sse", endpoint=handle_sse, methods=["GET"]),
+            Mount("/messages/", app=sse.handle_post_message),
+        ]
+        return Starlette(routes=routes)
+
+    manager = StreamableHTTPSessionManager(app=server)
+
+    class StreamableHTTPEndpoint:
+        # An ASGI callable, so Starlette passes the raw scope through
+        async def __call__(self, scope, receive, send) -> None:
+            await manager.handle_request(scope, receive, send)
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app) -> AsyncIterator[None]:
+        async with manager.run():
+            yield
+
+    routes.append(Route("/mcp", endpoint=StreamableHTTPEndpoint()))
+    return Starlette(routes=routes, lifespan=lifespan)
+
+
+class GracefulServer(uvicorn.Server):
+    """
+    uvicorn server that drains running tool calls before stopping.
+
+    The first SIGINT/SIGTERM stops new tool calls and waits up to
+    ``drain_timeout`` seconds for running ones, then shuts down as usual.
+    A second signal stops waiting; a third exits immediately.
+    """
+
+    def __init__(self, config: uvicorn.Config, drain_timeout: float):
+        super().__init__(config)
+        self.drain_timeout = drain_timeout
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    async def serve(self, sockets=None) -> None:
+        self._loop = asyncio.get_running_loop()
+        await super().serve(sockets)
+
+    def handle_exit(self, sig, frame) -> None:
+        # Runs in the signal handler, so the drain is scheduled on the loop.
+        # The signal is not recorded, so uvicorn does not re-raise it on exit.
+        if self.should_exit:
+            self.force_exit = True
+        elif drain.draining or self._loop is None:
+            self.should_exit = True
+        else:
+            drain.draining = True
+            self._loop.call_soon_threadsafe(
+                lambda: self._loop.create_task(self._drain_then_exit())
+            )
+
+    async def _drain_then_exit(self) -> None:
+        if drain.active:
+            print(
+                f"Shutting down: waiting up to {self.drain_timeout:g}s for "
+                f"{drain.active} running tool call(s)",
+                file=sys.stderr
+            )
+        if not await drain.wait(self.drain_timeout):
+            print(f"Shutting down with {drain.active} call(s) still running", file=sys.stderr)
+        self.should_exit = True
+
+
+async def serve_http(
+    server: Server,
+    transport: str,
+    host: str,
+    port: int,
+    drain_timeout: float = 30.0
+) -> None:
+    """
+    Serve ``server`` over a network transport until SIGINT/SIGTERM.
+
+    Args:
+        server: The MCP server
+        transport: ``sse`` or ``streamable-http``
+        host: Address to listen on
+        port: Port to listen on
+        drain_timeout: Seconds to let running tool calls finish on shutdown
+    """
+    config = uvicorn.Config(
+        build_app(server, transport),
+        host=host,
+        port=port,
+        log_level="info",
+        # Connections still open after the drain (idle SSE streams) get a
+        # few seconds before they are cut
+        timeout_graceful_shutdown=5
+    )
+    path = "/sse" if transport == SSE else "/mcp"
+    print(f"Serving MCP over {transport} at http://{host}:{port}{path}", file=sys.stderr)
+    await GracefulServer(config, drain_timeout).serve()
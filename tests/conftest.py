@@ -0,0 +1,5 @@
+"""Shared test setup: keep a developer's .env out of the tests."""
+
+import os
+
+os.environ.setdefault("OCR_MCP_ENV_FILE", os.devnull)
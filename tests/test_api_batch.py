@@ -0,0 +1,196 @@
+import asyncio
+import io
+
+import httpx
+import pytest
+from PIL import Image
+
+from ocr_mcp.backends.api import BatchResponseError, split_batch_response
+from ocr_mcp.backends.mistral import MistralBackend
+from ocr_mcp.backends.preprocess import ImageOptions, preprocess_image
+
+
+def backend(**config):
+    return MistralBackend({"api_key": "test", "batch_max_pages": 4, **config})
+
+
+def png_page(tmp_path, name):
+    path = tmp_path / name
+    Image.new("RGB", (400, 500), "white").save(path, "PNG")
+    return str(path)
+
+
+def test_split_returns_one_text_per_page():
+    text = "=== PAGE 1 ===\nfirst\n\n=== PAGE 2 ===\n\n=== PAGE 3 ===\nthird\n"
+    assert split_batch_response(text, 3) == ["first", "", "third"]
+
+
+@pytest.mark.parametrize("text", [
+    "=== PAGE 1 ===\nfirst\n=== PAGE 2 ===\nsecond",
+    "=== PAGE 1 ===\na\n=== PAGE 3 ===\nc\n=== PAGE 2 ===\nb",
+    "=== PAGE 1 ===\na\n=== PAGE 2 ===\nb\n=== PAGE 3 ===\nc\n=== PAGE 4 ===\nd",
+    "no markers at all",
+])
+def test_split_rejects_a_marker_count_or_order_mismatch(text):
+    with pytest.raises(BatchResponseError, match="expected page markers 1-3"):
+        split_batch_response(text, 3)
+
+
+def test_plan_batches_respects_pages_tokens_and_bytes():
+    assert backend().plan_batches([100] * 10) == [4, 4, 2]
+    assert backend(batch_max_tokens=8000).plan_batches([100] * 5) == [2, 2, 1]
+    # Each page alone is under the byte cap, two together are not
+    assert backend(batch_max_bytes=1000).plan_batches([600, 600, 600]) == [1, 1, 1]
+
+
+def image_mimes(payload):
+    return [
+        part["image_url"]["url"].split(";")[0]
+        for part in payload["messages"][0]["content"] if part["type"] == "image_url"
+    ]
+
+
+def test_mismatched_response_falls_back_to_single_pages(tmp_path):
+    ocr = backend()
+    paths = [png_page(tmp_path, f"{n}.png") for n in range(3)]
+    singles = []
+
+    async def complete(payload, body):
+        if len(image_mimes(payload)) > 1:
+            return "=== PAGE 1 ===\nonly one page", "stop", {"attempts": 1}
+        singles.append(payload)
+        return f"single {len(singles)}", "stop", {"attempts": 1}
+
+    ocr._complete = complete
+    results = asyncio.run(ocr.process_batch(paths))
+
+    assert len(singles) == 3
+    assert [result.text for result in results] == ["single 1", "single 2", "single 3"]
+    assert "found [1]" in results[0].metadata["batch_fallback"]
+    # The page limit shrinks after a failed batch
+    assert ocr.batch_limit == 2
+
+
+def test_fallback_resends_rendered_pdf_pages(tmp_path):
+    pytest.importorskip("pypdfium2")
+    from ocr_mcp.backends.marker_models import build_text_pdf
+
+    ocr = backend()
+    paths = []
+    for n in range(2):
+        path = tmp_path / f"{n}.pdf"
+        path.write_bytes(build_text_pdf([f"Page {n}"]))
+        paths.append(str(path))
+    mimes = []
+
+    async def complete(payload, body):
+        mimes.append(image_mimes(payload))
+        if len(mimes[-1]) > 1:
+            return "garbled", "stop", {"attempts": 1}
+        return "single", "stop", {"attempts": 1}
+
+    ocr._complete = complete
+    results = asyncio.run(ocr.process_batch(paths))
+    assert [result.text for result in results] == ["single", "single"]
+    assert mimes == [["data:image/jpeg"] * 2, ["data:image/jpeg"], ["data:image/jpeg"]]
+
+
+def test_leftover_single_page_is_sent_rendered(tmp_path):
+    pytest.importorskip("pypdfium2")
+    from ocr_mcp.backends.marker_models import build_text_pdf
+
+    ocr = backend(batch_max_pages=2)
+    paths = []
+    for n in range(3):
+        path = tmp_path / f"{n}.pdf"
+        path.write_bytes(build_text_pdf([f"Page {n}"]))
+        paths.append(str(path))
+    mimes = []
+
+    async def complete(payload, body):
+        mimes.append(image_mimes(payload))
+        if len(mimes[-1]) == 2:
+            return "=== PAGE 1 ===\na\n=== PAGE 2 ===\nb", "stop", {"attempts": 1}
+        return "c", "stop", {"attempts": 1}
+
+    ocr._complete = complete
+    results = asyncio.run(ocr.process_batch(paths))
+    assert [result.text for result in results] == ["a", "b", "c"]
+    assert mimes[-1] == ["data:image/jpeg"]
+
+
+def test_failed_request_is_not_repeated_per_page(tmp_path):
+    ocr = backend()
+    paths = [png_page(tmp_path, f"{n}.png") for n in range(3)]
+    calls = []
+
+    async def complete(payload, body):
+        calls.append(payload)
+        raise httpx.ConnectError("provider down")
+
+    ocr._complete = complete
+    results = asyncio.run(ocr.process_batch(paths))
+    assert len(calls) == 1
+    assert all("provider down" in result.error for result in results)
+    assert all("batch_fallback" not in (result.metadata or {}) for result in results)
+    # Only a response that cannot be split shrinks the batch
+    assert ocr.batch_limit == 4
+
+
+def test_preprocessing_failure_reports_every_page(tmp_path):
+    ocr = backend()
+    paths = [png_page(tmp_path, "0.png"), str(tmp_path / "missing.png")]
+
+    async def complete(payload, body):
+        raise AssertionError("nothing should be sent")
+
+    ocr._complete = complete
+    results = asyncio.run(ocr.process_batch(paths))
+    assert len(results) == 2
+    assert all(result.error for result in results)
+
+
+def test_batch_results_keep_page_order(tmp_path):
+    ocr = backend()
+    paths = [png_page(tmp_path, f"{n}.png") for n in range(3)]
+
+    async def complete(payload, body):
+        images = [part for part in payload["messages"][0]["content"] if part["type"] == "image_url"]
+        assert len(images) == 3
+        return "=== PAGE 1 ===\na\n=== PAGE 2 ===\nb\n=== PAGE 3 ===\nc", "stop", {"attempts": 1}
+
+    ocr._complete = complete
+    results = asyncio.run(ocr.process_batch(paths))
+    assert [result.text for result in results] == ["a", "b", "c"]
+    assert [result.metadata["batch_position"] for result in results] == [1, 2, 3]
+
+
+def test_truncated_response_is_not_split(tmp_path):
+    ocr = backend()
+    paths = [png_page(tmp_path, f"{n}.png") for n in range(2)]
+
+    async def complete(payload, body):
+        if len(image_mimes(payload)) > 1:
+            return "=== PAGE 1 ===\na\n=== PAGE 2 ===\nb", "length", {"attempts": 1}
+        return "single", "stop", {"attempts": 1}
+
+    ocr._complete = complete
+    results = asyncio.run(ocr.process_batch(paths))
+    assert [result.text for result in results] == ["single", "single"]
+    assert "cut off" in results[0].metadata["batch_fallback"]
+
+
+def test_pdf_pages_are_rendered_to_images():
+    pytest.importorskip("pypdfium2")
+    from ocr_mcp.backends.marker_models import build_text_pdf
+
+    pdf = build_text_pdf(["A page to render"])
+    prepared = preprocess_image(pdf, ImageOptions(), render_pdf=True)
+    assert prepared.mime == "image/jpeg"
+    assert prepared.metadata["rendered_dpi"] == 150
+    Image.open(io.BytesIO(prepared.data)).verify()
+
+    # Without render_pdf a PDF still passes through untouched
+    assert preprocess_image(pdf, ImageOptions()).mime == "application/pdf"
+    # Rendering does not depend on preprocessing being enabled
+    assert preprocess_image(pdf, ImageOptions(enabled=False), render_pdf=True).mime == "image/png"
@@ -0,0 +1,77 @@
+import time
+
+from ocr_mcp.backends.base import OCRResult
+from ocr_mcp.cache import PageStore, ResultCache, hash_content, make_key, output_fingerprint
+from ocr_mcp.config import settings
+
+
+def test_hash_content_matches_for_file_and_bytes(tmp_path):
+    path = tmp_path / "page.png"
+    path.write_bytes(b"image bytes")
+    assert hash_content(str(path)) == hash_content(image_data=b"image bytes")
+
+
+def test_make_key_separates_backends_and_options():
+    assert make_key("abc", None) == make_key("abc", None, {})
+    assert make_key("abc", None) != make_key("abc", "mistral")
+    assert make_key("abc", None, {"pages": [[0, 2]]}) != make_key("abc", None)
+    assert make_key("abc", None, {"a": 1, "b": 2}) == make_key("abc", None, {"b": 2, "a": 1})
+    assert make_key("abc", None).startswith("abc:")
+
+
+def test_output_fingerprint_follows_output_settings(monkeypatch):
+    before = output_fingerprint()
+    assert output_fingerprint() == before
+    monkeypatch.setattr(settings, "IMAGE_QUALITY", settings.IMAGE_QUALITY - 10)
+    assert output_fingerprint() != before
+
+
+def test_output_fingerprint_ignores_unrelated_settings(monkeypatch):
+    before = output_fingerprint()
+    monkeypatch.setattr(settings, "JOBS_WORKERS", settings.JOBS_WORKERS + 1)
+    assert output_fingerprint() == before
+
+
+def test_output_fingerprint_follows_the_model(monkeypatch):
+    from ocr_mcp.backends.mistral import MistralBackend
+
+    before = output_fingerprint()
+    monkeypatch.setattr(MistralBackend, "model", "another-model")
+    assert output_fingerprint() != before
+
+
+def test_result_cache_round_trip_and_memory_tier(tmp_path):
+    cache = ResultCache(str(tmp_path), memory_entries=4)
+    result = OCRResult(text="hello", backend="mistral", confidence=0.9)
+    cache.put("key", result)
+    assert cache.get("key").text == "hello"
+    assert cache.memory_hits == 1
+
+    # A fresh instance reads it back from disk
+    cache.close()
+    reopened = ResultCache(str(tmp_path), memory_entries=0)
+    assert reopened.get("key").text == "hello"
+    assert reopened.disk_hits == 1
+    assert reopened.get("missing") is None
+    reopened.close()
+
+
+def test_result_cache_skips_errors_and_expires_entries(tmp_path):
+    cache = ResultCache(str(tmp_path), ttl_seconds=1, memory_entries=0)
+    cache.put("failed", OCRResult(text="", backend="mistral", error="boom"))
+    assert cache.get("failed") is None
+
+    cache.put("key", OCRResult(text="hello", backend="mistral"))
+    db = cache._db()
+    db.execute("UPDATE results SET created_at = ?", (time.time() - 10,))
+    db.commit()
+    assert cache.get("key") is None
+    cache.close()
+
+
+def test_page_store_is_scoped_by_variant(tmp_path):
+    store = PageStore(str(tmp_path))
+    store.put_many({"fp1": OCRResult(text="page one", backend="mistral")}, "auto:aaa")
+    assert store.get_many(["fp1", "fp2"], "auto:aaa")["fp1"].text == "page one"
+    assert store.get_many(["fp1"], "auto:bbb") == {}
+    store.close()
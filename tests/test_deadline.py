@@ -0,0 +1,94 @@
+import asyncio
+
+import pytest
+
+from ocr_mcp.deadline import Deadline, DeadlineExceeded, current_deadline, start_deadline, use_deadline
+
+
+def test_unlimited_deadline():
+    deadline = Deadline(0)
+    assert deadline.remaining() is None
+    assert not deadline.expired()
+    assert deadline.allows(None) and deadline.allows(1e9)
+    assert deadline.clamp(30) == 30
+    assert deadline.report()["budget_seconds"] is None
+
+
+def test_allows_and_clamp_respect_time_left():
+    deadline = Deadline(10)
+    assert deadline.allows(None)
+    assert deadline.allows(5)
+    assert not deadline.allows(20)
+    assert deadline.clamp(30) <= 10
+    assert deadline.clamp(1) == 1
+
+
+def test_expired_deadline_allows_nothing():
+    deadline = Deadline(10)
+    deadline.expires_at = deadline.started
+    assert deadline.remaining() == 0
+    assert deadline.expired()
+    assert not deadline.allows(None)
+    assert not deadline.allows(0)
+    assert deadline.clamp(5) == 0
+    assert deadline.report()["exceeded"] is True
+
+
+def test_run_raises_deadline_exceeded():
+    async def main():
+        await Deadline(0.05).run(asyncio.sleep(1))
+
+    with pytest.raises(DeadlineExceeded, match="0.05s exceeded"):
+        asyncio.run(main())
+
+
+def test_run_returns_result_in_time():
+    async def answer():
+        return 42
+
+    assert asyncio.run(Deadline(5).run(answer())) == 42
+    assert asyncio.run(Deadline(0).run(answer())) == 42
+
+
+def test_nested_request_keeps_the_sooner_outer_deadline():
+    with start_deadline(5) as outer:
+        with start_deadline(60) as inner:
+            assert inner is outer
+        with start_deadline(1) as inner:
+            assert inner is not outer
+            assert current_deadline() is inner
+        assert current_deadline() is outer
+    assert current_deadline().remaining() is None
+
+
+def test_unlimited_nested_request_keeps_the_outer_deadline():
+    with start_deadline(5) as outer:
+        with start_deadline(0) as inner:
+            assert inner is outer
+
+
+def test_shared_copy_is_independent():
+    original = Deadline(5)
+    copy = original.shared()
+    assert copy is not original
+    assert copy.expires_at == original.expires_at
+    copy.extend(Deadline(60))
+    assert original.remaining() <= 5
+    assert copy.remaining() > 50
+
+
+def test_extend_never_shortens():
+    deadline = Deadline(60)
+    deadline.extend(Deadline(1))
+    assert deadline.remaining() > 50
+    unlimited = Deadline(0)
+    unlimited.extend(Deadline(1))
+    assert unlimited.remaining() is None
+
+
+def test_use_deadline_restores_previous():
+    shared = Deadline(30)
+    with start_deadline(5) as request:
+        with use_deadline(shared):
+            assert current_deadline() is shared
+        assert current_deadline() is request
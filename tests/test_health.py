@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+
+import pytest
+
+from ocr_mcp import health as health_module
+from ocr_mcp.config import settings
+from ocr_mcp.health import CLOSED, HALF_OPEN, OPEN, BackendHealth, HealthTracker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 500.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(health_module, "time", clock)
+    monkeypatch.setattr(settings, "BREAKER_FAILURE_THRESHOLD", 3)
+    monkeypatch.setattr(settings, "BREAKER_OPEN_SECONDS", 30)
+    monkeypatch.setattr(settings, "BREAKER_HALF_OPEN_PROBES", 1)
+    return clock
+
+
+def fail(health, times=1):
+    for _ in range(times):
+        assert health.acquire()
+        health.record(False, 1.0, "boom")
+
+
+def open_breaker(health, clock):
+    fail(health, settings.BREAKER_FAILURE_THRESHOLD)
+    assert health.state == OPEN
+    clock.now += settings.BREAKER_OPEN_SECONDS
+
+
+def test_opens_after_consecutive_failures(clock):
+    health = BackendHealth("mistral")
+    fail(health, 2)
+    health.record(True, 1.0)
+    fail(health, 2)
+    # The success reset the streak
+    assert health.state == CLOSED
+    fail(health)
+    assert health.state == OPEN
+    assert health.times_opened == 1
+    assert not health.acquire()
+    assert health.skipped == 1
+    assert health.stats()["retry_in_seconds"] == pytest.approx(30)
+
+
+def test_half_open_after_the_open_period(clock):
+    health = BackendHealth("mistral")
+    fail(health, 3)
+    clock.now += 29
+    assert not health.is_callable()
+    clock.now += 1
+    assert health.is_callable()
+    assert health.state == HALF_OPEN
+
+
+def test_successful_probe_closes(clock):
+    health = BackendHealth("mistral")
+    open_breaker(health, clock)
+    assert health.acquire()
+    assert health.probes_in_flight == 1
+    health.record(True, 0.5)
+    assert health.state == CLOSED
+    assert health.probes_in_flight == 0
+    assert health.consecutive_failures == 0
+
+
+def test_failed_probe_reopens(clock):
+    health = BackendHealth("mistral")
+    open_breaker(health, clock)
+    fail(health)
+    assert health.state == OPEN
+    assert health.probes_in_flight == 0
+    assert health.times_opened == 2
+    assert not health.is_callable()
+
+
+def test_probe_slots_are_limited_and_released(clock, monkeypatch):
+    monkeypatch.setattr(settings, "BREAKER_HALF_OPEN_PROBES", 2)
+    health = BackendHealth("mistral")
+    open_breaker(health, clock)
+    assert health.acquire() and health.acquire()
+    assert not health.acquire()
+    # A cancelled probe gives its slot back without an outcome
+    health.release()
+    assert health.probes_in_flight == 1
+    assert health.acquire()
+    assert health.state == HALF_OPEN
+    health.release()
+    health.release()
+    health.release()
+    assert health.probes_in_flight == 0
+
+
+def test_release_outside_half_open_is_a_no_op(clock):
+    health = BackendHealth("mistral")
+    assert health.acquire()
+    health.release()
+    assert health.probes_in_flight == 0
+    assert health.state == CLOSED
+
+
+def test_reset_closes_the_circuit(clock):
+    health = BackendHealth("mistral")
+    fail(health, 3)
+    health.reset()
+    assert health.state == CLOSED
+    assert health.acquire()
+
+
+def test_ewma_latency_tracks_successes(clock, monkeypatch):
+    monkeypatch.setattr(settings, "HEALTH_EWMA_ALPHA", 0.5)
+    health = BackendHealth("mistral")
+    health.record(True, 2.0)
+    health.record(True, 4.0)
+    health.record(False, 100.0)
+    assert health.ewma_latency == pytest.approx(3.0)
+    assert health.success_rate == pytest.approx(2 / 3)
+
+
+def test_route_skips_open_circuits_and_orders_by_latency(clock, monkeypatch):
+    tracker = HealthTracker()
+    backends = [SimpleNamespace(name=name) for name in ("marker", "mistral", "deepseek")]
+    fail(tracker.get("marker"), 3)
+    assert [b.name for b in tracker.route(backends)] == ["mistral", "deepseek"]
+
+    monkeypatch.setattr(settings, "HEALTH_LATENCY_ORDERING", True)
+    tracker.get("mistral").record(True, 5.0)
+    # Untried backends keep their place
+    assert [b.name for b in tracker.route(backends)] == ["mistral", "deepseek"]
+    tracker.get("deepseek").record(True, 1.0)
+    assert [b.name for b in tracker.route(backends)] == ["deepseek", "mistral"]
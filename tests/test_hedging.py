@@ -0,0 +1,69 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from ocr_mcp import hedging
+from ocr_mcp.backends.base import OCRResult
+from ocr_mcp.config import settings
+from ocr_mcp.deadline import Deadline, use_deadline
+from ocr_mcp.health import health_tracker
+
+
+@pytest.fixture(autouse=True)
+def hedge_settings(monkeypatch):
+    monkeypatch.setattr(hedging, "hedge_policy", hedging.HedgePolicy())
+    monkeypatch.setattr(settings, "HEDGE_DELAY_SECONDS", 0.05)
+    monkeypatch.setattr(settings, "HEDGE_MAX_FRACTION", 1.0)
+    monkeypatch.setattr(settings, "HEDGE_MIN_SAMPLES", 1000)
+
+
+def backends(*names):
+    return [SimpleNamespace(name=f"hedge-test-{name}") for name in names]
+
+
+def caller(delays):
+    async def call(backend):
+        await asyncio.sleep(delays[backend.name.rsplit("-", 1)[1]])
+        return OCRResult(text=f"from {backend.name}", backend=backend.name)
+    return call
+
+
+def run(chain, call, budget=0):
+    async def main():
+        with use_deadline(Deadline(budget)):
+            return await hedging.run_hedged(chain, call)
+    return asyncio.run(main())
+
+
+def test_slow_primary_is_hedged():
+    result, errors = run(backends("a", "b"), caller({"a": 1.0, "b": 0.0}))
+    assert result.backend == "hedge-test-b"
+    assert result.metadata["hedged"] is True
+    assert result.metadata["backends_started"] == ["hedge-test-a", "hedge-test-b"]
+    assert errors == []
+    assert hedging.hedge_policy.hedge_wins == 1
+
+
+def test_hedge_skips_backends_too_slow_for_the_deadline(monkeypatch):
+    monkeypatch.setattr(health_tracker.get("hedge-test-b"), "ewma_latency", 60.0)
+    result, errors = run(backends("a", "b", "c"), caller({"a": 1.0, "c": 0.0}), budget=5)
+    assert result.backend == "hedge-test-c"
+    assert result.metadata["backends_started"] == ["hedge-test-a", "hedge-test-c"]
+    assert errors[0].startswith("hedge-test-b: skipped")
+
+
+def test_no_hedge_when_every_fallback_is_too_slow(monkeypatch):
+    monkeypatch.setattr(health_tracker.get("hedge-test-b"), "ewma_latency", 60.0)
+    result, _ = run(backends("a", "b"), caller({"a": 0.2}), budget=5)
+    assert result.backend == "hedge-test-a"
+    assert result.metadata["hedged"] is False
+    assert hedging.hedge_policy.hedges == 0
+
+
+def test_nothing_started_when_no_backend_fits(monkeypatch):
+    for name in ("a", "b"):
+        monkeypatch.setattr(health_tracker.get(f"hedge-test-{name}"), "ewma_latency", 60.0)
+    result, errors = run(backends("a", "b"), caller({}), budget=5)
+    assert result is None
+    assert len(errors) == 2
@@ -0,0 +1,153 @@
+import asyncio
+import json
+import os
+
+import pytest
+
+from ocr_mcp import server
+from ocr_mcp.backends.base import OCRResult
+from ocr_mcp.ingest import (
+    DONE,
+    FAILED,
+    MANIFEST_NAME,
+    QUEUED,
+    RUNNING,
+    IngestManifest,
+    Ingester,
+    parse_extensions,
+)
+
+
+@pytest.fixture
+def stub_backend(monkeypatch):
+    """Replace the OCR pipeline; files whose name contains 'bad' fail."""
+    calls = []
+
+    async def process_with_fallback(file_path, backend=None, timeout=None):
+        calls.append(os.path.basename(file_path))
+        if "bad" in file_path:
+            return OCRResult(text="", backend="stub", error="unreadable")
+        return OCRResult(text=f"text of {os.path.basename(file_path)}", backend="stub")
+
+    monkeypatch.setattr(server, "process_with_fallback", process_with_fallback)
+    return calls
+
+
+def make_folder(tmp_path, names):
+    source = tmp_path / "in"
+    for name in names:
+        path = source / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(b"%PDF-1.4 stub")
+    return source
+
+
+def ingest_once(source, output, **options):
+    manifest = IngestManifest(str(output / MANIFEST_NAME))
+    ingester = Ingester(
+        source=str(source),
+        output=str(output),
+        manifest=manifest,
+        workers=2,
+        once=True,
+        settle_seconds=0,
+        report_seconds=0,
+        extensions=parse_extensions(".pdf,.png"),
+        **options
+    )
+    try:
+        return asyncio.run(ingester.run()), manifest.counts()
+    finally:
+        manifest.close()
+
+
+def test_single_pass_writes_sidecars(tmp_path, stub_backend):
+    source = make_folder(tmp_path, ["a.pdf", "sub/b.png", "notes.txt", ".hidden.pdf"])
+    output = tmp_path / "out"
+    stats, counts = ingest_once(source, output)
+
+    assert sorted(stub_backend) == ["a.pdf", "b.png"]
+    assert stats["done"] == 2 and stats["failed"] == 0
+    assert counts[DONE] == 2
+    assert (output / "a.pdf.txt").read_text() == "text of a.pdf"
+    info = json.loads((output / "sub" / "b.png.json").read_text())
+    assert info["backend"] == "stub"
+    assert info["characters"] == len("text of b.png")
+    assert info["source"] == str(source / "sub" / "b.png")
+    # The atomic writes leave no temporary files behind
+    leftovers = [name for _, _, names in os.walk(output) for name in names if name.endswith(".tmp")]
+    assert leftovers == []
+
+
+def test_restart_skips_finished_files(tmp_path, stub_backend):
+    source = make_folder(tmp_path, ["a.pdf", "b.pdf"])
+    output = tmp_path / "out"
+    ingest_once(source, output)
+    stub_backend.clear()
+
+    stats, counts = ingest_once(source, output)
+    assert stub_backend == []
+    assert stats["done"] == 0
+    assert counts[DONE] == 2
+
+
+def test_changed_file_is_processed_again(tmp_path, stub_backend):
+    source = make_folder(tmp_path, ["a.pdf", "b.pdf"])
+    output = tmp_path / "out"
+    ingest_once(source, output)
+    stub_backend.clear()
+
+    (source / "a.pdf").write_bytes(b"%PDF-1.4 new content")
+    ingest_once(source, output)
+    assert stub_backend == ["a.pdf"]
+
+
+def test_restart_retries_interrupted_files(tmp_path, stub_backend):
+    source = make_folder(tmp_path, ["a.pdf", "b.pdf"])
+    output = tmp_path / "out"
+    manifest = IngestManifest(str(output / MANIFEST_NAME))
+    stat = (source / "a.pdf").stat()
+    manifest.sync([("a.pdf", stat.st_size, stat.st_mtime_ns)])
+    # The previous process died while OCRing a.pdf
+    assert manifest.claim_next()["path"] == "a.pdf"
+    assert manifest.counts()[RUNNING] == 1
+    manifest.close()
+
+    stats, counts = ingest_once(source, output)
+    assert sorted(stub_backend) == ["a.pdf", "b.pdf"]
+    assert counts == {QUEUED: 0, RUNNING: 0, DONE: 2, FAILED: 0}
+    assert (output / "a.pdf.txt").exists()
+
+
+def test_restart_retries_files_waiting_for_a_retry(tmp_path, stub_backend):
+    source = make_folder(tmp_path, ["a.pdf"])
+    output = tmp_path / "out"
+    manifest = IngestManifest(str(output / MANIFEST_NAME))
+    stat = (source / "a.pdf").stat()
+    manifest.sync([("a.pdf", stat.st_size, stat.st_mtime_ns)])
+    manifest.claim_next()
+    failure = OCRResult(text="", backend="stub", error="timeout")
+    assert manifest.finish("a.pdf", failure, max_attempts=3, retry_seconds=0) == QUEUED
+    manifest.close()
+
+    stats, counts = ingest_once(source, output)
+    assert stub_backend == ["a.pdf"]
+    assert counts[DONE] == 1
+
+
+def test_failing_file_stops_after_max_attempts(tmp_path, stub_backend):
+    source = make_folder(tmp_path, ["bad.pdf", "good.pdf"])
+    output = tmp_path / "out"
+    stats, counts = ingest_once(source, output, max_attempts=2)
+
+    assert stub_backend.count("bad.pdf") == 2
+    assert stats["failed"] == 1 and stats["done"] == 1
+    assert not (output / "bad.pdf.txt").exists()
+    manifest = IngestManifest(str(output / MANIFEST_NAME))
+    assert manifest.failures() == [{"path": "bad.pdf", "attempts": 2, "error": "unreadable"}]
+    manifest.close()
+
+    # A file that failed for good is not tried again until it changes
+    stub_backend.clear()
+    ingest_once(source, output, max_attempts=2)
+    assert stub_backend == []
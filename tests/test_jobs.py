@@ -0,0 +1,189 @@
+import asyncio
+
+import pytest
+
+from ocr_mcp.backends.base import OCRResult
+from ocr_mcp.config import settings
+from ocr_mcp.jobs import CANCELLED, DONE, PRIORITIES, QUEUED, RUNNING, JobScheduler, JobStore
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = JobStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+@pytest.fixture(autouse=True)
+def job_settings(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "JOBS_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "JOBS_WORKERS", 1)
+    monkeypatch.setattr(settings, "JOBS_RETENTION_SECONDS", 0)
+
+
+def test_claim_order_follows_priority_then_age(store):
+    low = store.add("a.pdf", {}, PRIORITIES["low"])
+    first = store.add("b.pdf", {}, PRIORITIES["normal"])
+    second = store.add("c.pdf", {}, PRIORITIES["normal"])
+    high = store.add("d.pdf", {}, PRIORITIES["high"])
+    claimed = [store.claim_next()["id"] for _ in range(4)]
+    assert claimed == [high, first, second, low]
+    assert store.claim_next() is None
+
+
+def test_cancelled_queued_job_is_never_claimed(store):
+    cancelled = store.add("a.pdf", {}, 1)
+    kept = store.add("b.pdf", {}, 1)
+    assert store.cancel(cancelled) == QUEUED
+    assert store.claim_next()["id"] == kept
+    assert store.get(cancelled)["status"] == CANCELLED
+
+
+def test_cancelled_running_job_keeps_its_status(store):
+    job_id = store.add("a.pdf", {}, 1)
+    store.claim_next()
+    assert store.progress(job_id, 1, 4) is True
+    assert store.cancel(job_id) == RUNNING
+    assert store.is_cancelled(job_id)
+    assert store.progress(job_id, 2, 4) is False
+    assert store.finish(job_id, OCRResult(text="late", backend="mistral")) is False
+    assert store.get(job_id)["status"] == CANCELLED
+    assert store.result(job_id) is None
+
+
+def test_cancel_of_finished_or_missing_job_changes_nothing(store):
+    job_id = store.add("a.pdf", {}, 1)
+    store.claim_next()
+    assert store.finish(job_id, OCRResult(text="text", backend="mistral")) is True
+    assert store.cancel(job_id) == DONE
+    assert store.get(job_id)["status"] == DONE
+    assert store.cancel("missing") is None
+
+
+def test_requeue_running_after_restart(store):
+    job_id = store.add("a.pdf", {}, 1)
+    store.claim_next()
+    assert store.requeue_running() == 1
+    assert store.get(job_id)["status"] == QUEUED
+    assert store.claim_next()["id"] == job_id
+    assert store.get(job_id)["attempts"] == 2
+
+
+def chunked_runner(chunks=20, delay=0.02):
+    calls = {"started": 0, "finished": 0}
+
+    async def run(file_path, options, on_chunk):
+        calls["started"] += 1
+        for done in range(1, chunks + 1):
+            await asyncio.sleep(delay)
+            await on_chunk(None, None, done, chunks)
+        calls["finished"] += 1
+        return OCRResult(text=f"text of {file_path}", backend="mistral")
+
+    return run, calls
+
+
+async def wait_for_status(scheduler, job_id, status, timeout=5.0):
+    for _ in range(int(timeout / 0.01)):
+        job = await scheduler.status(job_id)
+        if job["status"] == status:
+            return job
+        await asyncio.sleep(0.01)
+    raise AssertionError(f"job never reached {status}: {job}")
+
+
+def test_scheduler_runs_job_to_completion():
+    run, calls = chunked_runner(chunks=3, delay=0)
+
+    async def main():
+        scheduler = JobScheduler(run)
+        job_id = await scheduler.submit("a.pdf", {})
+        job = await wait_for_status(scheduler, job_id, DONE)
+        assert job["pages_done"] == 3
+        assert (await scheduler.result(job_id)).text == "text of a.pdf"
+        assert scheduler.completed == 1
+        await scheduler.stop()
+
+    asyncio.run(main())
+
+
+def test_scheduler_cancels_running_job():
+    run, calls = chunked_runner()
+
+    async def main():
+        scheduler = JobScheduler(run)
+        job_id = await scheduler.submit("a.pdf", {})
+        await wait_for_status(scheduler, job_id, RUNNING)
+        assert await scheduler.cancel(job_id) == RUNNING
+        await asyncio.sleep(0.1)
+        assert (await scheduler.status(job_id))["status"] == CANCELLED
+        assert calls["finished"] == 0
+        assert scheduler.cancelled == 1 and scheduler.completed == 0
+        await scheduler.stop()
+
+    asyncio.run(main())
+
+
+def test_worker_stops_job_cancelled_by_another_process(tmp_path):
+    run, calls = chunked_runner()
+
+    async def main():
+        scheduler = JobScheduler(run)
+        job_id = await scheduler.submit("a.pdf", {})
+        await wait_for_status(scheduler, job_id, RUNNING)
+        other = JobStore(str(tmp_path))
+        assert other.cancel(job_id) == RUNNING
+        other.close()
+        for _ in range(100):
+            if not scheduler._running:
+                break
+            await asyncio.sleep(0.01)
+        assert not scheduler._running
+        assert calls["finished"] == 0
+        assert (await scheduler.status(job_id))["status"] == CANCELLED
+        await scheduler.stop()
+
+    asyncio.run(main())
+
+
+def test_cancel_between_claim_and_start_stops_the_job(monkeypatch):
+    # One slow chunk, so only the check at start can stop the job in time
+    run, calls = chunked_runner(chunks=1, delay=0.2)
+
+    async def main():
+        scheduler = JobScheduler(run)
+        claim = scheduler.store.claim_next
+
+        def claim_then_cancel():
+            job = claim()
+            if job is not None:
+                # The cancel lands before the worker registers the job's task
+                assert scheduler.store.cancel(job["id"]) == RUNNING
+            return job
+
+        monkeypatch.setattr(scheduler.store, "claim_next", claim_then_cancel)
+        job_id = await scheduler.submit("a.pdf", {})
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            job = await scheduler.status(job_id)
+            if job["status"] == CANCELLED and not scheduler._running:
+                break
+        assert job["status"] == CANCELLED
+        assert calls["finished"] == 0
+        assert scheduler.completed == 0
+        await scheduler.stop()
+
+    asyncio.run(main())
+
+
+def test_stop_requeues_running_job():
+    run, calls = chunked_runner()
+
+    async def main():
+        scheduler = JobScheduler(run)
+        job_id = await scheduler.submit("a.pdf", {})
+        await wait_for_status(scheduler, job_id, RUNNING)
+        await scheduler.stop()
+        assert (await scheduler.status(job_id))["status"] == QUEUED
+
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+import asyncio
+import threading
+
+import pytest
+
+from ocr_mcp.backends.marker_pool import MarkerWorkerPool
+
+
+def test_cancelled_caller_keeps_slot_counted_until_job_finishes():
+    pool = MarkerWorkerPool(mode="thread", workers=1, queue_size=0, queue_timeout=0.05)
+    started, finish = threading.Event(), threading.Event()
+
+    def job():
+        started.set()
+        finish.wait(5)
+        return "done"
+
+    async def main():
+        caller = asyncio.create_task(pool._run(job))
+        await asyncio.to_thread(started.wait, 5)
+        caller.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await caller
+
+        # The job still runs and holds the only slot
+        assert pool.stats()["in_flight"] == 1
+        with pytest.raises(RuntimeError, match="queue is full"):
+            await pool._run(job)
+
+        finish.set()
+        for _ in range(100):
+            if pool.stats()["in_flight"] == 0:
+                break
+            await asyncio.sleep(0.01)
+        assert pool.stats()["in_flight"] == 0
+        assert await pool._run(lambda: "next") == "next"
+
+    try:
+        asyncio.run(main())
+    finally:
+        finish.set()
+        pool.shutdown()
+
+
+def test_failed_job_releases_its_slot():
+    pool = MarkerWorkerPool(mode="thread", workers=1, queue_size=0, queue_timeout=0.05)
+
+    def job():
+        raise ValueError("bad page")
+
+    async def main():
+        with pytest.raises(ValueError):
+            await pool._run(job)
+        await asyncio.sleep(0.01)
+        assert pool.stats()["in_flight"] == 0
+        assert pool.stats()["failed"] == 1
+
+    try:
+        asyncio.run(main())
+    finally:
+        pool.shutdown()
+
+
+class FakeModelRegistry:
+    def __init__(self):
+        self.warm_ups = []
+        self.warmup_time_seconds = None
+
+    def get(self):
+        return object()
+
+    def warm_up(self, batch_size):
+        self.warm_ups.append(batch_size)
+        self.warmup_time_seconds = 0.1
+
+    def stats(self):
+        return {"load_time_seconds": 0.0, "warmup_time_seconds": self.warmup_time_seconds}
+
+
+def test_start_reports_each_process_once(monkeypatch):
+    from concurrent.futures import ThreadPoolExecutor
+
+    from ocr_mcp.backends import marker_pool
+
+    models = FakeModelRegistry()
+    monkeypatch.setattr(marker_pool, "model_registry", models)
+    pool = MarkerWorkerPool(mode="process", workers=3)
+    # Every stats job runs in this process, as it may when one worker is quick
+    pool._executor = ThreadPoolExecutor(max_workers=3)
+    try:
+        workers = asyncio.run(pool.start(batch_size=2))
+    finally:
+        pool.shutdown()
+
+    assert len(workers) == 1
+    assert models.warm_ups and set(models.warm_ups) == {2}
+    # Processes spawned later warm up in their initializer
+    assert pool._warmup_batch_size == 2
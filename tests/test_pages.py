@@ -0,0 +1,70 @@
+import time
+
+import pytest
+from pypdf import PdfReader
+
+from ocr_mcp.backends.marker_models import build_text_pdf
+from ocr_mcp.pages import extract_pages, parse_page_ranges, select_pages
+
+
+def test_parse_keeps_ranges_as_pairs():
+    assert parse_page_ranges("1-5,12") == [(0, 5), (11, 12)]
+    assert parse_page_ranges(" 12 , 1 - 5 ") == [(0, 5), (11, 12)]
+
+
+def test_parse_merges_overlapping_and_adjacent_ranges():
+    assert parse_page_ranges("4-6,1-3") == [(0, 6)]
+    assert parse_page_ranges("1-5,3-8,10") == [(0, 8), (9, 10)]
+    assert parse_page_ranges("2,2,2") == [(1, 2)]
+
+
+def test_parse_open_range_runs_to_the_end():
+    assert parse_page_ranges("20-") == [(19, None)]
+    assert parse_page_ranges("3,5-,7-9") == [(2, 3), (4, None)]
+
+
+def test_parse_huge_range_is_cheap():
+    start = time.perf_counter()
+    assert parse_page_ranges("1-10000000") == [(0, 10000000)]
+    assert time.perf_counter() - start < 0.1
+
+
+@pytest.mark.parametrize("spec,message", [
+    ("5-3", "ends before it starts; did you mean 3-5?"),
+    ("0", "pages count from 1"),
+    ("0-4", "pages count from 1"),
+    ("x", "use e.g. 1-5,12"),
+    ("-3", "use e.g. 1-5,12"),
+    ("1-2-3", "use e.g. 1-5,12"),
+    (",", "No pages selected"),
+])
+def test_parse_rejects_bad_selections(spec, message):
+    with pytest.raises(ValueError, match=message):
+        parse_page_ranges(spec)
+
+
+def test_select_expands_within_the_document():
+    assert select_pages(10) == list(range(10))
+    assert select_pages(10, parse_page_ranges("2-3,9-")) == [1, 2, 8, 9]
+    assert select_pages(10, parse_page_ranges("3-")) == list(range(2, 10))
+
+
+def test_select_applies_max_pages_after_the_selection():
+    assert select_pages(50, parse_page_ranges("10-50"), max_pages=5) == [9, 10, 11, 12, 13]
+    assert select_pages(10, None, max_pages=3) == [0, 1, 2]
+    assert select_pages(3, None, max_pages=10) == [0, 1, 2]
+
+
+@pytest.mark.parametrize("spec,page", [("1-11", 11), ("11-", 11), ("12", 12), ("1-10000000", 10000000)])
+def test_select_rejects_pages_past_the_end(spec, page):
+    with pytest.raises(ValueError, match=f"Page {page} is out of range"):
+        select_pages(10, parse_page_ranges(spec))
+
+
+def test_extract_pages_writes_the_selection(tmp_path):
+    source = tmp_path / "doc.pdf"
+    source.write_bytes(build_text_pdf(["page"]))
+    output = tmp_path / "selected.pdf"
+    selected, total = extract_pages(str(source), str(output), parse_page_ranges("1-"))
+    assert (selected, total) == ([0], 1)
+    assert len(PdfReader(str(output)).pages) == 1
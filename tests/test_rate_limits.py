@@ -0,0 +1,222 @@
+import asyncio
+from email.utils import format_datetime
+from datetime import datetime, timedelta, timezone
+from types import SimpleNamespace
+
+import httpx
+import pytest
+
+from ocr_mcp import limits
+from ocr_mcp.backends import api
+from ocr_mcp.backends.http_client import retry_after_seconds
+from ocr_mcp.backends.mistral import MistralBackend
+from ocr_mcp.config import settings
+from ocr_mcp.deadline import Deadline, DeadlineExceeded, use_deadline
+from ocr_mcp.fileio import StreamedJSONBody
+from ocr_mcp.limits import RateLimiter, TokenBucket
+
+
+class FakeClock:
+    """Monotonic clock that only moves when something sleeps on it."""
+
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def monotonic(self):
+        return self.now
+
+    async def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += max(0.0, seconds)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(limits, "time", clock)
+    monkeypatch.setattr(limits, "asyncio", SimpleNamespace(sleep=clock.sleep, Lock=asyncio.Lock))
+    return clock
+
+
+def test_bucket_allows_a_burst_then_paces(clock):
+    bucket = TokenBucket(rate=2, capacity=4)
+
+    async def main():
+        for _ in range(4):
+            await bucket.acquire()
+        assert clock.now == 1000.0
+        await bucket.acquire()
+        await bucket.acquire()
+
+    asyncio.run(main())
+    # Two more tokens at 2 per second
+    assert clock.now == pytest.approx(1001.0)
+
+
+def test_bucket_refill_stops_at_capacity(clock):
+    bucket = TokenBucket(rate=10, capacity=5)
+    bucket.adjust(5)
+    assert bucket.tokens == pytest.approx(0)
+    clock.now += 0.2
+    bucket.adjust(0)
+    assert bucket.tokens == pytest.approx(2)
+    clock.now += 3600
+    bucket.adjust(0)
+    assert bucket.tokens == 5
+
+
+def test_request_larger_than_bucket_is_clamped(clock):
+    bucket = TokenBucket(rate=1, capacity=3)
+    asyncio.run(bucket.acquire(100))
+    assert clock.now == 1000.0
+    assert bucket.tokens == 0
+
+
+def test_overuse_is_paid_back_by_later_callers(clock):
+    bucket = TokenBucket(rate=1, capacity=10)
+    asyncio.run(bucket.acquire(2))
+    # The call used 6 tokens more than it reserved
+    bucket.adjust(6)
+    assert bucket.tokens == pytest.approx(2)
+    asyncio.run(bucket.acquire(5))
+    assert clock.now == pytest.approx(1003.0)
+
+
+def test_rate_limiter_reads_per_backend_rates(clock, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_RPS", "mistral=1")
+    monkeypatch.setattr(settings, "RATE_LIMIT_TPM", "mistral=600")
+    limiter = RateLimiter()
+
+    async def main():
+        waits = [await limiter.acquire("mistral", 10) for _ in range(3)]
+        unlimited = await limiter.acquire("deepseek", 10**6)
+        return waits, unlimited
+
+    waits, unlimited = asyncio.run(main())
+    assert waits == [0, pytest.approx(1.0), pytest.approx(1.0)]
+    assert unlimited == 0
+
+
+def test_retry_after_pauses_every_caller(clock):
+    limiter = RateLimiter()
+    limiter.retry_after("mistral", 5)
+    limiter.retry_after("mistral", 2)
+    stats = limiter.stats()["mistral"]
+    assert stats["retry_after_events"] == 2
+    # The later of the two pauses wins
+    assert stats["blocked_for_seconds"] == pytest.approx(5)
+    assert asyncio.run(limiter.acquire("mistral")) == pytest.approx(5)
+    assert asyncio.run(limiter.acquire("mistral")) == 0
+
+
+def test_retry_after_survives_a_rate_change(clock, monkeypatch):
+    limiter = RateLimiter()
+    limiter.retry_after("mistral", 5)
+    monkeypatch.setattr(settings, "RATE_LIMIT_RPS", "mistral=3")
+    assert limiter.stats()["mistral"]["blocked_for_seconds"] == pytest.approx(5)
+    assert asyncio.run(limiter.acquire("mistral")) == pytest.approx(5)
+
+
+def test_record_usage_settles_the_reservation(clock, monkeypatch):
+    monkeypatch.setattr(settings, "RATE_LIMIT_TPM", "mistral=6000")
+    limiter = RateLimiter()
+    asyncio.run(limiter.acquire("mistral", 4000))
+    limiter.record_usage("mistral", 4000, 1000)
+    bucket = limiter._get("mistral").tokens
+    assert bucket.tokens == pytest.approx(5000)
+    assert limiter.stats()["mistral"]["tokens_used"] == 1000
+    # Unknown usage keeps the reservation
+    limiter.record_usage("mistral", 4000, None)
+    assert bucket.tokens == pytest.approx(5000)
+
+
+def response(status, retry_after=None, body=None):
+    headers = {"retry-after": retry_after} if retry_after is not None else {}
+    request = httpx.Request("POST", "https://api.test/chat/completions")
+    return httpx.Response(status, headers=headers, json=body or {}, request=request)
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("3", 3.0),
+    ("0.5", 0.5),
+    ("-4", 0.0),
+    (None, None),
+    ("soon", None),
+])
+def test_retry_after_header_in_seconds(value, expected):
+    assert retry_after_seconds(response(429, value)) == expected
+
+
+def test_retry_after_header_as_http_date():
+    future = format_datetime(datetime.now(timezone.utc) + timedelta(seconds=30), usegmt=True)
+    assert retry_after_seconds(response(429, future)) == pytest.approx(30, abs=2)
+    past = format_datetime(datetime.now(timezone.utc) - timedelta(hours=1), usegmt=True)
+    assert retry_after_seconds(response(429, past)) == 0.0
+
+
+class FakeHTTP:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.timeouts = []
+
+    async def post(self, url, headers=None, content=None, timeout=None):
+        async for _ in content:
+            pass
+        self.timeouts.append(timeout)
+        return self.responses.pop(0)
+
+
+OK = {"choices": [{"message": {"content": "text"}, "finish_reason": "stop"}], "usage": {"total_tokens": 10}}
+
+
+@pytest.fixture
+def ocr(clock, monkeypatch):
+    limiter = RateLimiter()
+    monkeypatch.setattr(api, "rate_limiter", limiter)
+    backend = MistralBackend({"api_key": "test", "retry_after_max": 60})
+    backend.limiter = limiter
+    return backend
+
+
+def complete(ocr, budget=0):
+    payload = {"max_tokens": 100, "messages": [{"content": "data:{data}"}]}
+
+    async def main():
+        with use_deadline(Deadline(budget)):
+            return await ocr._complete(payload, StreamedJSONBody(payload, b"image"))
+
+    return asyncio.run(main())
+
+
+def test_429_with_retry_after_waits_and_retries(ocr, clock):
+    ocr.http = FakeHTTP([response(429, "7"), response(200, body=OK)])
+    text, finish_reason, request = complete(ocr)
+    assert text == "text" and finish_reason == "stop"
+    assert request["attempts"] == 2
+    assert request["rate_limit_wait_seconds"] == pytest.approx(7)
+    assert ocr.limiter.stats()["mistral"]["retry_after_events"] == 1
+
+
+def test_retry_after_beyond_the_deadline_gives_up(ocr):
+    ocr.http = FakeHTTP([response(429, "30"), response(200, body=OK)])
+    with pytest.raises(DeadlineExceeded, match="Retry-After 30s"):
+        complete(ocr, budget=5)
+    # No second request was sent
+    assert len(ocr.http.responses) == 1
+
+
+def test_retry_after_above_the_maximum_fails(ocr):
+    ocr.http = FakeHTTP([response(429, "600"), response(200, body=OK)])
+    with pytest.raises(httpx.HTTPStatusError):
+        complete(ocr)
+    assert ocr.limiter.stats()["mistral"]["retry_after_events"] == 0
+
+
+def test_request_timeout_is_clamped_to_the_deadline(ocr):
+    ocr.http = FakeHTTP([response(200, body=OK)])
+    complete(ocr, budget=5)
+    assert ocr.http.timeouts[0] <= 5
+    ocr.http = FakeHTTP([response(200, body=OK)])
+    complete(ocr)
+    assert ocr.http.timeouts[0] == ocr.api_timeout
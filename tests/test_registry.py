@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from ocr_mcp import registry as registry_module
+from ocr_mcp.config import settings
+from ocr_mcp.registry import BackendRegistry
+
+
+class FakeBackend:
+    def __init__(self, name, config):
+        self.name = name
+        self.config = config
+        self.closed = False
+
+    def is_available(self):
+        return True
+
+    async def aclose(self):
+        self.closed = True
+
+
+@pytest.fixture
+def reload_env(monkeypatch):
+    """Fake backends and a reload that applies the given setting changes."""
+    monkeypatch.setattr(settings, "ENABLED_BACKENDS", ["mistral", "deepseek"])
+    monkeypatch.setattr(settings, "DEFAULT_BACKEND", "mistral")
+    monkeypatch.setattr(settings, "MISTRAL_API_KEY", "mistral-key")
+    monkeypatch.setattr(settings, "DEEPSEEK_API_KEY", "deepseek-key")
+    monkeypatch.setattr(registry_module, "get_backend", FakeBackend)
+    pending = {}
+
+    def reload_settings():
+        for name, value in pending.items():
+            monkeypatch.setattr(settings, name, value)
+        changed = dict(pending)
+        pending.clear()
+        return changed
+
+    monkeypatch.setattr(registry_module, "reload_settings", reload_settings)
+    return pending
+
+
+def by_name(backends):
+    return {b.name: b for b in backends}
+
+
+def test_reload_reuses_unchanged_backends_and_drains_the_old_ones(reload_env):
+    registry = BackendRegistry()
+    before = by_name(registry.backends())
+
+    async def main():
+        async with registry.lease():
+            reload_env["DEEPSEEK_API_KEY"] = "rotated"
+            reload = asyncio.create_task(registry.reload(drain_timeout=5))
+            await asyncio.sleep(0.05)
+            # The new generation is live but the old one is still in use
+            assert not reload.done()
+            assert not before["deepseek"].closed
+            assert by_name(registry.backends())["deepseek"] is not before["deepseek"]
+        return await reload
+
+    summary = asyncio.run(main())
+    after = by_name(registry.backends())
+    assert summary["generation"] == 2
+    assert summary["replaced"] == ["deepseek"]
+    assert summary["drained"] is True
+    assert summary["restart_required"] == []
+    assert after["mistral"] is before["mistral"]
+    assert before["deepseek"].closed
+    assert not after["mistral"].closed
+
+
+def test_reload_closes_backends_after_the_drain_timeout(reload_env):
+    registry = BackendRegistry()
+    before = by_name(registry.backends())
+
+    async def main():
+        async with registry.lease():
+            reload_env["API_TIMEOUT"] = settings.API_TIMEOUT + 1
+            return await registry.reload(drain_timeout=0.05)
+
+    summary = asyncio.run(main())
+    assert summary["drained"] is False
+    assert sorted(summary["replaced"]) == ["deepseek", "mistral"]
+    assert before["mistral"].closed and before["deepseek"].closed
+
+
+def test_reload_without_backend_changes_keeps_everything(reload_env, tmp_path):
+    registry = BackendRegistry()
+    before = registry.backends()
+    reload_env["CACHE_DIR"] = str(tmp_path)
+    reload_env["JOBS_WORKERS"] = settings.JOBS_WORKERS + 1
+
+    summary = asyncio.run(registry.reload(drain_timeout=0))
+    assert summary["replaced"] == []
+    assert registry.backends() == before
+    # Read once at startup, so they only apply after a restart
+    assert summary["restart_required"] == ["CACHE_DIR", "JOBS_WORKERS"]
@@ -0,0 +1,120 @@
+import os
+import time
+
+import pytest
+
+from ocr_mcp import results
+from ocr_mcp.backends.base import OCRResult
+from ocr_mcp.results import ResultNotFound, ResultStore
+
+# ASCII, 2-, 3- and 4-byte UTF-8 characters
+TEXT = "Straße € 𝄞 naïve—fin. " * 40
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    # A small step so that reads cross many index points
+    monkeypatch.setattr(results, "INDEX_STEP", 7)
+    return ResultStore(str(tmp_path), retention_seconds=0)
+
+
+def test_index_points_at_character_boundaries(store):
+    info = store.put(OCRResult(text=TEXT, backend="mistral"))
+    data = TEXT.encode("utf-8")
+    assert info["characters"] == len(TEXT)
+    assert info["bytes"] == len(data)
+    assert len(info["index"]) == -(-len(TEXT) // 7)
+    for n, offset in enumerate(info["index"]):
+        assert data[offset:].decode("utf-8").startswith(TEXT[n * 7:n * 7 + 7])
+
+
+@pytest.mark.parametrize("length", [1, 5, 7, 8, 23, 200])
+def test_reads_match_python_slicing(store, length):
+    result_id = store.put(OCRResult(text=TEXT, backend="mistral"))["id"]
+    for offset in range(0, len(TEXT) + 1, 3):
+        read = store.read(result_id, offset, length)
+        assert read["text"] == TEXT[offset:offset + length], (offset, length)
+        assert read["end"] == offset + len(read["text"])
+
+
+def test_paging_through_with_next_offset(store):
+    result_id = store.put(OCRResult(text=TEXT, backend="mistral"))["id"]
+    parts, offset = [], 0
+    while offset is not None:
+        read = store.read(result_id, offset, 50)
+        parts.append(read["text"])
+        offset = read["next_offset"]
+    assert "".join(parts) == TEXT
+
+
+def test_out_of_range_offsets_are_clamped(store):
+    result_id = store.put(OCRResult(text=TEXT, backend="mistral"))["id"]
+    past = store.read(result_id, len(TEXT) + 100, 10)
+    assert past["text"] == "" and past["offset"] == len(TEXT)
+    assert past["next_offset"] is None
+    negative = store.read(result_id, -5, 4)
+    assert negative["offset"] == 0 and negative["text"] == TEXT[:4]
+    assert store.read(result_id, 10, -1)["text"] == ""
+    tail = store.read(result_id, len(TEXT) - 3, 100)
+    assert tail["text"] == TEXT[-3:] and tail["next_offset"] is None
+
+
+def test_empty_text(store):
+    result_id = store.put(OCRResult(text="", backend="mistral"))["id"]
+    read = store.read(result_id, 0, 10)
+    assert read["text"] == "" and read["next_offset"] is None
+
+
+def paged_result():
+    chunks = ["Seite eins: Grüße\n", "Page two € 𝄞\n", "Page three\n"]
+    page_results, offset = [], 0
+    for number, chunk in enumerate(chunks, start=1):
+        pages = [number * 2 - 1, number * 2]
+        page_results.append({"pages": pages, "offset": offset, "characters": len(chunk)})
+        offset += len(chunk)
+    metadata = {"page_count": 6, "page_results": page_results}
+    return chunks, OCRResult(text="".join(chunks), backend="mistral", metadata=metadata)
+
+
+def test_read_page_returns_its_chunk(store):
+    chunks, result = paged_result()
+    result_id = store.put(result)["id"]
+    assert store.read_page(result_id, 1)["text"] == chunks[0]
+    page = store.read_page(result_id, 4)
+    assert page["text"] == chunks[1]
+    assert page["pages"] == [3, 4]
+    assert store.read_page(result_id, 6)["text"] == chunks[2]
+    with pytest.raises(ValueError, match="covers pages 1-6"):
+        store.read_page(result_id, 7)
+
+
+def test_read_page_without_boundaries(store):
+    result_id = store.put(OCRResult(text=TEXT, backend="mistral"))["id"]
+    with pytest.raises(ValueError, match="no page boundaries"):
+        store.read_page(result_id, 1)
+
+
+def test_same_result_reuses_its_id(store):
+    first = store.put(OCRResult(text=TEXT, backend="mistral"))["id"]
+    assert store.put(OCRResult(text=TEXT, backend="mistral"))["id"] == first
+    assert store.put(OCRResult(text=TEXT, backend="deepseek"))["id"] != first
+
+
+def test_unknown_and_malformed_ids(store):
+    with pytest.raises(ResultNotFound):
+        store.read("0" * 32)
+    with pytest.raises(ResultNotFound):
+        store.info("../../etc/passwd")
+
+
+def test_purge_removes_expired_results(store):
+    old = store.put(OCRResult(text="old", backend="mistral"))["id"]
+    new = store.put(OCRResult(text="new", backend="mistral"))["id"]
+    past = time.time() - 3600
+    for suffix in (".txt", ".json"):
+        os.utime(os.path.join(store.directory, old + suffix), (past, past))
+
+    assert store.purge(time.time() - 60) == 1
+    with pytest.raises(ResultNotFound):
+        store.read(old)
+    assert store.read(new)["text"] == "new"
@@ -0,0 +1,35 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from ocr_mcp import server
+from ocr_mcp.backends.mistral import MistralBackend
+from ocr_mcp.health import HALF_OPEN, OPEN, BackendHealth, health_tracker
+
+
+class FakeRegistry:
+    def __init__(self, backends):
+        self.backends = backends
+
+    @asynccontextmanager
+    async def lease(self):
+        yield list(self.backends)
+
+
+def test_batch_exception_is_recorded_and_falls_back(monkeypatch):
+    ocr = MistralBackend({"api_key": "test"})
+
+    async def process_batch(paths):
+        raise RuntimeError("boom")
+
+    ocr.process_batch = process_batch
+    health = BackendHealth(ocr.name)
+    health.state = HALF_OPEN
+    monkeypatch.setitem(health_tracker.backends, ocr.name, health)
+    monkeypatch.setattr(server, "registry", FakeRegistry([ocr]))
+
+    assert asyncio.run(server.run_backends_batch(["a.pdf", "b.pdf"])) is None
+    # The failed probe reopened the circuit instead of holding its slot
+    assert health.state == OPEN
+    assert health.probes_in_flight == 0
+    assert health.last_error == "boom"
+    assert list(health.outcomes) == [False]
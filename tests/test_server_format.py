@@ -0,0 +1,38 @@
+import asyncio
+
+from ocr_mcp import server
+from ocr_mcp.backends.base import OCRResult
+from ocr_mcp.config import settings
+from ocr_mcp.results import ResultStore
+
+
+def test_format_result_uses_real_newlines():
+    result = OCRResult(
+        text="hello",
+        backend="mistral",
+        confidence=0.5,
+        metadata={"selected_pages": [1, 2, 3, 5], "document_pages": 9}
+    )
+    text = server.format_result(result)[0].text
+    assert "\\n" not in text
+    assert text.splitlines()[:3] == [
+        "Backend used: mistral",
+        "Confidence: 50.00%",
+        "Selected pages: 1-3,5 of 9",
+    ]
+    assert text.endswith("Extracted Text:\n" + "-" * 40 + "\nhello")
+
+
+def test_present_result_summary_uses_real_newlines(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "RESULT_INLINE_MAX_CHARS", 10)
+    monkeypatch.setattr(settings, "RESULT_PREVIEW_CHARS", 5)
+    monkeypatch.setattr(server, "get_result_store", lambda: ResultStore(str(tmp_path)))
+    result = OCRResult(text="x" * 100, backend="mistral")
+
+    text = asyncio.run(server.present_result(result))[0].text
+    assert "\\n" not in text
+    lines = text.splitlines()
+    assert lines[0] == "Backend used: mistral"
+    assert lines[1] == "Characters: 100 (100 bytes)"
+    assert lines[2].startswith("Result ID: ")
+    assert lines[-1] == "xxxxx"
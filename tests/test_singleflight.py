@@ -0,0 +1,166 @@
+import asyncio
+
+from ocr_mcp.backends.base import OCRResult
+from ocr_mcp.deadline import Deadline, current_deadline, start_deadline
+from ocr_mcp.singleflight import SingleFlight
+
+
+def test_shared_run_outlives_the_caller_with_the_shortest_deadline():
+    flight = SingleFlight()
+    seen = []
+
+    async def compute(notify):
+        await asyncio.sleep(0.3)
+        # By now the first caller's deadline has passed
+        seen.append(current_deadline().remaining())
+        return OCRResult(text="done", backend="test")
+
+    async def caller(timeout):
+        with start_deadline(timeout) as deadline:
+            return await deadline.run(flight.run("key", compute))
+
+    async def main():
+        short = asyncio.create_task(caller(0.1))
+        await asyncio.sleep(0.01)
+        long = asyncio.create_task(caller(5))
+        return await asyncio.gather(short, long, return_exceptions=True)
+
+    short, long = asyncio.run(main())
+    assert isinstance(short, TimeoutError)
+    assert long.text == "done"
+    assert long.metadata["deduplicated"] is True
+    assert seen[0] > 4
+
+
+def test_shared_deadline_extends_to_the_latest_waiter():
+    deadline = Deadline(1).shared()
+    deadline.extend(Deadline(10))
+    assert deadline.remaining() > 9
+    deadline.extend(Deadline(2))
+    assert deadline.remaining() > 9
+    deadline.extend(Deadline(0))
+    assert deadline.remaining() is None
+
+
+def test_concurrent_identical_calls_share_one_run():
+    flight = SingleFlight()
+    runs = []
+
+    async def compute(notify):
+        runs.append(1)
+        await asyncio.sleep(0.05)
+        return OCRResult(text="done", backend="test", metadata={"pages": 1})
+
+    async def main():
+        return await asyncio.gather(*(flight.run("key", compute) for _ in range(3)))
+
+    first, *others = asyncio.run(main())
+    assert len(runs) == 1
+    assert "deduplicated" not in first.metadata
+    assert all(result.metadata == {"pages": 1, "deduplicated": True} for result in others)
+    assert flight.stats()["started"] == 1
+    assert flight.stats()["deduplicated"] == 2
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_different_keys_run_separately():
+    flight = SingleFlight()
+    runs = []
+
+    async def compute(notify):
+        runs.append(1)
+        return OCRResult(text="done", backend="test")
+
+    async def main():
+        await asyncio.gather(flight.run("a", compute), flight.run("b", compute))
+        # A finished run is not reused
+        await flight.run("a", compute)
+
+    asyncio.run(main())
+    assert len(runs) == 3
+
+
+def test_run_survives_one_cancelled_caller():
+    flight = SingleFlight()
+
+    async def compute(notify):
+        await asyncio.sleep(0.1)
+        return OCRResult(text="done", backend="test")
+
+    async def main():
+        first = asyncio.create_task(flight.run("key", compute))
+        second = asyncio.create_task(flight.run("key", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await asyncio.gather(first, second, return_exceptions=True)
+
+    first, second = asyncio.run(main())
+    assert isinstance(first, asyncio.CancelledError)
+    assert second.text == "done"
+    assert flight.stats()["abandoned"] == 0
+
+
+def test_run_is_cancelled_when_every_caller_leaves():
+    flight = SingleFlight()
+    cancelled = []
+
+    async def compute(notify):
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+        return OCRResult(text="done", backend="test")
+
+    async def main():
+        callers = [asyncio.create_task(flight.run("key", compute)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for caller in callers:
+            caller.cancel()
+        await asyncio.gather(*callers, return_exceptions=True)
+        await asyncio.sleep(0.01)
+
+    asyncio.run(main())
+    assert cancelled == [1]
+    assert flight.stats()["abandoned"] == 1
+    assert flight.stats()["in_flight"] == 0
+
+
+def test_errors_reach_every_caller():
+    flight = SingleFlight()
+
+    async def compute(notify):
+        await asyncio.sleep(0.01)
+        raise RuntimeError("backend down")
+
+    async def main():
+        return await asyncio.gather(
+            flight.run("key", compute), flight.run("key", compute), return_exceptions=True
+        )
+
+    results = asyncio.run(main())
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_progress_reaches_every_listening_caller():
+    flight = SingleFlight()
+    seen = {"a": [], "b": []}
+
+    async def compute(notify):
+        await asyncio.sleep(0.01)
+        await notify("chunk", None, 1, 1)
+        return OCRResult(text="done", backend="test")
+
+    def listener(name):
+        async def on_chunk(*args):
+            seen[name].append(args[0])
+        return on_chunk
+
+    async def main():
+        await asyncio.gather(
+            flight.run("key", compute, listener("a")),
+            flight.run("key", compute, listener("b"))
+        )
+
+    asyncio.run(main())
+    assert seen == {"a": ["chunk"], "b": ["chunk"]}
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from pypdf import PdfWriter
+
+from ocr_mcp import server
+from ocr_mcp.backends.base import OCRResult
+from ocr_mcp.config import Settings, settings
+
+
+@pytest.fixture
+def pdf(tmp_path):
+    writer = PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=612, height=792)
+    path = tmp_path / "doc.pdf"
+    with open(path, "wb") as f:
+        writer.write(f)
+    return str(path)
+
+
+@pytest.fixture
+def calls(monkeypatch):
+    sent = []
+
+    async def run_backends(file_path=None, image_data=None, backend=None, max_pages=None):
+        sent.append(file_path)
+        return OCRResult(text=f"page text {len(sent)}", backend="stub")
+
+    monkeypatch.setattr(server, "run_backends", run_backends)
+    for name in ("PAGE_SPLIT_ENABLED", "TEXT_LAYER_ENABLED", "CACHE_ENABLED"):
+        monkeypatch.setattr(settings, name, False)
+    monkeypatch.setattr(settings, "PAGE_BATCH_SIZE", 1)
+    return sent
+
+
+async def ignore(*args):
+    pass
+
+
+def test_stream_pages_is_off_by_default():
+    assert Settings.model_fields["STREAM_PAGES"].default is False
+
+
+def test_progress_alone_does_not_split_the_document(pdf, calls, monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_PAGES", False)
+    asyncio.run(server.run_pipeline(file_path=pdf, on_chunk=ignore))
+    assert calls == [pdf]
+
+
+def test_stream_pages_splits_when_enabled(pdf, calls, monkeypatch):
+    monkeypatch.setattr(settings, "STREAM_PAGES", True)
+    monkeypatch.setattr(settings, "STREAM_CHUNK_SIZE", 1)
+    seen = []
+
+    async def on_chunk(chunk, result, pages_done, total):
+        seen.append((pages_done, total))
+
+    result = asyncio.run(server.run_pipeline(file_path=pdf, on_chunk=on_chunk))
+    assert len(calls) == 3 and pdf not in calls
+    assert sorted(seen) == [(1, 3), (2, 3), (3, 3)]
+    assert result.error is None
@@ -0,0 +1,71 @@
+import io
+
+from PIL import Image, ImageDraw
+from pypdf import PdfReader, PdfWriter
+
+from ocr_mcp.backends.marker_models import build_text_pdf
+from ocr_mcp.textlayer import classify_pages, read_page, usable_text
+
+
+def text_page(lines):
+    return PdfReader(io.BytesIO(build_text_pdf(lines))).pages[0]
+
+
+def scan_page():
+    image = Image.new("RGB", (1275, 1650), "white")
+    ImageDraw.Draw(image).text((100, 300), "scanned body " * 20, fill="black")
+    out = io.BytesIO()
+    image.save(out, "PDF", resolution=150)
+    return PdfReader(io.BytesIO(out.getvalue())).pages[0]
+
+
+def stamped_scan(writer):
+    page = writer.add_page(scan_page())
+    page.merge_page(text_page(["ACME Corp Invoice Archive - Scanned 2024-03-01"]))
+
+
+def write_pdf(path, pages, writer=None):
+    writer = writer or PdfWriter()
+    for page in pages:
+        writer.add_page(page)
+    writer.write(str(path))
+    return str(path)
+
+
+def test_usable_text_rejects_short_and_garbled_text():
+    assert not usable_text("Page 1")
+    assert not usable_text("�" * 40)
+    assert not usable_text("(cid:12)(cid:13)" * 5)
+    assert not usable_text("#$%&*" * 10)
+    assert usable_text("The quick brown fox jumps over the lazy dog.")
+
+
+def test_digital_page_uses_text_layer(tmp_path):
+    path = write_pdf(tmp_path / "digital.pdf", [text_page(["A born-digital page with real text."] * 3)])
+    assert classify_pages(path) == (1, {0: "\n".join(["A born-digital page with real text."] * 3)})
+
+
+def test_scan_without_text_is_ocred(tmp_path):
+    path = write_pdf(tmp_path / "scan.pdf", [scan_page()])
+    assert classify_pages(path) == (1, {})
+
+
+def test_scan_with_stamped_header_is_ocred(tmp_path):
+    writer = PdfWriter()
+    stamped_scan(writer)
+    path = write_pdf(tmp_path / "stamped.pdf", [text_page(["Digital page with enough text."] * 2)], writer)
+
+    text, coverage = read_page(PdfReader(path).pages[0])
+    assert "ACME Corp" in text
+    assert coverage == 1.0
+
+    page_count, native = classify_pages(path)
+    assert page_count == 2
+    assert list(native) == [1]
+
+
+def test_image_coverage_threshold_is_configurable(tmp_path):
+    writer = PdfWriter()
+    stamped_scan(writer)
+    path = write_pdf(tmp_path / "stamped.pdf", [], writer)
+    assert list(classify_pages(path, max_image_coverage=1.0)[1]) == [0]